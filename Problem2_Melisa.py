@@ -1,31 +1,58 @@
-import networkx as nx
-import psutil
-import matplotlib.pyplot as plt
-import time
-import math
+import argparse
+import numpy as np
+from capacity import plan_capacity
+from cli import add_graph_arguments, finish_profile, open_label_cache, start_profile
+from export import write_labeling
+from graph_core import CSRStorage, star_edges
+from instrument import span
+from labeling import LabelView, generalized_star_labels
+from layout import radial_layout
+from verify import verify_edge_weights
+
+# The radial layout is closed-form, so the limit is set by how many labels stay readable
+MAX_DRAWN_VERTICES = 1000
 
 class Graph:
     def __init__(self, n, m):
         self.n = n  # Number of arms
         self.m = m  # Number of leaves per arm
-        self.order = n * m + 1  # Total number of vertices
-        self.adj_list = {i: [] for i in range(self.order)}
-        self.edge_labels = {}
-        self.vertex_labels = {}  # Stores vertex labels
+        self.order = 1 + n + n * m  # Total number of vertices: center, arms and leaves
+        self.storage = CSRStorage(self.order)  # Compact CSR adjacency, exposed read-only through adj_list
+        self.labels = np.zeros(self.order, dtype=np.int64)  # Vertex labels indexed by vertex, 0 until labeled
+
+    @property
+    def adj_list(self):
+        """
+        Read-only adjacency list view backed by the CSR arrays.
+        """
+        return self.storage.csr.adjacency_view()
+
+    @property
+    def vertex_labels(self):
+        """
+        Read-only {vertex: label} view of the label array.
+        """
+        return LabelView(self.labels)
+
+    @property
+    def edge_weights(self):
+        """
+        Read-only {(u, v): weight} view with one entry per undirected edge, found in either order.
+        """
+        return self.storage.edges.as_mapping()
+
+    # Edge weights double as the edge labels written to the output file and drawing
+    edge_labels = edge_weights
 
     def calculate_edge_weights(self):
         """
         Calculates edge weights based on vertex labels and adjacency list.
         """
-        for vertex, neighbors in self.adj_list.items():
-            for neighbor in neighbors:
-                # Calculate edge weight by summing up the labels of the two vertices
-                weight = self.vertex_labels[vertex] + self.vertex_labels[neighbor]
-                self.edge_weights[(vertex, neighbor)] = weight
-                self.edge_weights[(neighbor, vertex)] = weight
-        
+        # Edge weight is the sum of the labels of the two vertices, computed once per undirected edge
+        self.storage.edges.compute_weights(self.labels)
+
         return self.edge_weights
-    def add_edge(self, u, v, weight):
+    def add_edge(self, u, v, weight=0):
         """
         Adds an edge between two nodes with a given weight.
 
@@ -34,153 +61,158 @@ class Graph:
             v (int): The other end of the edge.
             weight (int): The weight to be assigned to the edge.
         """
-        # Adding edge to the adjacency list
-        self.adj_list[u].append(v)
-        self.adj_list[v].append(u)
-        # Storing edge weight in both directions
-        self.edge_weights[(u, v)] = weight
-        self.edge_weights[(v, u)] = weight
+        # Adding edge to the adjacency list and storing its weight once in the edge table
+        self.storage.add_edge(u, v, weight)
         
-    def vertex_k_labeling(self):
+    def vertex_k_labeling(self, cache=None):
         """
         Generalizes vertex labels for any m and n >= 3.
+
+        Arm bases follow the ceil(n / 4) rule and leaf j of each arm gets the arm label
+        plus j * max(n, m), so every leaf has a unique sum with its parent arm vertex.
+        The whole label vector is built with array operations (labeling.generalized_star_labels).
+
+        Args:
+            cache (LabelCache, optional): Reuses a previously computed labeling.
         """
-        self.vertex_labels[0] = 1  # Central vertex label
-
-        # Determining labels for internal vertices (arm bases)
-        # and ensuring unique edge weights when combined with the central node or leaf nodes.
-        for i in range(1, self.n + 1):
-            if 1 <= i <= math.ceil(self.n / 4) + 1:
-                self.vertex_labels[i] = 3 * i - 2
-            else:
-                self.vertex_labels[i] = 2 * math.ceil(self.n / 4) + i
-
-        # Labeling leaves such that each leaf has a unique sum with its parent arm vertex.
-        vertex = self.n + 1
-        for i in range(1, self.n + 1):
-            base_label = self.vertex_labels[i]
-            increment = max(self.n, self.m)  # To ensure a spread that avoids overlap in sums.
-            for j in range(1, self.m + 1):
-                # Incrementing label ensures uniqueness across different arms' leaves.
-                self.vertex_labels[vertex] = base_label + j * increment
-                vertex += 1
+        if cache:
+            self.labels = cache.get('star', self.n, self.m)
+        else:
+            self.labels = generalized_star_labels(self.n, self.m)
 
         return self.vertex_labels
 
 
-    def build_graph(self):
-        self.vertex_k_labeling()  # Assign labels before building edges
-        # Connect center to each arm
-        for arm in range(1, self.n + 1):
-            self.add_edge(0, arm)
-            # Connect arm to its leaves
-            for leaf in range(1, self.m + 1):
-                leaf_node = self.n + (arm - 1) * self.m + leaf
-                self.add_edge(arm, leaf_node)
+    def build_graph(self, cache=None):
+        with span('vertex_k_labeling'):
+            self.vertex_k_labeling(cache)  # Assign labels before building edges
+        # Center to each arm, then arm to its leaves at leaf_node = n + (arm - 1) * m + leaf,
+        # generated in one bulk step instead of one add_edge call per edge
+        with span('build'):
+            self.storage.load_edges(*star_edges(self.n, self.m))
 
 
     def output_labels_and_weights(self, filename='graph2_output.txt'):
-        with open(filename, 'w') as file:
-            file.write("Vertex Labels:\n")
-            for vertex, label in self.vertex_labels.items():
-                file.write(f"Vertex {vertex}: Label {label}\n")
-
-            file.write("\nEdge Weights:\n")
-            for (vertex1, vertex2), weight in self.edge_labels.items():
-                file.write(f"Edge ({vertex1}, {vertex2}): Weight {weight}\n")
+        # Streams labels and weights in large formatted chunks, each undirected edge once;
+        # a filename ending in .gz is written gzip-compressed
+        write_labeling(filename, self.labels, self.storage.edges)
                 
     def compute_theoretical_complexity(self):
         # The complexity is primarily dictated by the number of edges
         num_edges = self.n + self.n * self.m
         return f"O({num_edges})"
-    
-    def build_graph(self):
-        self.vertex_k_labeling()  # Assign labels before building edges
-        # Connecting center to each arm
-        for arm in range(1, self.n + 1):
-            self.add_edge(0, arm)
-            # Connecting arm to its leaves
-            for leaf in range(1, self.m + 1):
-                leaf_node = self.n + (arm - 1) * self.m + leaf
-                self.add_edge(arm, leaf_node)
                 
 def available_memory():
+    import psutil  # Only needed to size the hardware test
     return psutil.virtual_memory().available
 
 def test_limits(initial_n, initial_m, base_increment, memory_limit_ratio=0.8, timeout_seconds=300):
-    n, m = initial_n, initial_m
-    increment = base_increment
-    max_n, max_m = n, m
+    """
+    Finds the largest graph that fits in the available memory.
+
+    A memory model fitted on a few small builds predicts the limit, which is then
+    confirmed by exponential search and bisection, each trial build running in a
+    fresh subprocess (see capacity.plan_capacity).
+
+    Args:
+        initial_n (int): Smallest n to consider.
+        initial_m (int): Smallest m to consider.
+        base_increment (int): Resolution of the final search.
+        memory_limit_ratio (float): Fraction of the available memory one build may use.
+        timeout_seconds (float): Time budget for the whole search.
+
+    Returns:
+        tuple: The largest supported (n, m).
+    """
     memory_limit = available_memory() * memory_limit_ratio
-    start_time = time.time()
-
-    while True:
-        if time.time() - start_time > timeout_seconds:
-            print("Testing timeout reached. Returning the last found values.")
-            break
-
-        try:
-            graph = Graph(n, m)
-            graph.build_graph()
-
-            # Estimate current memory usage
-            current_memory_usage = psutil.Process().memory_info().rss
-
-            if current_memory_usage > memory_limit:
-                if increment > 1:
-                    # If the limit is reached, step back and reduce increment
-                    n -= increment
-                    m -= increment
-                    increment = 1  # Fine-tune with smallest possible increment
-                    continue
-                break  # Break if already at smallest increment
-
-            max_n, max_m = n, m
-            n += increment
-            m += increment  # Increment both n and m
-
-        except MemoryError:
-            break
-
-    return max_n, max_m
-
-def build_and_visualize_graph(n, m):
+    plan = plan_capacity('star', memory_limit, min_scale=max(initial_n, initial_m),
+                         resolution=base_increment, timeout_seconds=timeout_seconds)
+    if not plan.confirmed:
+        print("Testing timeout reached. Returning the last found values.")
+    return plan.n, plan.m
+
+def build_and_visualize_graph(n, m, output='graph2_output.txt', draw=None, show=True, cache=None):
+    """
+    Builds and labels the graph, writes its labeling and draws it.
+
+    Args:
+        n (int): Number of arms.
+        m (int): Number of leaves per arm.
+        output (str, optional): Text file for the labels and weights; None skips it.
+        draw (str, optional): Image file to save the drawing to.
+        show (bool): Open the drawing in a window.
+        cache (LabelCache, optional): Reuses a previously computed labeling.
+    """
     graph = Graph(n, m)
-    graph.build_graph()
-    graph.assign_vertex_labels()
-    graph.output_labels_and_weights()
+    graph.build_graph(cache)
+    with span('weights'):
+        graph.calculate_edge_weights()
+    if output:
+        with span('output'):
+            graph.output_labels_and_weights(output)
     complexity = graph.compute_theoretical_complexity()
     print(f"Theoretical Time Complexity: {complexity}")
-
+    if draw or show:
+        with span('draw'):
+            draw_graph(graph, draw, show)
+    return graph
+
+def draw_graph(graph, draw=None, show=True):
+    """
+    Draws the labeled graph if it is small enough to stay readable.
+
+    Args:
+        graph (Graph): A labeled and weighted graph.
+        draw (str, optional): Image file to save the drawing to.
+        show (bool): Open the drawing in a window.
+    """
     # Visualize the graph only if it is of manageable size
-    if n * m < 100:  # Adjust this threshold based on your needs
+    if graph.order <= MAX_DRAWN_VERTICES:
+        import matplotlib.pyplot as plt
+        import networkx as nx
+
         plt.figure(figsize=(12, 12))
         G = nx.Graph()
         for (vertex1, vertex2), edge_label in graph.edge_labels.items():
             G.add_edge(vertex1, vertex2, label=str(edge_label))
-        pos = nx.spring_layout(G)
+        pos = radial_layout(graph.n, graph.m)
         nx.draw(G, pos, with_labels=True, node_color='lightblue', edge_color='gray', width=2, linewidths=1, node_size=500, font_size=12)
         edge_labels_for_drawing = nx.get_edge_attributes(G, 'label')
         nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels_for_drawing, font_color='red', font_size=10)
         plt.title('Homogeneous Amalgamated Star Graph')
         plt.axis('off')
-        plt.show()
+        if draw:
+            plt.savefig(draw)
+        if show:
+            plt.show()
+        plt.close()
     else:
         print("Graph is too large for effective visualization.")
 
-def main():
-    user_input = input("Enter 'test' to find the hardware limits or 'build' to specify n and m: ").strip().lower()
+def main(argv=None):
+    parser = add_graph_arguments(argparse.ArgumentParser(
+        description="Find the hardware limits (--test) or build and label the generalized star."), family='star')
+    parser.add_argument('--test', action='store_true', help="find the hardware limits instead of building")
+    parser.add_argument('--show', action='store_true', help="open the drawing in a window")
+    parser.set_defaults(output='graph2_output.txt')
+    args = parser.parse_args(argv)
 
-    if user_input == "test":
+    if args.test:
         print("Testing hardware limits. This might take a while...")
         max_n, max_m = test_limits(1, 1, 1)  # Start with n = 1, m = 1 and increment by 1
         print(f"Maximum supported n: {max_n}, Maximum supported m: {max_m}")
-    elif user_input == "build":
-        n = int(input("Enter the number of arms (n): "))
-        m = int(input("Enter the number of leaves per arm (m): "))
-        build_and_visualize_graph(n, m)
+    elif args.n is None or args.m is None:
+        parser.error("--n and --m are required unless --test is given")
     else:
-        print("Invalid input. Please enter 'test' or 'build'.")
+        start_profile(args)
+        graph = build_and_visualize_graph(args.n, args.m, args.output, args.draw, args.show,
+                                          open_label_cache(args))
+        if args.verify:
+            with span('verify'):
+                result = verify_edge_weights(graph.edge_weights)
+            print(f"All edge values are unique: {result.unique}")
+            print(f"Maximum edge weight value: {result.max_weight}")
+        finish_profile(args, 'star')
 
 if __name__ == "__main__":
     main()
@@ -1,21 +1,50 @@
-import networkx as nx
-import matplotlib.pyplot as plt
-import numpy as np
+import argparse
+import sys
 import time 
+import numpy as np
+from cli import add_graph_arguments, finish_profile, open_label_cache, start_profile
+from export import label_chunks, write_labeling, write_rows
+from families import family_shape
+from graph_core import CSRStorage, snowflake_edges
+from instrument import span
+from labeling import LabelView, snowflake_labels
+from layout import radial_layout
+from verify import verify_edge_weights
 
 class Graph:
-    def __init__(self, n):
+    def __init__(self, n, leaves=2):
         """
         Initializes a graph object with a given number of nodes.
 
         Args:
             n (int): The number of branch nodes.
+            leaves (int): The number of leaf nodes on each branch.
         """
         self.n = n
-        # The total number of nodes is n branch nodes + 1 center node + 2n leaf nodes
-        self.order = 1 + n + 2 * n
-        self.adj_list = {i: [] for i in range(self.order)}
-        self.edge_labels = {}  # Dictionary to store edge labels
+        self.leaves = leaves
+        # The total number of nodes is n branch nodes + 1 center node + n * leaves leaf nodes
+        self.order = 1 + n + n * leaves
+        self.storage = CSRStorage(self.order)  # Compact CSR adjacency, exposed read-only through adj_list
+
+    @property
+    def adj_list(self):
+        """
+        Read-only adjacency list view backed by the CSR arrays.
+        """
+        return self.storage.csr.adjacency_view()
+
+    @property
+    def edge_labels(self):
+        """
+        Read-only {(u, v): label} view with one entry per undirected edge, found in either order.
+        """
+        return self.storage.edges.as_mapping()
+
+    def build_snowflake(self):
+        """
+        Adds every spoke, leaf and ring edge of the snowflake in one bulk step.
+        """
+        self.storage.load_edges(*snowflake_edges(self.n, self.leaves))
 
     def add_edge(self, u, v, label):
         """
@@ -26,13 +55,10 @@ class Graph:
             v (int): The other end of the edge.
             label (int): The label to be assigned to the edge.
         """
-        self.adj_list[u].append(v)
-        self.adj_list[v].append(u)
-        self.edge_labels[(u, v)] = label  # Storing the edge label
-        self.edge_labels[(v, u)] = label  # Storing the edge label for the opposite direction
+        self.storage.add_edge(u, v, label)  # Storing the edge label once for both directions
 
 
-def assign_labels(graph):
+def assign_labels(graph, cache=None):
     """
     Assigns vertex and edge labels to the graph using edge irregular k-labeling scheme.
 
@@ -41,78 +67,93 @@ def assign_labels(graph):
 
     Args:
         graph (Graph): The graph object to which labels will be assigned.
+        cache (LabelCache, optional): Reuses a previously computed labeling.
 
     Returns:
         tuple: A tuple containing dictionaries of vertex labels and unique edge labels.
     """
-    vertex_labels = {}  # Dictionary to store vertex labels
-    edge_labels = {}  # Dictionary to store edge labels
-    k = (1 + graph.n + 2 * graph.n) // 2
+    if cache:
+        labels = cache.get('snowflake', graph.n, graph.leaves)
+    else:
+        # Center 1, branch nodes from 11 in steps of 2 * leaves, leaves at branch + 1, + 3, ...
+        # computed in closed form for every vertex at once
+        labels = snowflake_labels(graph.n, graph.leaves)
 
-    # Greedy labeling starting from central vertex
-    vertex_labels[0] = 1 # min(graph.n + 1, k)  # Labeling the center vertex
-    
-    # Output vertex labels
-    inner_verts = 11
-    for vert in range(1, graph.n + 1):
-        vertex_labels[vert] = inner_verts
-        inner_verts += 4
- 
-    for i in range(1, graph.n+1):
-        branch_val = vertex_labels[i]
-        for j in range(1, 4, 2):
-            vert = vert + 1
-            vertex_labels[vert] = branch_val + j
+    # Assigning edge labels, once per undirected edge
+    with span('weights'):
+        graph.storage.edges.compute_weights(labels)
 
+    return LabelView(labels), graph.edge_labels
 
+def printed_edges(edges):
+    """
+    Orders the edges as the original script printed them: each edge once as (lower, higher)
+    endpoint, grouped by the lower endpoint in adjacency order, so the center's spokes
+    come first and the closing ring edge n -> 1 is listed under branch 1 as (1, n).
 
-    # Assigning edge labels
-    for vertex, neighbors in graph.adj_list.items():
-        for neighbor in neighbors:
-            edge_label = vertex_labels[vertex] + vertex_labels[neighbor]
-            edge_labels[(vertex, neighbor)] = edge_label
-            edge_labels[(neighbor, vertex)] = edge_label
+    Args:
+        edges (EdgeTable): The edges of the snowflake, in add_edge order.
 
-    return vertex_labels, edge_labels
+    Returns:
+        tuple: (u, v, weight) arrays in print order.
+    """
+    low, high = np.minimum(edges.u, edges.v), np.maximum(edges.u, edges.v)
+    _, first = np.unique(low * edges.order + high, return_index=True)  # An edge added twice prints once
+    rows = np.sort(first)
+    rows = rows[np.argsort(low[rows], kind='stable')]
+    return low[rows], high[rows], edges.weight[rows]
 
-def verify_unique_edge_values(edge_labels):
+def verify_unique_edge_values(edge_labels, show_collisions=False):
     """
     Verifies if all edge values are unique and prints the maximum edge weight.
 
+    Uses the one-pass bitset verifier, so memory is about max weight / 8 bytes.
+
     Args:
-        edge_labels (dict): A dictionary of edge labels.
+        edge_labels (dict): A dictionary of edge labels, one entry per undirected edge.
+        show_collisions (bool): Also print every group of edges sharing a weight.
 
     Returns:
         bool: True if all edge values are unique, False otherwise.
     """
-    edge_values = list(edge_labels.values())
-    unique_values = len(edge_values)/2 == len(set(edge_values)) + 1
-    max_edge_value = max(edge_values)
-    print(f"All edge values are unique: {unique_values}")
-    print(f"Maximum edge weight value: {max_edge_value}")
+    result = verify_edge_weights(edge_labels, collisions=True)
+    print(f"All edge values are unique: {result.unique}")
+    print(f"Maximum edge weight value: {result.max_weight}")
+    if show_collisions:
+        for weight, edges in result.collisions.items():
+            print(f"Weight {weight} shared by edges: {edges}")
+    return result.unique
+
+def main(argv=None):
+    parser = add_graph_arguments(argparse.ArgumentParser(
+        description="Label the snowflake graph and check its edge weights."), family='snowflake')
+    parser.add_argument('--show', action='store_true', help="open the drawing in a window")
+    parser.add_argument('--collisions', action='store_true', help="print every group of edges sharing a weight")
+    args = parser.parse_args(argv)
+    if args.n is None:
+        parser.error("--n is required")
+    try:
+        _, _, leaves = family_shape('snowflake', args.n, args.m)
+    except ValueError as error:
+        parser.error(str(error))
+    start_profile(args)
 
-def main():
     start_time = time.time()  # Start timing
 
     # Number of branch nodes
-    n = int(input("Enter the value of n: "))
-
-    # Initialize graph
-    graph = Graph(n)
-
-    # Adding edges for the Snowflake graph
-    for i in range(1, n + 1):
-        graph.add_edge(0, i, 0)  # Connect branch nodes to center
-        leaf1 = n + 2 * (i - 1) + 1
-        leaf2 = n + 2 * (i - 1) + 2
-        graph.add_edge(i, leaf1, 0)  # Add leaf nodes
-        graph.add_edge(i, leaf2, 0)
-        # Connect each branch node to the next and previous one
-        next_branch = i % n + 1
-        graph.add_edge(i, next_branch, 0)
+    n = args.n
+
+    # Initialize graph, with --m leaves per branch (2 by default)
+    graph = Graph(n, leaves)
+
+    # Adding edges for the Snowflake graph: each branch node to the center, to its
+    # leaves n + (i - 1) * leaves + 1 .. n + i * leaves, and to the next branch node i % n + 1
+    with span('build'):
+        graph.build_snowflake()
 
     # Assign labels to vertices and edges
-    vertex_labels, edge_labels = assign_labels(graph)
+    with span('assign_labels'):
+        vertex_labels, edge_labels = assign_labels(graph, open_label_cache(args))
     
     # printing the graph labeling compute time 
     end_time = time.time()  # End timing
@@ -120,53 +161,58 @@ def main():
     
     
     # verifying edge weight uniqueness (for debugging)
-    verify_unique_edge_values(edge_labels)
+    with span('verify'):
+        verify_unique_edge_values(edge_labels, show_collisions=args.collisions)
     
     # printing edge and vertex labels (for debugging)
-    print("Vertex Labels:")
-    for vertex, label in vertex_labels.items():
-        print(f"Vertex {vertex}: Label {label}")
-    print("Edge Labels:")
-    i = 1
-    for edge, label in edge_labels.items():
-        if i == 1:
-            print(f"Edge {edge}: Label {label}")
-            i = 0
-        else:
-            i = 1
-    
+    # Formatted in large chunks instead of one print per line
+    sys.stdout.write("Vertex Labels:\n")
+    for vertices, labels in label_chunks(vertex_labels):
+        write_rows(sys.stdout, "Vertex %d: Label %d\n", (vertices, labels))
+    sys.stdout.write("Edge Labels:\n")
+    write_rows(sys.stdout, "Edge (%d, %d): Label %d\n", printed_edges(graph.storage.edges))
+    if args.output:
+        with span('output'):
+            write_labeling(args.output, vertex_labels, graph.storage.edges)
+    if args.draw or args.show:
+        with span('draw'):
+            draw_graph(graph, vertex_labels, edge_labels, args.draw, args.show)
+    finish_profile(args, 'snowflake')
+
+
+def draw_graph(graph, vertex_labels, edge_labels, draw=None, show=True):
+    """
+    Draws the labeled snowflake with its edge labels.
+
+    Args:
+        graph (Graph): The labeled graph.
+        vertex_labels (dict): Label of every vertex.
+        edge_labels (dict): Label of every edge.
+        draw (str, optional): Image file to save the drawing to.
+        show (bool): Open the drawing in a window.
+    """
     # Visualize graph using networkx library
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     plt.figure(figsize=(12, 12))  # Increase the figure size
     G = nx.Graph()
     for vertex, neighbors in graph.adj_list.items():
         for neighbor in neighbors:
             G.add_edge(vertex, neighbor, label=edge_labels[(vertex, neighbor)])
     
-    # Use a circular layout for the branch nodes
-    center_pos = {0: (0, 0)}  # Center node at origin
-    branch_pos = nx.circular_layout(range(1, n + 1), center=(0, 0))  # Circular layout for branch nodes
-    
-   # Calculate the circular positions for the branch nodes
-    radius = 1  # Radius for branch nodes
-    branch_angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
-    branch_pos = {i: (radius * np.cos(ang), radius * np.sin(ang)) for i, ang in enumerate(branch_angles, 1)}
-
-    # Calculate the positions for the leaf nodes
-    leaf_angles = np.linspace(0, 2 * np.pi, 2*n, endpoint=False)
-    radius_leaf = 1.5  # Radius for leaf nodes
-    leaf_pos = {}
-    for i in range(n):
-        leaf_pos[n + 2 * i + 1] = (radius_leaf * np.cos(leaf_angles[2 * i]), radius_leaf * np.sin(leaf_angles[2 * i]))
-        leaf_pos[n + 2 * i + 2] = (radius_leaf * np.cos(leaf_angles[2 * i + 1]), radius_leaf * np.sin(leaf_angles[2 * i + 1]))
-
-    # Merge all positions together
-    pos = {**center_pos, **branch_pos, **leaf_pos}
+    # Center at the origin, branch nodes on a circle of radius 1, leaf nodes on a circle of radius 1.5
+    pos = radial_layout(graph.n, graph.leaves, arm_radius=1, leaf_radius=1.5)
 
     nx.draw(G, pos, labels = vertex_labels, node_color='lightblue', edge_color='gray', width=2, linewidths=1, node_size=700, font_size=10)
     nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=8)
     plt.title('Snowflake Graph with Edge Irregular K-Labeling')
     plt.axis('off')  # Turn off the axis
-    plt.show()
+    if draw:
+        plt.savefig(draw)
+    if show:
+        plt.show()
+    plt.close()
 
 
 if __name__ == "__main__":
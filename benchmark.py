@@ -0,0 +1,225 @@
+# Scaling benchmarks for every graph family with regression checks against a baseline
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+import instrument
+from export import write_labeling
+from families import build_labeled_graph
+
+PHASES = ('build', 'labeling', 'weights', 'verify', 'output')
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+MIN_TIMED_SECONDS = 20e-3  # Shorter timings are dominated by noise and are not compared or fitted
+MIN_FIT_SPAN = 64  # Exponents are only fitted over points spanning this factor in edges
+MIN_COMPARED_SIZES = 2  # A phase's time is only compared over at least this many sizes
+MIN_TRACKED_BYTES = 1 << 16  # Smaller peaks are allocator noise and are not compared
+
+
+def ladder_params(family, edges):
+    """
+    Maps a target edge count to the family's (n, m).
+
+    problem1 S(n, 3) has 3n edges (n % 4 == 1, where the labeling is undefined, is
+    stepped over), the snowflake 4n, and the generalized star is grown along its
+    diagonal n = m, giving n + n * m edges.
+    """
+    if family == 'problem1':
+        n = max(2, edges // 3)
+        return n + (n % 4 == 1), 3
+    if family == 'star':
+        side = max(1, math.isqrt(edges))
+        return side, side
+    if family == 'snowflake':
+        return max(3, edges // 4), None
+    raise ValueError(f"Unknown graph family: {family}")
+
+
+def edge_ladder(min_edges, max_edges, factor=2):
+    """
+    Geometric ladder of target edge counts from min_edges up to max_edges.
+    """
+    sizes = []
+    size = min_edges
+    while size <= max_edges:
+        sizes.append(int(size))
+        size *= factor
+    return sizes
+
+
+def run_phases(family, n, m, memory=False):
+    """
+    Runs every phase once and returns {phase: {'seconds': ..., 'peak_bytes': ...}}.
+    """
+    instrument.enable(memory=memory)
+    graph = build_labeled_graph(family, n, m)
+    graph.verify()
+    handle, path = tempfile.mkstemp(suffix='.txt')
+    os.close(handle)
+    try:
+        with instrument.span('output'):
+            write_labeling(path, graph.labels, graph.edges)
+    finally:
+        os.remove(path)
+    totals = instrument.disable().report()['totals']
+    return len(graph.edges), {phase: {'seconds': totals[phase]['wall_ns'] / 1e9,
+                                      'peak_bytes': totals[phase]['peak_bytes']}
+                              for phase in PHASES}
+
+
+def benchmark_family(family, sizes, repeat=5, memory=True):
+    """
+    Measures every phase of one family over a ladder of sizes (see benchmark_families).
+
+    Returns:
+        dict: {'points': [...], 'exponents': {phase: slope of log time vs log edges}}.
+    """
+    return benchmark_families([family], sizes, repeat, memory)[family]
+
+
+def benchmark_families(families, sizes, repeat=5, memory=True):
+    """
+    Measures every phase of several families over a ladder of sizes.
+
+    Times are the best of repeat untraced runs, taken in interleaved rounds over every
+    family and size, so that a slow spell of the machine hits all measurements alike
+    rather than all repeats of one of them; peak memory comes from one extra run under
+    tracemalloc, so tracing never inflates the timings.
+
+    Returns:
+        dict: {family: {'points': [...], 'exponents': {phase: slope of log time vs log edges}}}.
+    """
+    jobs = [(family, *ladder_params(family, target)) for family in families for target in sizes]
+    runs = [[] for _ in jobs]
+    for _ in range(repeat):
+        for index, (family, n, m) in enumerate(jobs):
+            runs[index].append(run_phases(family, n, m))
+    points = {family: [] for family in families}
+    for (family, n, m), job_runs in zip(jobs, runs):
+        point = {'n': n, 'm': m, 'edges': job_runs[0][0],
+                 'seconds': {phase: min(run[1][phase]['seconds'] for run in job_runs) for phase in PHASES}}
+        if memory:
+            point['peak_bytes'] = {phase: stats['peak_bytes']
+                                   for phase, stats in run_phases(family, n, m, memory=True)[1].items()}
+        points[family].append(point)
+    return {family: {'points': family_points, 'exponents': fit_exponents(family_points)}
+            for family, family_points in points.items()}
+
+
+def fit_exponents(points):
+    """
+    Fits time ~ c * edges ** k per phase by least squares on the log-log curve.
+
+    Linear phases give k close to 1. Points faster than MIN_TIMED_SECONDS are left
+    out; phases whose usable points do not span MIN_FIT_SPAN in edges get None, since
+    a slope over a short stretch mostly measures timing noise.
+    """
+    exponents = {}
+    for phase in PHASES:
+        usable = [(p['edges'], p['seconds'][phase]) for p in points
+                  if p['edges'] > 0 and p['seconds'][phase] >= MIN_TIMED_SECONDS]
+        if len(usable) < 2 or max(usable)[0] < MIN_FIT_SPAN * min(usable)[0]:
+            exponents[phase] = None
+            continue
+        x, y = np.log(np.array(usable, dtype=float)).T
+        exponents[phase] = float(np.polyfit(x, y, 1)[0])
+    return exponents
+
+
+def compare(results, baseline, tolerance=0.25, exponent_tolerance=0.25, memory_tolerance=0.25):
+    """
+    Lists every phase that regressed against the baseline.
+
+    A phase regresses when its times over the sizes present in both runs are slower
+    than the baseline by more than tolerance (a fraction) on geometric average, when its
+    peak memory at one of those sizes exceeds the baseline by more than
+    memory_tolerance, or when its fitted exponent grows by more than exponent_tolerance.
+    Averaging over the ladder keeps one noisy measurement from failing the run, while a
+    real slowdown shows at every size. Baseline times under MIN_TIMED_SECONDS and peaks
+    under MIN_TRACKED_BYTES are not compared, nor peaks missing from either run; a phase
+    with fewer than MIN_COMPARED_SIZES timed sizes needs a larger --max-edges to be gated.
+
+    Returns:
+        list: Human-readable regression messages; empty when nothing regressed.
+    """
+    regressions = []
+    for family, result in results.items():
+        base = baseline.get(family)
+        if base is None:
+            continue
+        base_points = {p['edges']: p for p in base['points']}
+        pairs = [(base_points[p['edges']], p) for p in result['points'] if p['edges'] in base_points]
+        for phase in PHASES:
+            ratios = [point['seconds'][phase] / reference['seconds'][phase] for reference, point in pairs
+                      if reference['seconds'][phase] >= MIN_TIMED_SECONDS]
+            if len(ratios) >= MIN_COMPARED_SIZES:
+                slowdown = math.exp(sum(map(math.log, ratios)) / len(ratios))
+                if slowdown > 1 + tolerance:
+                    regressions.append(f"{family} {phase}: {slowdown:.2f}x the baseline time "
+                                       f"over {len(ratios)} sizes")
+            for reference, point in pairs:
+                if 'peak_bytes' in reference and 'peak_bytes' in point:
+                    old, new = reference['peak_bytes'][phase], point['peak_bytes'][phase]
+                    if old >= MIN_TRACKED_BYTES and new > old * (1 + memory_tolerance):
+                        regressions.append(f"{family} {phase} at {point['edges']} edges: peak "
+                                           f"{new / 2 ** 20:.2f} MiB vs {old / 2 ** 20:.2f} MiB baseline")
+        for phase in PHASES:
+            old, new = base['exponents'].get(phase), result['exponents'].get(phase)
+            if old is not None and new is not None and new > old + exponent_tolerance:
+                regressions.append(f"{family} {phase} scaling exponent {new:.2f} vs {old:.2f} baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark graph families and check for regressions.")
+    parser.add_argument('--families', nargs='+', default=['problem1', 'star', 'snowflake'],
+                        choices=('problem1', 'star', 'snowflake'))
+    parser.add_argument('--min-edges', type=int, default=1 << 12)
+    parser.add_argument('--max-edges', type=int, default=1 << 20)
+    parser.add_argument('--factor', type=int, default=4, help="growth factor between ladder steps")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced peak-memory run")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown as a fraction")
+    parser.add_argument('--memory-tolerance', type=float, default=0.25,
+                        help="allowed peak memory growth as a fraction")
+    parser.add_argument('--json', metavar='PATH', help="also write the full results to PATH")
+    args = parser.parse_args()
+
+    sizes = edge_ladder(args.min_edges, args.max_edges, args.factor)
+    results = benchmark_families(args.families, sizes, args.repeat, not args.no_memory)
+    for family in args.families:
+        exponents = ', '.join(f"{phase} {k:.2f}" if k is not None else f"{phase} -"
+                              for phase, k in results[family]['exponents'].items())
+        print(f"{family}: scaling exponents {exponents}")
+        for point in results[family]['points']:
+            times = ', '.join(f"{phase} {point['seconds'][phase] * 1000:.2f} ms" for phase in PHASES)
+            print(f"  {point['edges']} edges: {times}")
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as file:
+        regressions = compare(results, json.load(file), args.tolerance,
+                              memory_tolerance=args.memory_tolerance)
+    for message in regressions:
+        print(f"REGRESSION: {message}")
+    print(f"{len(regressions)} regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
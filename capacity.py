@@ -0,0 +1,249 @@
+# Model-driven capacity planning: how large a graph fits in a memory budget
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from families import family_shape
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_MAX_SCALE = 1 << 40  # Guards the search against a model that never exceeds the budget
+
+
+class CapacityPlan:
+    def __init__(self, family, n, m, predicted, model, trials, confirmed):
+        """
+        Result of plan_capacity.
+
+        Args:
+            family (str): The graph family planned for.
+            n (int): Largest confirmed number of arms or branch nodes.
+            m (int): The matching arm size parameter (None for the snowflake).
+            predicted (tuple): (n, m) predicted by the memory model before confirming.
+            model (tuple): (fixed bytes, bytes per vertex, bytes per edge).
+            trials (list): (n, m, fits, peak bytes) of every subprocess trial, in order.
+            confirmed (bool): False if the time budget ran out before the search finished.
+        """
+        self.family = family
+        self.n = n
+        self.m = m
+        self.predicted = predicted
+        self.model = model
+        self.trials = trials
+        self.confirmed = confirmed
+
+    def __repr__(self):
+        return (f"CapacityPlan(family={self.family!r}, n={self.n}, m={self.m}, "
+                f"predicted={self.predicted}, confirmed={self.confirmed})")
+
+
+def scale_to_params(family, t):
+    """
+    Maps a single growth parameter t to (n, m) the way test_limits grows graphs.
+
+    The generalized star grows n and m together; problem1 stays S(n, 3) and skips the
+    n % 4 == 1 values its labeling does not cover; the snowflake only has n.
+    """
+    if family == 'star':
+        return t, t
+    if family == 'problem1':
+        return (t + 1 if t % 4 == 1 else t), 3
+    return t, None
+
+
+def graph_size(family, n, m):
+    """
+    Returns (vertices, edges) of a family member.
+    """
+    n, m, leaves = family_shape(family, n, m)
+    if family == 'snowflake':
+        return 1 + n + n * leaves, n * (leaves + 2)
+    return 1 + n + n * leaves, n + n * leaves
+
+
+def _model_bytes(model, family, t):
+    vertices, edges = graph_size(family, *scale_to_params(family, t))
+    fixed, per_vertex, per_edge = model
+    return fixed + per_vertex * vertices + per_edge * edges
+
+
+def _largest_scale(predicate, low=1):
+    """
+    Largest t >= low with predicate(t) true, for a predicate that is true then false.
+    """
+    if not predicate(low):
+        return None
+    high = low
+    while high < _MAX_SCALE and predicate(high * 2):
+        high *= 2
+    if high >= _MAX_SCALE:
+        return high
+    low, high = high, high * 2
+    while high - low > 1:
+        mid = (low + high) // 2
+        if predicate(mid):
+            low = mid
+        else:
+            high = mid
+    return low
+
+
+def run_trial(family, n, m, budget_bytes, timeout_seconds=None):
+    """
+    Builds one labeled graph in a fresh interpreter and reports its peak memory.
+
+    The child measures the growth of its peak RSS over the baseline after imports,
+    so garbage from earlier builds can never leak into the measurement.
+
+    Returns:
+        tuple: (fits, peak bytes or None).
+    """
+    command = [sys.executable, os.path.join(_HERE, 'capacity.py'), '--trial',
+               family, str(n), str(m), str(int(budget_bytes))]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, cwd=_HERE,
+                                   timeout=timeout_seconds)
+    except subprocess.TimeoutExpired:
+        return False, None
+    if completed.returncode != 0 or not completed.stdout.strip():
+        return False, None  # Killed or crashed, e.g. by the OOM killer
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    return report['fits'], report['peak_bytes']
+
+
+def fit_memory_model(samples):
+    """
+    Least-squares fit of bytes = fixed + per_vertex * V + per_edge * E.
+
+    For trees E = V - 1, so only the combined slope is identifiable; lstsq then
+    returns the minimum-norm split, which predicts the same totals.
+
+    Args:
+        samples (list): (vertices, edges, peak bytes) measurements.
+
+    Returns:
+        tuple: (fixed bytes, bytes per vertex, bytes per edge).
+    """
+    design = np.array([[1.0, v, e] for v, e, _ in samples])
+    observed = np.array([float(peak) for _, _, peak in samples])
+    coefficients, *_ = np.linalg.lstsq(design, observed, rcond=None)
+    return tuple(float(c) for c in coefficients)
+
+
+def plan_capacity(family, budget_bytes, min_scale=1, resolution=1, sample_edges=(1 << 17, 1 << 18, 1 << 19, 1 << 20),
+                  timeout_seconds=300):
+    """
+    Predicts and confirms the largest graph of a family that fits in budget_bytes.
+
+    A few small builds fit a per-vertex/per-edge memory model, which predicts the
+    largest growth parameter t. Exponential search from the prediction followed by
+    bisection then confirms it, every trial running in its own subprocess.
+
+    Args:
+        family (str): 'problem1', 'star' or 'snowflake'.
+        budget_bytes (float): Memory budget for one build.
+        min_scale (int): Smallest growth parameter to consider.
+        resolution (int): Stop bisecting once the bracket is this narrow.
+        sample_edges (tuple): Approximate edge counts of the calibration builds.
+        timeout_seconds (float): Overall time budget; the best confirmed value so far
+            is returned when it runs out.
+
+    Returns:
+        CapacityPlan: The confirmed (n, m) and the evidence behind it.
+    """
+    deadline = time.time() + timeout_seconds
+    trials = []
+
+    def trial(t):
+        n, m = scale_to_params(family, t)
+        fits, peak = run_trial(family, n, m, budget_bytes, max(1.0, deadline - time.time()))
+        trials.append((n, m, fits, peak))
+        return fits, peak
+
+    # Calibration builds at roughly the requested edge counts
+    samples = []
+    for target in sample_edges:
+        t = _largest_scale(lambda s: graph_size(family, *scale_to_params(family, s))[1] <= target, min_scale)
+        fits, peak = trial(t or min_scale)
+        if not fits or peak is None:
+            break
+        samples.append((*graph_size(family, *scale_to_params(family, t or min_scale)), peak))
+    if len(samples) < 2:
+        raise RuntimeError("Not enough calibration builds fit in the memory budget")
+    model = fit_memory_model(samples)
+
+    predicted = _largest_scale(lambda s: _model_bytes(model, family, s) <= budget_bytes, min_scale) or min_scale
+
+    # Exponential search outward from the prediction to bracket the real limit
+    low = high = None
+    step = max(resolution, predicted // 64)  # The model is usually within a few percent
+    if trial(predicted)[0]:
+        low = predicted
+        while time.time() < deadline:
+            if trial(low + step)[0]:
+                low += step
+                step *= 2
+            else:
+                high = low + step
+                break
+    else:
+        high = predicted
+        while time.time() < deadline and high > min_scale:
+            candidate = max(min_scale, high - step)
+            if trial(candidate)[0]:
+                low = candidate
+                break
+            high = candidate
+            step *= 2
+
+    # Bisection inside the bracket
+    while low is not None and high is not None and high - low > resolution and time.time() < deadline:
+        mid = (low + high) // 2
+        if trial(mid)[0]:
+            low = mid
+        else:
+            high = mid
+
+    confirmed = low is not None and high is not None and high - low <= resolution
+    best = low if low is not None else min_scale
+    n, m = scale_to_params(family, best)
+    return CapacityPlan(family, n, m, scale_to_params(family, predicted), model, trials, confirmed)
+
+
+def _trial_main(family, n, m, budget_bytes):
+    """
+    Child side of run_trial: build once and print a JSON report on stdout.
+    """
+    import resource
+
+    from families import build_labeled_graph
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    try:
+        # Cap the address space so an oversized trial fails with MemoryError
+        with open('/proc/self/statm') as statm:
+            virtual = int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+        limit = virtual + int(budget_bytes * 1.25)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+    except (OSError, ValueError):
+        pass
+
+    try:
+        graph = build_labeled_graph(family, n, m)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - baseline
+        fits = peak <= budget_bytes
+        del graph
+    except MemoryError:
+        peak, fits = None, False
+    print(json.dumps({'fits': fits, 'peak_bytes': peak}))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 6 and sys.argv[1] == '--trial':
+        _family, _n, _m, _budget = sys.argv[2:]
+        _trial_main(_family, int(_n), None if _m == 'None' else int(_m), float(_budget))
+    else:
+        print("Usage: capacity.py --trial FAMILY N M BUDGET_BYTES")
@@ -0,0 +1,124 @@
+# Headless command-line entry point for building, labeling and verifying any family
+import time
+
+_STARTED = time.perf_counter()  # Taken before any other import so startup cost is measured
+
+import argparse
+import sys
+
+from export import write_labeling
+from families import build_labeled_graph
+from instrument import enable, span, write_report
+from label_cache import DEFAULT_CACHE_DIR, open_cache
+
+_IMPORTED = time.perf_counter()
+
+# Modules whose import is deferred to the paths that need them
+HEAVY_MODULES = ('networkx', 'matplotlib', 'psutil')
+
+
+def add_graph_arguments(parser, family=None):
+    """
+    Adds the shared --n/--m/--verify/--output/--draw/--cache options to parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser to extend.
+        family (str, optional): Family the calling script is fixed to; when None a
+            required --family option is added as well.
+    """
+    if family is None:
+        parser.add_argument('--family', choices=('problem1', 'star', 'snowflake'), required=True)
+    parser.add_argument('--n', type=int, required=family is None, help="number of arms or branch nodes")
+    parser.add_argument('--m', type=int, default=None, help="arm size parameter (leaves per branch for the snowflake)")
+    parser.add_argument('--verify', action='store_true', help="check that all edge weights are distinct")
+    parser.add_argument('--output', metavar='PATH', help="write vertex labels and edge weights to PATH")
+    parser.add_argument('--draw', metavar='PATH', help="render the labeled drawing to an image file")
+    parser.add_argument('--cache', metavar='DIR', nargs='?', const=DEFAULT_CACHE_DIR,
+                        help="reuse labelings stored in DIR (default: %(const)s), adding new ones")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="write per-phase wall time and memory peaks as JSON to PATH ('-' for stdout)")
+    return parser
+
+
+def open_label_cache(args):
+    """
+    Returns the LabelCache selected by --cache, or None when caching is off.
+    """
+    return open_cache(args.cache) if args.cache else None
+
+
+def start_profile(args):
+    """
+    Enables instrumentation when --profile was given.
+    """
+    if args.profile:
+        enable()
+
+
+def finish_profile(args, family):
+    """
+    Writes the --profile report, tagged with the run's family and parameters.
+    """
+    if args.profile:
+        write_report(args.profile, family=family, n=args.n, m=args.m)
+
+
+def report_timing(stream=sys.stderr):
+    """
+    Prints how long the entry point took to import and run, and which heavy modules it loaded.
+    """
+    now = time.perf_counter()
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules] or ['none']
+    print(f"import: {(_IMPORTED - _STARTED) * 1000:.1f} ms, "
+          f"total since start: {(now - _STARTED) * 1000:.1f} ms, "
+          f"heavy modules loaded: {', '.join(loaded)}", file=stream)
+
+
+def main(argv=None):
+    parser = add_graph_arguments(argparse.ArgumentParser(
+        description="Build, label and verify a star or snowflake graph without prompts."))
+    parser.add_argument('--binary', metavar='PATH', help="write the labeling in the binary format of labeling_file.py")
+    parser.add_argument('--timing', action='store_true', help="report import and startup time on stderr")
+    parser.add_argument('--workers', type=int, default=1, help="processes for --verify (see parallel_verify.py)")
+    args = parser.parse_args(argv)
+    start_profile(args)
+
+    cache = open_label_cache(args)
+    try:
+        labels = cache.get(args.family, args.n, args.m) if cache else None
+        graph = build_labeled_graph(args.family, args.n, args.m, labels=labels)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"{args.family} n={graph.n} m={graph.m}: {graph.order} vertices, "
+          f"{len(graph.edges)} edges, k={graph.k}")
+
+    status = 0
+    if args.verify:
+        if args.workers > 1:
+            with span('verify'):
+                from parallel_verify import verify_graph_parallel
+                result = verify_graph_parallel(graph, args.workers)
+        else:
+            result = graph.verify()
+        print(f"All edge values are unique: {result.unique}")
+        print(f"Maximum edge weight value: {result.max_weight}")
+        status = 0 if result.unique else 1
+    if args.output:
+        with span('output'):
+            write_labeling(args.output, graph.labels, graph.edges)
+    if args.binary:
+        with span('output'):
+            from labeling_file import save_graph
+            save_graph(args.binary, graph)
+    if args.draw:
+        with span('draw'):
+            from render import render_graph  # Pulls in matplotlib and networkx
+            render_graph(graph, args.draw)
+    finish_profile(args, args.family)
+    if args.timing:
+        report_timing()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
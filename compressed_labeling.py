@@ -0,0 +1,368 @@
+# Star labelings stored as per-arm arithmetic progressions, verified without expansion
+from bisect import bisect_right
+from math import gcd
+
+import numpy as np
+
+from families import family_shape
+from implicit_graph import ImplicitStar
+from labeling import inner_vertex_labels
+from verify import VerificationResult
+
+
+def arithmetic_runs(values):
+    """
+    Splits a sequence into maximal arithmetic runs.
+
+    Returns:
+        tuple: (start index, base, stride, count) int64 arrays, one entry per run.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    if values.size == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty
+    step = np.diff(values)
+    # Last step index of every maximal constant-step segment
+    ends = np.append(np.nonzero(step[1:] != step[:-1])[0], step.size - 1)
+    starts, counts = [], []
+    position = 0
+    while position < values.size:  # One iteration per run
+        starts.append(position)
+        if position == values.size - 1:
+            counts.append(1)
+            break
+        end = int(ends[np.searchsorted(ends, position)]) + 1
+        counts.append(end - position + 1)
+        position = end + 1
+    starts = np.array(starts, dtype=np.int64)
+    counts = np.array(counts, dtype=np.int64)
+    strides = np.zeros_like(counts)
+    strides[counts > 1] = step[starts[counts > 1]]
+    return starts, values[starts], strides, counts
+
+
+def _common_starts(first, stride, count, other_first, other_stride, other_count):
+    """
+    Intersects one arithmetic progression with many that share a stride.
+
+    Strides are positive. Returns the first common term of every pair, as an int64
+    array, and a mask of the pairs that have one; the common terms of a pair then
+    continue in steps of lcm(stride, other_stride).
+    """
+    other_first = np.asarray(other_first, dtype=np.int64)
+    other_count = np.asarray(other_count, dtype=np.int64)
+    g = gcd(stride, other_stride)
+    step = stride // g * other_stride
+    # first + stride * i == other_first (mod other_stride), solved for i
+    modulus = other_stride // g
+    inverse = pow(stride // g, -1, modulus)
+    i = (other_first - first) // g % modulus * inverse % modulus
+    low = np.maximum(first, other_first)
+    high = np.minimum(first + stride * (count - 1), other_first + other_stride * (other_count - 1))
+    start = low + (first + stride * i - low) % step
+    return start, ((other_first - first) % g == 0) & (start <= high)
+
+
+def _common_terms(first, stride, count, other_first, other_stride, other_count):
+    """
+    Intersects two arithmetic progressions with positive strides.
+
+    Returns:
+        tuple: (first, stride, count) of the common terms, or None if there are none.
+    """
+    start, found = _common_starts(first, stride, count, [other_first], other_stride, [other_count])
+    if not found[0]:
+        return None
+    step = stride // gcd(stride, other_stride) * other_stride
+    high = min(first + stride * (count - 1), other_first + other_stride * (other_count - 1))
+    return int(start[0]), step, (high - int(start[0])) // step + 1
+
+
+class ArmTemplateLabeling(ImplicitStar):
+    def __init__(self, n, leaves, center, arm_runs, leaf_base, leaf_stride):
+        """
+        Star labeling stored as arithmetic progressions instead of one label per vertex.
+
+        The arm labels are a few (first arm, base, stride, count) runs, and the leaves of
+        arm i are labeled leaf_base[i] + j * leaf_stride[i] for j = 0..leaves - 1, so
+        memory is O(n) whatever the number of leaves. Every edge weight run is then an
+        arithmetic progression too, which lets verify() check uniqueness on the runs.
+        Structure queries and edge_chunks come from ImplicitStar, with the same vertex
+        ids: center 0, arms 1..n, leaf j of arm i at n + (i - 1) * leaves + j.
+
+        Args:
+            n (int): The number of arms.
+            leaves (int): The number of leaves on each arm.
+            center (int): Label of the center.
+            arm_runs (tuple): (start, base, stride, count) arrays over arm indices 0..n-1,
+                as returned by arithmetic_runs.
+            leaf_base (array-like): Label of the first leaf of every arm.
+            leaf_stride (array-like): Label step between consecutive leaves of every arm.
+        """
+        super().__init__(n, leaves)
+        self.labeling = 'arm-template'
+        self.center = int(center)
+        self.arm_start, self.arm_base, self.arm_stride, self.arm_count = (
+            np.asarray(column, dtype=np.int64) for column in arm_runs)
+        self.leaf_base = np.asarray(leaf_base, dtype=np.int64)
+        self.leaf_stride = np.asarray(leaf_stride, dtype=np.int64)
+        if int(self.arm_count.sum()) != n or self.leaf_base.size != n or self.leaf_stride.size != n:
+            raise ValueError("Arm runs and leaf progressions must cover exactly n arms")
+
+    @classmethod
+    def from_labels(cls, n, leaves, labels):
+        """
+        Compresses a label array of the star with n arms and the given leaves per arm.
+
+        Raises:
+            ValueError: If some arm's leaf labels are not an arithmetic progression.
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        if labels.size != 1 + n + n * leaves:
+            raise ValueError(f"Expected {1 + n + n * leaves} labels, got {labels.size}")
+        grid = labels[n + 1:].reshape(n, leaves)
+        base = grid[:, 0] if leaves else np.zeros(n, dtype=np.int64)
+        stride = grid[:, 1] - grid[:, 0] if leaves > 1 else np.zeros(n, dtype=np.int64)
+        if leaves > 2 and np.any(np.diff(grid, axis=1) != stride[:, None]):
+            raise ValueError("Leaf labels are not an arithmetic progression on every arm")
+        return cls(n, leaves, labels[0], arithmetic_runs(labels[1:n + 1]), base, stride)
+
+    def arm_labels(self):
+        """
+        Labels of the arm vertices 1..n, expanded from the runs (O(n)).
+        """
+        return np.repeat(self.arm_base - self.arm_stride * self.arm_start, self.arm_count) + \
+            np.repeat(self.arm_stride, self.arm_count) * np.arange(self.n, dtype=np.int64)
+
+    def runs(self):
+        """
+        Yields (first vertex, base, stride, count) for every label run in vertex order:
+        the center, the arm runs, then one run per arm's leaves.
+        """
+        yield 0, self.center, 0, 1
+        for start, base, stride, count in zip(self.arm_start.tolist(), self.arm_base.tolist(),
+                                              self.arm_stride.tolist(), self.arm_count.tolist()):
+            yield start + 1, base, stride, count
+        if self.leaves:
+            for arm, (base, stride) in enumerate(zip(self.leaf_base.tolist(), self.leaf_stride.tolist())):
+                yield self.n + arm * self.leaves + 1, base, stride, self.leaves
+
+    def __iter__(self):
+        """
+        Iterates over the labels of vertices 0, 1, ... in order.
+        """
+        for _, base, stride, count in self.runs():
+            yield from range(base, base + stride * count, stride) if stride else [base] * count
+
+    def __len__(self):
+        return self.order
+
+    def label(self, v):
+        """
+        Returns the label of vertex v.
+        """
+        self._check(v)
+        if v == 0:
+            return self.center
+        if v <= self.n:
+            run = bisect_right(self.arm_start, v - 1) - 1
+            return int(self.arm_base[run] + self.arm_stride[run] * (v - 1 - self.arm_start[run]))
+        arm, j = divmod(v - self.n - 1, self.leaves)
+        return int(self.leaf_base[arm] + self.leaf_stride[arm] * j)
+
+    def labels_of(self, vertices):
+        """
+        Vectorized label(v) over an integer array of vertex ids.
+        """
+        v = np.asarray(vertices, dtype=np.int64)
+        arm_index = np.clip(v - 1, 0, max(self.n - 1, 0))
+        run = np.searchsorted(self.arm_start, arm_index, side='right') - 1
+        arm_label = self.arm_base[run] + self.arm_stride[run] * (arm_index - self.arm_start[run]) \
+            if self.n else np.zeros(v.shape, dtype=np.int64)
+        leaf_index = np.maximum(v - self.n - 1, 0)
+        arm = np.minimum(leaf_index // max(self.leaves, 1), max(self.n - 1, 0))
+        j = leaf_index % max(self.leaves, 1)
+        leaf_label = self.leaf_base[arm] + self.leaf_stride[arm] * j if self.n else arm_label
+        return np.where(v == 0, self.center, np.where(v <= self.n, arm_label, leaf_label))
+
+    def _label_ends(self):
+        # Smallest and largest label of every run, in the order of runs()
+        bases = [np.array([self.center]), self.arm_base]
+        lasts = [np.array([self.center]), self.arm_base + self.arm_stride * (self.arm_count - 1)]
+        if self.leaves:
+            bases.append(self.leaf_base)
+            lasts.append(self.leaf_base + self.leaf_stride * (self.leaves - 1))
+        bases, lasts = np.concatenate(bases), np.concatenate(lasts)
+        return np.minimum(bases, lasts), np.maximum(bases, lasts)
+
+    def min_label(self):
+        """
+        Returns the smallest vertex label in O(n).
+        """
+        return int(self._label_ends()[0].min())
+
+    def max_label(self):
+        """
+        Returns the largest vertex label (the k of the labeling) in O(n).
+        """
+        return int(self._label_ends()[1].max())
+
+    def weight_runs(self):
+        """
+        Describes every edge weight as part of an arithmetic progression.
+
+        The center-arm edges of each arm run form one progression, and the edges from
+        arm i to its leaves form another, so there are O(n) runs for n * (leaves + 1) edges.
+
+        Returns:
+            tuple: (first, stride, count, u, v) int64 arrays; term t of run r is the
+            weight of edge (u[r], v[r] + t).
+        """
+        arm_labels = self.arm_labels()
+        first = [self.center + self.arm_base]
+        stride = [self.arm_stride]
+        count = [self.arm_count]
+        u = [np.zeros(self.arm_start.size, dtype=np.int64)]
+        v = [self.arm_start + 1]
+        if self.leaves:
+            first.append(arm_labels + self.leaf_base)
+            stride.append(self.leaf_stride)
+            count.append(np.full(self.n, self.leaves, dtype=np.int64))
+            u.append(np.arange(1, self.n + 1, dtype=np.int64))
+            v.append(self.n + np.arange(self.n, dtype=np.int64) * self.leaves + 1)
+        return tuple(np.concatenate(column) for column in (first, stride, count, u, v))
+
+    def max_weight(self):
+        """
+        Returns the largest edge weight in O(n).
+        """
+        first, stride, count, _, _ = self.weight_runs()
+        return int(np.maximum(first, first + stride * (count - 1)).max()) if first.size else 0
+
+    def verify(self, collisions=False):
+        """
+        Checks that all edge weights are distinct without expanding the runs.
+
+        Runs are normalized to increasing progressions (a single term gets stride 1).
+        A run with stride 0 and several terms repeats its weight, and is otherwise
+        treated as a single term. Runs with the same
+        stride s only meet when their first terms agree mod s, and then as intervals,
+        so each (s, first mod s) class is sorted and checked for overlapping neighbours.
+        Runs whose stride differs from the most common one are intersected with every
+        run of another stride whose range overlaps theirs, by the Chinese remainder
+        theorem. For the star constructions only the few center-arm runs are in that
+        case, so the check is O(n log n) against O(n * leaves) edges.
+
+        Args:
+            collisions (bool): Whether to build the weight -> edges collision report,
+                in the format of verify.verify_edge_weights.
+
+        Returns:
+            VerificationResult: The outcome; edges_checked is the number of edges.
+        """
+        first, stride, count, u, v = self.weight_runs()
+        last = first + stride * (count - 1)
+        low, high = np.minimum(first, last), np.maximum(first, last)
+        largest = int(high.max()) if high.size else 0
+        # A run with stride 0 repeats its weight; from here on it stands for one term
+        flat = (stride == 0) & (count > 1)
+        pairs = [(run, run) for run in np.nonzero(flat)[0].tolist()]
+        step = np.where((count > 1) & ~flat, np.abs(stride), 1)
+        terms = np.where(flat, 1, count)
+
+        # Same stride: progressions of one residue class are intervals in steps of s
+        residue = low % step
+        order = np.lexsort((low, residue, step))
+        same = (step[order][1:] == step[order][:-1]) & (residue[order][1:] == residue[order][:-1])
+        overlap = same & (low[order][1:] <= high[order][:-1])
+        if collisions:
+            pairs.extend(self._class_overlaps(order, step, residue, low, high))
+        elif overlap.any():
+            return VerificationResult(False, largest, int(count.sum()))
+
+        # Different strides: everything outside the most common stride against the rest
+        strides, sizes = np.unique(step, return_counts=True)
+        common = strides[np.argmax(sizes)] if strides.size else 0
+        for run in np.nonzero(step != common)[0].tolist():
+            others = np.nonzero((step != step[run]) & (low <= high[run]) & (high >= low[run]) &
+                                ((step == common) | (np.arange(step.size) > run)))[0]
+            for other_step in np.unique(step[others]).tolist():
+                group = others[step[others] == other_step]
+                _, found = _common_starts(int(low[run]), int(step[run]), int(terms[run]),
+                                          low[group], other_step, terms[group])
+                if found.any() and not collisions:
+                    return VerificationResult(False, largest, int(count.sum()))
+                pairs.extend((run, other) for other in group[found].tolist())
+
+        report = self._report(pairs, first, stride, count, low, step, terms, u, v) if collisions and pairs else None
+        return VerificationResult(not pairs, largest, int(count.sum()), report)
+
+    @staticmethod
+    def _class_overlaps(order, step, residue, low, high):
+        """
+        Lists every overlapping pair of runs inside each (stride, residue) class.
+        """
+        pairs = []
+        active = []
+        previous = None
+        for run in order.tolist():
+            key = (int(step[run]), int(residue[run]))
+            if key != previous:
+                active, previous = [], key
+            active = [other for other in active if high[other] >= low[run]]
+            pairs.extend((other, run) for other in active)
+            active.append(run)
+        return pairs
+
+    @staticmethod
+    def _report(pairs, first, stride, count, low, step, terms, u, v):
+        """
+        Expands the colliding run pairs into {weight: [edge, ...]}, edges in stream order.
+        """
+        report = {}
+        for run, other in pairs:
+            if run == other:  # Stride 0: every term has the same weight
+                weights = [int(first[run])]
+            else:
+                common = _common_terms(int(low[run]), int(step[run]), int(terms[run]),
+                                       int(low[other]), int(step[other]), int(terms[other]))
+                weights = range(common[0], common[0] + common[1] * common[2], common[1])
+            for weight in weights:
+                edges = report.setdefault(weight, set())
+                for r in (run, other):
+                    ts = range(int(count[r])) if stride[r] == 0 else [(weight - int(first[r])) // int(stride[r])]
+                    edges.update((int(u[r]), int(v[r]) + t) for t in ts)
+        return {weight: sorted(edges, key=lambda edge: (edge[1], 0) if edge[0] == 0 else edge)
+                for weight, edges in sorted(report.items())}
+
+
+def compressed_labeling(family, n, m=None):
+    """
+    Builds the compressed labeling of a star family straight from its formulas.
+
+    Memory and time are O(n): nothing proportional to the number of leaves is built.
+
+    Args:
+        family (str): 'problem1' (S(n, 3), two leaves per arm) or 'star' (m leaves per arm).
+        n (int): The number of arms.
+        m (int, optional): Arm size parameter with the meaning used by families.family_shape.
+
+    Returns:
+        ArmTemplateLabeling: The labeling, equal vertex by vertex to families.family_labels.
+    """
+    n, m, leaves = family_shape(family, n, m)
+    if family == 'snowflake':
+        raise ValueError("Only the star families have an arm-template labeling")
+    inner = inner_vertex_labels(n)
+    if family == 'problem1':
+        if n % 4 == 1:
+            raise ValueError(f"S(n, 3) labeling is not defined for n % 4 == 1 (n = {n})")
+        c = -(-n // 4)
+        arm = np.arange(1, n + 1, dtype=np.int64)
+        # Leaf j = 1, 2 of arm i: j + 1 on the first ceil(n / 4) arms, n + i + j - 1 - 2c after
+        base = np.where(arm <= c, 2, n + arm - 2 * c)
+        stride = np.ones(n, dtype=np.int64)
+    else:
+        base = inner + max(n, m)
+        stride = np.full(n, max(n, m), dtype=np.int64)
+    return ArmTemplateLabeling(n, leaves, 1, arithmetic_runs(inner), base, stride)
@@ -0,0 +1,392 @@
+# Differential testing: the fast labeling engines against the original dict-based scripts
+import argparse
+import math
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from compressed_labeling import compressed_labeling
+from families import build_labeled_graph, family_shape
+from growth import GrowableStar
+from implicit_graph import implicit_graph
+
+
+# Reference implementations ----------------------------------------------------------
+#
+# Straight ports of the original loops of problem1_Ashna.py / new.py (vertex_k_labeling and
+# calculate_edge_weights), Problem2_Melisa.py (build_graph, vertex_k_labeling) and
+# Problem3_Alex.py (main, assign_labels), on dict adjacency lists and dict labels. They
+# are kept deliberately naive: they define what every fast engine has to reproduce.
+
+def _reference_weights(adj_list, vertex_labels):
+    edge_weights = {}
+    for vertex, neighbors in adj_list.items():
+        for neighbor in neighbors:
+            weight = vertex_labels[vertex] + vertex_labels[neighbor]
+            edge_weights[(vertex, neighbor)] = weight
+            edge_weights[(neighbor, vertex)] = weight
+    return edge_weights
+
+
+def _add_edge(adj_list, u, v):
+    adj_list[u].append(v)
+    adj_list[v].append(u)
+
+
+def reference_problem1(n):
+    """
+    S(n, 3) as built by problem1_Ashna.py: labels and edge weights as dicts.
+
+    For n % 4 == 1 the original leaves the labels at None and the weight loop fails,
+    so this raises TypeError there, like the script.
+    """
+    order = 3 * n + 1
+    adj_list = {i: [] for i in range(order)}
+    outer_verts = n
+    for i in range(1, n + 1):
+        _add_edge(adj_list, 0, i)
+        for j in range(1, 3):
+            outer_verts += 1
+            _add_edge(adj_list, i, outer_verts)
+
+    vertex_labels = {i: None for i in range(order)}
+    vertex_labels[0] = 1
+    if n % 4 == 0 or n % 4 == 2 or n % 4 == 3:
+        for i in range(1, n + 1):
+            vertex = i
+            if 1 <= i <= math.ceil(n / 4) + 1:
+                vertex_labels[vertex] = 3 * i - 2
+            elif math.ceil(n / 4) + 1 <= i <= n:
+                vertex_labels[vertex] = 2 * math.ceil(n / 4) + i
+        vertex += 1
+        for i in range(1, (math.ceil(n / 4) + 1)):
+            for j in range(1, 3):
+                vertex_labels[vertex] = j + 1
+                vertex = vertex + 1
+        for i in range((math.ceil(n / 4) + 1), n + 1):
+            for j in range(1, 3):
+                vertex_labels[vertex] = n + i + j - 1 - 2 * math.ceil(n / 4)
+                vertex = vertex + 1
+    return vertex_labels, _reference_weights(adj_list, vertex_labels)
+
+
+def reference_star(n, m):
+    """
+    Generalized star as built by Problem2_Melisa.py: labels and edge weights as dicts.
+    """
+    order = n * m + 1 + n
+    adj_list = {i: [] for i in range(order)}
+    vertex_labels = {0: 1}
+    for i in range(1, n + 1):
+        if 1 <= i <= math.ceil(n / 4) + 1:
+            vertex_labels[i] = 3 * i - 2
+        else:
+            vertex_labels[i] = 2 * math.ceil(n / 4) + i
+    vertex = n + 1
+    for i in range(1, n + 1):
+        base_label = vertex_labels[i]
+        increment = max(n, m)
+        for j in range(1, m + 1):
+            vertex_labels[vertex] = base_label + j * increment
+            vertex += 1
+    for arm in range(1, n + 1):
+        _add_edge(adj_list, 0, arm)
+        for leaf in range(1, m + 1):
+            _add_edge(adj_list, arm, n + (arm - 1) * m + leaf)
+    return vertex_labels, _reference_weights(adj_list, vertex_labels)
+
+
+def reference_snowflake(n, leaves=2):
+    """
+    Snowflake as built by Problem3_Alex.py: labels and edge weights as dicts.
+
+    The original assign_labels steps branches by 4 and gives leaves +1 and +3; with
+    other leaf counts the step is 2 * leaves and the offsets 1, 3, ..., 2 * leaves - 1.
+    """
+    order = 1 + n + leaves * n
+    adj_list = {i: [] for i in range(order)}
+    for i in range(1, n + 1):
+        _add_edge(adj_list, 0, i)
+        for j in range(1, leaves + 1):
+            _add_edge(adj_list, i, n + leaves * (i - 1) + j)
+        _add_edge(adj_list, i, i % n + 1)
+
+    vertex_labels = {0: 1}
+    inner_verts = 11
+    for vert in range(1, n + 1):
+        vertex_labels[vert] = inner_verts
+        inner_verts += 2 * leaves
+    vert = n
+    for i in range(1, n + 1):
+        branch_val = vertex_labels[i]
+        for j in range(1, 2 * leaves, 2):
+            vert = vert + 1
+            vertex_labels[vert] = branch_val + j
+    return vertex_labels, _reference_weights(adj_list, vertex_labels)
+
+
+def reference(family, n, m=None):
+    """
+    Runs the reference implementation of a family (m as in families.family_shape).
+
+    Returns:
+        tuple: (vertex_labels, edge_weights) dicts, the weights keyed by both (u, v) and (v, u).
+    """
+    n, m, leaves = family_shape(family, n, m)
+    if family == 'problem1':
+        return reference_problem1(n)
+    if family == 'star':
+        return reference_star(n, m)
+    return reference_snowflake(n, leaves)
+
+
+# Fast engines -------------------------------------------------------------------------
+#
+# Each engine returns (labels, u, v, weight) arrays for a family member, and raises
+# ValueError where the labeling is not defined.
+
+def _arrays_engine(family, n, m):
+    graph = build_labeled_graph(family, n, m)
+    return graph.labels, graph.edges.u, graph.edges.v, graph.edges.weight
+
+
+def _chunked(graph):
+    labels = graph.labels_of(np.arange(graph.order, dtype=np.int64))
+    chunks = list(graph.edge_chunks())
+    if not chunks:
+        return labels, *(np.zeros(0, dtype=np.int64) for _ in range(3))
+    return (labels, *(np.concatenate(column) for column in zip(*chunks)))
+
+
+def _implicit_engine(family, n, m):
+    if family == 'problem1' and n % 4 == 1:
+        raise ValueError(f"S(n, 3) labeling is not defined for n % 4 == 1 (n = {n})")
+    return _chunked(implicit_graph(family, n, m))
+
+
+def _compressed_engine(family, n, m):
+    return _chunked(compressed_labeling(family, n, m))
+
+
+def _growth_engine(family, n, m):
+    star = GrowableStar(n, m)
+    return (star.labels, *star.edge_arrays())
+
+
+ENGINES = {
+    'arrays': (_arrays_engine, ('problem1', 'star', 'snowflake')),
+    'implicit': (_implicit_engine, ('problem1', 'star', 'snowflake')),
+    'compressed': (_compressed_engine, ('problem1', 'star')),
+    'growth': (_growth_engine, ('star',)),
+}
+
+
+def _canonical(order, u, v, weight):
+    """
+    Sorts undirected edges by (min, max) endpoint, keeping each edge once.
+
+    Returns:
+        tuple: (edge keys min * order + max, weights), both int64 arrays.
+    """
+    u, v = np.asarray(u, dtype=np.int64), np.asarray(v, dtype=np.int64)
+    key = np.minimum(u, v) * order + np.maximum(u, v)
+    key, first = np.unique(key, return_index=True)
+    return key, np.asarray(weight, dtype=np.int64)[first]
+
+
+def _reference_arrays(vertex_labels, edge_weights):
+    order = len(vertex_labels)
+    labels = np.fromiter((vertex_labels[vertex] for vertex in range(order)), dtype=np.int64, count=order)
+    pairs = np.array([(u, v, w) for (u, v), w in edge_weights.items() if u <= v], dtype=np.int64).reshape(-1, 3)
+    return (labels, *_canonical(order, pairs[:, 0], pairs[:, 1], pairs[:, 2]))
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    try:
+        outcome = function(*args)
+    except (ValueError, TypeError) as error:
+        outcome = error
+    return outcome, time.perf_counter() - start
+
+
+def _mismatch(expected, actual):
+    """
+    Describes how an engine's outcome differs from the reference's, or returns None.
+    """
+    if isinstance(expected, Exception) or isinstance(actual, Exception):
+        if isinstance(expected, Exception) and isinstance(actual, Exception):
+            return None  # Undefined in both
+        if isinstance(expected, Exception):
+            return f"reference fails ({type(expected).__name__}: {expected}) but the engine does not"
+        return f"engine fails ({type(actual).__name__}: {actual})"
+    labels, key, weight = expected
+    actual_labels = np.asarray(actual[0], dtype=np.int64)
+    if not np.array_equal(labels, actual_labels):
+        if labels.shape != actual_labels.shape:
+            return f"{actual_labels.size} labels instead of {labels.size}"
+        vertex = int(np.nonzero(labels != actual_labels)[0][0])
+        return f"label of vertex {vertex} is {actual_labels[vertex]}, expected {labels[vertex]}"
+    actual_key, actual_weight = _canonical(labels.size, *actual[1:])
+    if not np.array_equal(key, actual_key):
+        return f"{actual_key.size} edges instead of {key.size}, or different endpoints"
+    if not np.array_equal(weight, actual_weight):
+        row = int(np.nonzero(weight != actual_weight)[0][0])
+        edge = divmod(int(key[row]), labels.size)
+        return f"weight of edge {edge} is {actual_weight[row]}, expected {weight[row]}"
+    return None
+
+
+def run_case(family, n, m=None, engines=None):
+    """
+    Runs the reference and every applicable engine on one family member and compares them.
+
+    Args:
+        family (str): 'problem1', 'star' or 'snowflake'.
+        n (int): The number of arms or branch nodes.
+        m (int, optional): Arm size parameter, as in families.family_shape.
+        engines (iterable, optional): Names from ENGINES, defaults to all of them.
+
+    Returns:
+        dict: 'family', 'n', 'm', 'edges', 'reference' (seconds, including the conversion
+            of its dicts to arrays) and 'engines', mapping each engine name to
+            {'seconds': ..., 'mismatch': description or None}.
+    """
+    outcome, seconds = _timed(lambda: _reference_arrays(*reference(family, n, m)))
+    record = {'family': family, 'n': n, 'm': m, 'reference': seconds,
+              'edges': 0 if isinstance(outcome, Exception) else int(outcome[1].size), 'engines': {}}
+    for name in engines or ENGINES:
+        engine, supported = ENGINES[name]
+        if family not in supported:
+            continue
+        actual, seconds = _timed(engine, family, n, m)
+        record['engines'][name] = {'seconds': seconds, 'mismatch': _mismatch(outcome, actual)}
+    return record
+
+
+def _run_cases(cases, engines):
+    return [run_case(family, n, m, engines) for family, n, m in cases]
+
+
+def shrink(family, n, m, engine):
+    """
+    Reduces a failing case to a minimal one on which the engine still disagrees.
+
+    Greedily tries halving and decrementing n and m (keeping m valid for the family)
+    and moves to the first smaller case that still fails, until none does.
+
+    Returns:
+        tuple: (n, m, mismatch) of the smallest failing case found.
+    """
+    mismatch = run_case(family, n, m, [engine])['engines'][engine]['mismatch']
+    while True:
+        candidates = [(n // 2, m), (n - 1, m)]
+        if family != 'problem1' and m is not None:
+            candidates += [(n, m // 2), (n, m - 1)]
+        for smaller_n, smaller_m in candidates:
+            if smaller_n < 1 or (smaller_m is not None and smaller_m < 0) or (smaller_n, smaller_m) == (n, m):
+                continue
+            found = run_case(family, smaller_n, smaller_m, [engine])['engines'].get(engine)
+            if found and found['mismatch']:
+                n, m, mismatch = smaller_n, smaller_m, found['mismatch']
+                break
+        else:
+            return n, m, mismatch
+
+
+def generate_cases(families=('problem1', 'star', 'snowflake'), count=200, max_n=5000, max_m=50, seed=0):
+    """
+    Generates (family, n, m) cases: a fixed set of edge cases plus count random ones per family.
+
+    Edge cases are every tiny n (1..12), n on both sides of several multiples of 4 (the
+    ceil(n / 4) rule switches there), n = m and n = m +- 1 for the star, and zero, one
+    and several leaves per snowflake branch. Random cases draw n up to max_n, biased
+    towards n % 4 boundaries, and m up to max_m.
+    """
+    rng = random.Random(seed)
+    boundaries = sorted({4 * k + d for k in (1, 2, 3, 8, 25, 256) for d in (-1, 0, 1, 2)})
+    cases = []
+    for family in families:
+        tiny = list(range(1, 13)) + boundaries
+        if family == 'problem1':
+            cases += [(family, n, None) for n in tiny]
+        elif family == 'star':
+            cases += [(family, n, m) for n in tiny for m in (0, 1, 2, 3)]
+            cases += [(family, n, n + d) for n in range(1, 13) for d in (-1, 0, 1) if n + d >= 0]
+        else:
+            cases += [(family, n, leaves) for n in tiny for leaves in (None, 0, 1, 3, 5)]
+        for _ in range(count):
+            n = rng.randint(1, max_n)
+            if rng.random() < 0.5:
+                n = max(1, 4 * (n // 4) + rng.choice((-1, 0, 1, 2)))
+            m = None if family == 'problem1' else rng.randint(0, max_m)
+            cases.append((family, n, m))
+    return cases
+
+
+def run_differential(cases, engines=None, workers=None, shard_size=8):
+    """
+    Runs cases on a process pool and shrinks every disagreement.
+
+    Returns:
+        tuple: (records, failures, speedups). failures lists (family, engine, original
+            case, minimal (n, m), mismatch); speedups maps engine -> (total reference
+            seconds / total engine seconds, median per-case speedup), over the cases
+            with at least 1000 edges where timings are meaningful.
+    """
+    shards = [cases[i:i + shard_size] for i in range(0, len(cases), shard_size)]
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for shard in pool.map(_run_cases, shards, [engines] * len(shards)):
+            records.extend(shard)
+
+    failures = []
+    for record in records:
+        for name, result in record['engines'].items():
+            if result['mismatch']:
+                minimal = shrink(record['family'], record['n'], record['m'], name)
+                failures.append((record['family'], name, (record['n'], record['m']), minimal[:2], minimal[2]))
+
+    speedups = {}
+    for name in engines or ENGINES:
+        timed = [(record['reference'], record['engines'][name]['seconds']) for record in records
+                 if name in record['engines'] and record['edges'] >= 1000]
+        if timed:
+            reference_total, engine_total = map(sum, zip(*timed))
+            ratios = [ref / max(seconds, 1e-9) for ref, seconds in timed]
+            speedups[name] = (reference_total / max(engine_total, 1e-9), float(np.median(ratios)))
+    return records, failures, speedups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the fast labeling engines against the reference scripts.")
+    parser.add_argument('--family', choices=('problem1', 'star', 'snowflake'), action='append',
+                        help="family to test (repeatable, default: all)")
+    parser.add_argument('--engine', choices=tuple(ENGINES), action='append',
+                        help="engine to test (repeatable, default: all)")
+    parser.add_argument('--count', type=int, default=200, help="random cases per family")
+    parser.add_argument('--max-n', type=int, default=5000)
+    parser.add_argument('--max-m', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cases = generate_cases(args.family or ('problem1', 'star', 'snowflake'), args.count,
+                           args.max_n, args.max_m, args.seed)
+    records, failures, speedups = run_differential(cases, args.engine, args.workers)
+    checks = sum(len(record['engines']) for record in records)
+    print(f"{len(records)} cases, {checks} engine runs in {time.perf_counter() - start:.1f} s")
+    for name, (total, median) in speedups.items():
+        print(f"  {name:<10} {total:8.1f}x overall, {median:8.1f}x median vs reference")
+    for family, name, (n, m), (small_n, small_m), mismatch in failures:
+        print(f"FAIL {name} {family} n={n} m={m}; minimal n={small_n} m={small_m}: {mismatch}")
+    print(f"{len(failures)} disagreements")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+# Columnar edge table: one row per undirected edge
+import operator
+from collections.abc import Mapping
+
+import numpy as np
+
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15  # Fibonacci hashing constant
+_EMPTY = -1
+
+
+class EdgeTable:
+    def __init__(self, order, edge_u, edge_v, weight=None):
+        """
+        Stores each undirected edge once in parallel u, v and weight arrays.
+
+        Lookups of (u, v) in either order go through an open-addressing hash table
+        that is itself two int64 arrays, so the table costs a few dozen bytes per
+        edge instead of two boxed tuple keys per edge in a dictionary.
+
+        Args:
+            order (int): The total number of vertices.
+            edge_u (array-like): First endpoint of every edge.
+            edge_v (array-like): Second endpoint of every edge.
+            weight (array-like, optional): Initial weight of every edge, 0 if omitted.
+        """
+        self.order = order
+        self.u = np.ascontiguousarray(edge_u, dtype=np.int64)
+        self.v = np.ascontiguousarray(edge_v, dtype=np.int64)
+        if weight is None:
+            self.weight = np.zeros(self.u.size, dtype=np.int64)
+        else:
+            self.weight = np.array(weight, dtype=np.int64)
+        self._build_index()
+
+    @classmethod
+    def from_csr(cls, csr, weight=None):
+        """
+        Builds the edge table of a CSRGraph from its undirected edge list.
+        """
+        return cls(csr.order, csr.edge_u, csr.edge_v, weight)
+
+    def __len__(self):
+        return self.u.size
+
+    def _key(self, u, v):
+        # Canonical key of an undirected edge, identical for (u, v) and (v, u)
+        return min(u, v) * self.order + max(u, v)
+
+    def _slot(self, key):
+        # On Python ints: with numpy scalars the product would overflow int64
+        return ((int(key) * _HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> self._shift
+
+    def _build_index(self):
+        """
+        Inserts every row into the hash index with vectorized linear probing.
+        """
+        bits = max(3, int(2 * max(len(self), 1) - 1).bit_length())
+        capacity = 1 << bits
+        self._shift = 64 - bits
+        self._mask = capacity - 1
+        self._keys = np.full(capacity, _EMPTY, dtype=np.int64)
+        self._rows = np.full(capacity, _EMPTY, dtype=np.int64)
+
+        keys = np.minimum(self.u, self.v) * self.order + np.maximum(self.u, self.v)
+        slots = ((keys.astype(np.uint64) * np.uint64(_HASH_MULTIPLIER))
+                 >> np.uint64(self._shift)).astype(np.int64)
+        pending = np.arange(len(self), dtype=np.int64)
+        while pending.size:
+            candidate_slots = slots[pending]
+            free = self._keys[candidate_slots] == _EMPTY
+            # Among rows competing for the same free slot, the first one wins
+            _, first = np.unique(candidate_slots[free], return_index=True)
+            winners = pending[free][first]
+            self._keys[slots[winners]] = keys[winners]
+            self._rows[slots[winners]] = winners
+            placed = np.zeros(len(self), dtype=bool)
+            placed[winners] = True
+            pending = pending[~placed[pending]]
+            slots[pending] = (slots[pending] + 1) & self._mask
+
+    def find(self, u, v):
+        """
+        Returns the row of edge (u, v) in either order, or -1 if there is no such edge.
+
+        Endpoints outside range(order) are never edges; their keys would otherwise
+        alias the key of a real edge.
+        """
+        u, v = operator.index(u), operator.index(v)
+        if not (0 <= u < self.order and 0 <= v < self.order):
+            return -1
+        key = self._key(u, v)
+        slot = self._slot(key)
+        while True:
+            stored = self._keys[slot]
+            if stored == key:
+                return int(self._rows[slot])
+            if stored == _EMPTY:
+                return -1
+            slot = (slot + 1) & self._mask
+
+    def weight_of(self, u, v):
+        """
+        Returns the weight of edge (u, v), raising KeyError if the edge does not exist.
+        """
+        row = self.find(u, v)
+        if row < 0:
+            raise KeyError((u, v))
+        return int(self.weight[row])
+
+    def compute_weights(self, labels):
+        """
+        Sets every edge weight to the sum of its endpoint labels in one array operation.
+
+        Args:
+            labels (array-like or dict): Vertex label for every vertex in range(order).
+
+        Returns:
+            numpy.ndarray: The weight column.
+        """
+        if isinstance(labels, Mapping):
+            labels = np.fromiter((labels[vertex] for vertex in range(self.order)),
+                                 dtype=np.int64, count=self.order)
+        labels = np.asarray(labels, dtype=np.int64)
+        np.add(labels[self.u], labels[self.v], out=self.weight)
+        return self.weight
+
+    def as_mapping(self):
+        """
+        Returns a read-only {(u, v): weight} view with one entry per undirected edge.
+        """
+        return EdgeWeightView(self)
+
+
+class EdgeWeightView(Mapping):
+    """
+    Read-only dict-like view of an EdgeTable.
+
+    Iteration yields each undirected edge once, in table order; lookups accept
+    either orientation of an edge.
+    """
+
+    def __init__(self, table):
+        self._table = table
+
+    @property
+    def table(self):
+        """
+        The underlying EdgeTable.
+        """
+        return self._table
+
+    def __getitem__(self, edge):
+        u, v = edge
+        return self._table.weight_of(u, v)
+
+    def __contains__(self, edge):
+        try:
+            u, v = edge
+            return self._table.find(u, v) >= 0
+        except (TypeError, ValueError):
+            return False
+
+    def __iter__(self):
+        return zip(self._table.u.tolist(), self._table.v.tolist())
+
+    def __len__(self):
+        return len(self._table)
+
+    def items(self):
+        return zip(zip(self._table.u.tolist(), self._table.v.tolist()),
+                   self._table.weight.tolist())
+
+    def values(self):
+        return iter(self._table.weight.tolist())
@@ -0,0 +1,464 @@
+# Exact edge irregularity strength of small graphs by parallel backtracking
+import argparse
+import multiprocessing
+import os
+import time
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+_stop = None  # Shared multiprocessing.Event telling workers a solution was found
+
+
+class SolverResult:
+    def __init__(self, k, labels, lower_bound, proven, nodes, seconds):
+        """
+        Outcome of edge_irregularity_strength.
+
+        Args:
+            k (int): Smallest k found with distinct edge weights (None if none was found).
+            labels (numpy.ndarray): A labeling achieving k, indexed by vertex.
+            lower_bound (int): max(ceil((|E| + 1) / 2), maximum degree).
+            proven (bool): True if every smaller k was refuted exhaustively, i.e. k is optimal.
+            nodes (int): Search nodes explored over all k and workers.
+            seconds (float): Wall time.
+        """
+        self.k = k
+        self.labels = labels
+        self.lower_bound = lower_bound
+        self.proven = proven
+        self.nodes = nodes
+        self.seconds = seconds
+
+    def __repr__(self):
+        return (f"SolverResult(k={self.k}, lower_bound={self.lower_bound}, proven={self.proven}, "
+                f"nodes={self.nodes}, seconds={self.seconds:.3f})")
+
+
+def graph_edges(graph):
+    """
+    Extracts (order, sorted list of undirected edges (u, v) with u < v) from a graph.
+
+    Accepts the scripts' Graph objects (adj_list), a LabeledGraph or CSRGraph, a
+    {vertex: neighbors} mapping, or an (order, edges) pair.
+    """
+    if hasattr(graph, 'csr'):
+        graph = graph.csr
+    if hasattr(graph, 'edge_u'):
+        pairs = zip(graph.edge_u.tolist(), graph.edge_v.tolist())
+        order = graph.order
+    else:
+        if hasattr(graph, 'adj_list'):
+            graph = graph.adj_list
+        if isinstance(graph, Mapping):
+            pairs = ((u, v) for u, neighbors in graph.items() for v in neighbors)
+            order = max(graph.keys(), default=-1) + 1
+        else:
+            order, pairs = graph
+    edges = sorted({(min(u, v), max(u, v)) for u, v in pairs if u != v})
+    order = max([order] + [v + 1 for _, v in edges])
+    return order, edges
+
+
+def lower_bound(order, edges):
+    """
+    max(ceil((|E| + 1) / 2), maximum degree): |E| distinct weights fit in 2..2k, and the
+    neighbors of a vertex need pairwise distinct labels.
+    """
+    degree = np.bincount(np.array(edges, dtype=np.int64).ravel(), minlength=order) if edges else [0]
+    return max(1, -(-(len(edges) + 1) // 2), int(max(degree)))
+
+
+def _neighbor_sets(order, edges):
+    neighbors = [set() for _ in range(order)]
+    for u, v in edges:
+        neighbors[u].add(v)
+        neighbors[v].add(u)
+    return neighbors
+
+
+def _arm_classes(neighbors, center):
+    """
+    Groups the tree-shaped arms hanging off center by isomorphism type.
+
+    An arm is a component of G - center that is a tree touching center in exactly one
+    vertex, its root. Arms are compared by the AHU canonical string of the rooted tree.
+
+    Returns:
+        list: Lists of arm roots, one list per class of two or more isomorphic arms.
+    """
+    seen = {center}
+    classes = {}
+    for root in sorted(neighbors[center]):
+        if root in seen:
+            continue
+        # Collect the component of root in G - center
+        component, stack = [], [root]
+        seen.add(root)
+        while stack:
+            vertex = stack.pop()
+            component.append(vertex)
+            for other in neighbors[vertex]:
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+        inner_edges = sum(len(neighbors[vertex] - {center}) for vertex in component) // 2
+        attached = sum(center in neighbors[vertex] for vertex in component)
+        if inner_edges != len(component) - 1 or attached != 1:
+            continue  # Not a tree, or joined to center more than once
+
+        def canonical(vertex, parent):
+            return '(' + ''.join(sorted(canonical(child, vertex) for child in neighbors[vertex]
+                                        if child != parent and child != center)) + ')'
+        classes.setdefault(canonical(root, center), []).append(root)
+    return [roots for roots in classes.values() if len(roots) > 1]
+
+
+def _symmetry_chains(order, neighbors):
+    """
+    Groups of vertices whose labels may be required to increase with their search position.
+
+    Two automorphism families are broken:
+        - isomorphic tree-shaped arms at the vertex of highest degree, ordered by root label;
+        - twins (vertices with the same nonempty neighborhood), which need distinct labels
+          anyway since they share a neighbor.
+    Arms are sorted first and twins inside them afterwards, so the two orderings never
+    conflict.
+    """
+    if order == 0:
+        return []
+    center = max(range(order), key=lambda vertex: len(neighbors[vertex]))
+    chains = _arm_classes(neighbors, center)
+    twins = {}
+    for vertex in range(order):
+        if vertex != center and neighbors[vertex]:
+            twins.setdefault(frozenset(neighbors[vertex]), []).append(vertex)
+    chains.extend(group for group in twins.values() if len(group) > 1)
+    return chains
+
+
+class _Problem:
+    def __init__(self, order, edges):
+        """
+        Precomputed search order and constraints, shared by every k and worker.
+
+        Pendant vertices (degree one, hanging off a vertex of higher degree) are left out
+        of the search: once the other labels are fixed, every pendant edge needs its own
+        free weight in the window parent label + 1 .. parent label + k, which is an
+        interval assignment solved greedily (see _assign_pendants).
+        """
+        self.order = order
+        self.num_edges = len(edges)
+        neighbors = _neighbor_sets(order, edges)
+        degree = [len(adjacent) for adjacent in neighbors]
+        pendant = [degree[vertex] == 1 and (degree[next(iter(neighbors[vertex]))] > 1 or
+                                            next(iter(neighbors[vertex])) < vertex)
+                   for vertex in range(order)]
+
+        # Breadth-first over the core from the highest-degree vertex, so constraints bite early
+        ordering, placed = [], [False] * order
+        for start in sorted(range(order), key=lambda vertex: -degree[vertex]):
+            if placed[start] or pendant[start] or degree[start] == 0:
+                continue
+            placed[start] = True
+            queue = [start]
+            while queue:
+                vertex = queue.pop(0)
+                ordering.append(vertex)
+                for other in sorted(neighbors[vertex], key=lambda w: -degree[w]):
+                    if not placed[other] and not pendant[other]:
+                        placed[other] = True
+                        queue.append(other)
+        position = {vertex: index for index, vertex in enumerate(ordering)}
+        self.vertices = ordering
+        self.count = len(ordering)
+        self.back = [[position[other] for other in neighbors[vertex] if position.get(other, index) < index]
+                     for index, vertex in enumerate(ordering)]
+        self.pendants = [(vertex, position[next(iter(neighbors[vertex]))])
+                         for vertex in range(order) if pendant[vertex]]
+        self.pendant_count = [0] * self.count
+        for _, parent in self.pendants:
+            self.pendant_count[parent] += 1
+        # Edges not yet weighted once positions 0..i are labeled
+        self.remaining = [self.num_edges - sum(len(back) for back in self.back[:index + 1])
+                          for index in range(self.count)]
+
+        # Each position in a symmetry chain must exceed the label of the previous one
+        self.after = [[] for _ in range(self.count)]
+        for chain in _symmetry_chains(order, neighbors):
+            positions = sorted(position[vertex] for vertex in chain if vertex in position)
+            for previous, current in zip(positions, positions[1:]):
+                self.after[current].append(previous)
+
+
+def _assign_pendants(problem, k, labels, used):
+    """
+    Gives every pendant edge a distinct free weight, or returns None if impossible.
+
+    All windows parent label + 1 .. parent label + k have the same length, so taking
+    parents by increasing label and giving each the smallest free weights in its window
+    succeeds whenever any assignment does.
+
+    Returns:
+        list: The label of each pendant, in problem.pendants order.
+    """
+    by_parent = {}
+    for index, (_, parent) in enumerate(problem.pendants):
+        by_parent.setdefault(parent, []).append(index)
+    result = [0] * len(problem.pendants)
+    for parent in sorted(by_parent, key=lambda position: labels[position]):
+        base = labels[parent]
+        weight = base + 1
+        for index in by_parent[parent]:
+            while (used >> weight) & 1:
+                weight += 1
+            if weight > base + k:
+                return None
+            used |= 1 << weight
+            result[index] = weight - base
+    return result
+
+
+def _search(problem, k, prefix):
+    """
+    Depth-first search for labels 1..k completing prefix with distinct edge weights.
+
+    Edge weights in use are kept as bits of one Python integer. A branch is cut as soon
+    as a new weight is taken, when a symmetry chain would decrease, when fewer free
+    weights remain in 2..2k than edges still to be weighted, or when a vertex's window
+    has fewer free weights than it has pendants.
+
+    Returns:
+        tuple: ((core labels by search position, pendant labels) or None, nodes explored).
+    """
+    count = problem.count
+    back, after, remaining = problem.back, problem.after, problem.remaining
+    pendant_count = problem.pendant_count
+    labels = [0] * count
+    used = 0
+    for index, label in enumerate(prefix):
+        labels[index] = label
+        for other in back[index]:
+            used |= 1 << (label + labels[other])
+    total_weights = 2 * k - 1
+    window = (1 << k) - 1
+    nodes = 0
+    stop = _stop
+    solution = None
+
+    def extend(index, used):
+        nonlocal nodes, solution
+        if index == count:
+            pendants = _assign_pendants(problem, k, labels, used)
+            if pendants is None:
+                return False
+            solution = (list(labels), pendants)
+            return True
+        nodes += 1
+        if nodes & 0xFFFF == 0 and stop is not None and stop.is_set():
+            raise _Cancelled
+        neighbors = back[index]
+        if total_weights - bin(used).count('1') - len(neighbors) < remaining[index]:
+            return False  # Too few free weights left for the edges still to come
+        first = 1
+        for previous in after[index]:
+            first = max(first, labels[previous] + 1)
+        hanging = pendant_count[index]
+        for label in range(first, k + 1):
+            mask = 0
+            for other in neighbors:
+                bit = 1 << (label + labels[other])
+                if (used | mask) & bit:
+                    break
+                mask |= bit
+            else:
+                taken = used | mask
+                if hanging and bin(~taken >> (label + 1) & window).count('1') < hanging:
+                    continue
+                labels[index] = label
+                if extend(index + 1, taken):
+                    return True
+        return False
+
+    try:
+        extend(len(prefix), used)
+    except _Cancelled:
+        pass
+    return solution, nodes
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def _prefixes(problem, k, target):
+    """
+    Enumerates valid label prefixes breadth-first until there are at least target of them.
+    """
+    prefixes = [()]
+    depth = 0
+    while len(prefixes) < target and depth < problem.count:
+        grown = []
+        for prefix in prefixes:
+            for label in range(1, k + 1):
+                candidate = prefix + (label,)
+                if _prefix_valid(problem, candidate):
+                    grown.append(candidate)
+        prefixes = grown
+        depth += 1
+        if not prefixes:
+            break
+    return prefixes
+
+
+def _prefix_valid(problem, prefix):
+    index = len(prefix) - 1
+    label = prefix[index]
+    if any(label <= prefix[previous] for previous in problem.after[index]):
+        return False
+    weights = set()
+    for position in range(index + 1):
+        for other in problem.back[position]:
+            weight = prefix[position] + prefix[other]
+            if weight in weights:
+                return False
+            weights.add(weight)
+    return True
+
+
+def _init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def _run_prefix(problem, k, prefix):
+    if _stop.is_set():
+        return None, 0
+    solution, nodes = _search(problem, k, prefix)
+    if solution is not None:
+        _stop.set()
+    return solution, nodes
+
+
+def _solve_parallel(problem, k, workers, pool, stop):
+    """
+    Splits the search tree for k into many prefixes served by the pool on demand.
+
+    Idle workers keep pulling the next unexplored prefix, so uneven subtrees balance out
+    the way work stealing would; the shared stop event ends all workers once one succeeds.
+    """
+    stop.clear()
+    prefixes = _prefixes(problem, k, workers * 32)
+    pending = {pool.submit(_run_prefix, problem, k, prefix) for prefix in prefixes}
+    nodes = 0
+    solution = None
+    while pending:
+        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in finished:
+            if future.cancelled():
+                continue
+            found, explored = future.result()
+            nodes += explored
+            if found is not None and solution is None:
+                solution = found
+                for other in pending:
+                    other.cancel()
+    return solution, nodes
+
+
+def edge_irregularity_strength(graph, workers=None, upper_bound=None, time_limit=None):
+    """
+    Finds the smallest k admitting a vertex k-labeling with pairwise distinct edge weights.
+
+    Every k from the lower bound upward is decided exactly by backtracking (see _search),
+    so the first feasible k is the edge irregularity strength es(G). Isomorphic arms and
+    twin leaves are only explored in one order, and each k is split into subtrees that
+    a process pool works through in parallel.
+
+    Args:
+        graph: Anything accepted by graph_edges.
+        workers (int, optional): Processes to use; 1 searches in this process. Defaults
+            to the number of CPUs.
+        upper_bound (int, optional): A k already known to work (e.g. from a construction);
+            the search stops there and reports it if nothing smaller is feasible.
+        time_limit (float, optional): Seconds after which no further k is started; the
+            result is then not proven.
+
+    Returns:
+        SolverResult: The optimal k with a witness labeling.
+    """
+    start = time.perf_counter()
+    order, edges = graph_edges(graph)
+    problem = _Problem(order, edges)
+    bound = lower_bound(order, edges)
+    workers = workers or os.cpu_count() or 1
+    nodes = 0
+    pool = stop = None
+    if workers > 1:
+        stop = multiprocessing.Event()
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(stop,))
+    try:
+        k = bound
+        while True:
+            if upper_bound is not None and k >= upper_bound:
+                return SolverResult(upper_bound, None, bound, True, nodes, time.perf_counter() - start)
+            if time_limit is not None and time.perf_counter() - start > time_limit:
+                return SolverResult(None, None, bound, False, nodes, time.perf_counter() - start)
+            if pool is None:
+                solution, explored = _search(problem, k, ())
+            else:
+                solution, explored = _solve_parallel(problem, k, workers, pool, stop)
+            nodes += explored
+            if solution is not None:
+                core, pendants = solution
+                labels = np.ones(order, dtype=np.int64)  # Isolated vertices keep label 1
+                labels[problem.vertices] = core
+                labels[[vertex for vertex, _ in problem.pendants]] = pendants
+                return SolverResult(k, labels, bound, True, nodes, time.perf_counter() - start)
+            k += 1
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def certify_family(family, n, m=None, workers=None, time_limit=None):
+    """
+    Compares a family's construction with the exact optimum for one (n, m).
+
+    Returns:
+        dict: The construction's k and whether its weights are distinct, the exact k, and
+            whether the construction is optimal.
+    """
+    from families import build_labeled_graph
+
+    graph = build_labeled_graph(family, n, m)
+    valid = graph.verify().unique
+    result = edge_irregularity_strength(graph, workers, upper_bound=graph.k if valid else None,
+                                        time_limit=time_limit)
+    return {'family': family, 'n': graph.n, 'm': graph.m, 'construction_k': graph.k,
+            'construction_valid': valid, 'optimal_k': result.k, 'proven': result.proven,
+            'optimal': valid and result.proven and result.k == graph.k,
+            'nodes': result.nodes, 'seconds': result.seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Certify a family's labeling against the exact optimum.")
+    parser.add_argument('--family', choices=('problem1', 'star', 'snowflake'), required=True)
+    parser.add_argument('--n', type=int, required=True)
+    parser.add_argument('--m', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--time-limit', type=float, default=None)
+    args = parser.parse_args()
+
+    report = certify_family(args.family, args.n, args.m, args.workers, args.time_limit)
+    print(f"{report['family']} n={report['n']} m={report['m']}: construction k={report['construction_k']} "
+          f"({'valid' if report['construction_valid'] else 'repeated weights'}), "
+          f"exact k={report['optimal_k']}{'' if report['proven'] else ' (not proven)'}, "
+          f"{report['nodes']} nodes in {report['seconds']:.2f} s")
+    if report['optimal']:
+        print("The construction is optimal.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Chunked, buffered text export of vertex labels and edge weights
+import gzip
+from collections.abc import Mapping
+
+import numpy as np
+
+from verify import edge_chunks
+
+CHUNK_SIZE = 1 << 16       # Rows formatted per write call
+BUFFER_SIZE = 1 << 20      # Bytes buffered by plain-text files
+
+VERTEX_LINE = "Vertex %d: Label %d\n"
+EDGE_LINE = "Edge (%d, %d): Weight %d\n"
+
+
+def format_rows(template, columns):
+    """
+    Formats equal-length integer columns into one string, one template line per row.
+
+    The rows are interleaved into a single tuple and formatted with one % operation
+    on the repeated template, so the per-row cost stays in C.
+
+    Args:
+        template (str): printf-style line with one %d per column, e.g. VERTEX_LINE.
+        columns (sequence): Integer arrays of equal length.
+
+    Returns:
+        str: The formatted rows.
+    """
+    rows = len(columns[0])
+    if rows == 0:
+        return ''
+    table = np.empty((rows, len(columns)), dtype=np.int64)
+    for index, column in enumerate(columns):
+        table[:, index] = column
+    return (template * rows) % tuple(table.ravel().tolist())
+
+
+def write_rows(stream, template, columns, chunk_size=CHUNK_SIZE):
+    """
+    Writes integer columns to stream chunk_size rows at a time (see format_rows).
+    """
+    columns = [np.asarray(column, dtype=np.int64) for column in columns]
+    for start in range(0, len(columns[0]), chunk_size):
+        stream.write(format_rows(template, [column[start:start + chunk_size] for column in columns]))
+
+
+def label_chunks(labels, chunk_size=CHUNK_SIZE):
+    """
+    Normalizes a labeling into a stream of (vertices, labels) array chunks.
+
+    Args:
+        labels: A label array indexed by vertex, a {vertex: label} mapping, an implicit
+            graph (anything with order and labels_of), or an iterable of label array
+            chunks covering consecutive vertices from 0.
+    """
+    if isinstance(labels, Mapping):
+        vertices = np.fromiter(labels.keys(), dtype=np.int64, count=len(labels))
+        values = np.fromiter(labels.values(), dtype=np.int64, count=len(labels))
+        yield vertices, values
+    elif hasattr(labels, 'labels_of'):  # Implicit graph
+        for start in range(0, labels.order, chunk_size):
+            vertices = np.arange(start, min(start + chunk_size, labels.order), dtype=np.int64)
+            yield vertices, labels.labels_of(vertices)
+    elif isinstance(labels, (np.ndarray, list, tuple)):
+        yield np.arange(len(labels), dtype=np.int64), np.asarray(labels, dtype=np.int64)
+    else:
+        start = 0
+        for chunk in labels:
+            chunk = np.asarray(chunk, dtype=np.int64)
+            yield np.arange(start, start + chunk.size, dtype=np.int64), chunk
+            start += chunk.size
+
+
+def open_output(path, compress=None):
+    """
+    Opens path for buffered text output, gzip-compressed when asked or when it ends in .gz.
+
+    Args:
+        path (str): The file to write.
+        compress (bool, optional): Force compression on or off; None decides by suffix.
+    """
+    if compress is None:
+        compress = path.endswith('.gz')
+    if compress:
+        return gzip.open(path, 'wt', compresslevel=6)
+    return open(path, 'w', buffering=BUFFER_SIZE)
+
+
+def write_labeling(path, labels, edges, chunk_size=CHUNK_SIZE, compress=None):
+    """
+    Writes the vertex labels and one weight per undirected edge as text.
+
+    Both sections are streamed in chunks, so a labeling that only exists as chunk
+    generators (e.g. an implicit graph) is never materialized.
+
+    Args:
+        path (str): The file to write; a .gz suffix selects gzip unless compress says otherwise.
+        labels: Vertex labels in any form accepted by label_chunks.
+        edges: Weighted edges in any form accepted by verify.edge_chunks (EdgeTable, its
+            mapping view, an implicit graph, a {(u, v): weight} mapping or (u, v, w) chunks).
+        chunk_size (int): Rows formatted per write.
+        compress (bool, optional): See open_output.
+    """
+    with open_output(path, compress) as file:
+        file.write("Vertex Labels:\n")
+        for vertices, values in label_chunks(labels, chunk_size):
+            write_rows(file, VERTEX_LINE, (vertices, values), chunk_size)
+        file.write("\nEdge Weights:\n")
+        for u, v, weight in edge_chunks(edges):
+            write_rows(file, EDGE_LINE, (u, v, weight), chunk_size)
+
+
+def write_adjacency(stream, csr, template="Vertex: {}, neighbors: [{}]\n", chunk_size=CHUNK_SIZE):
+    """
+    Writes one line per vertex listing its neighbors, joined into chunk-sized writes.
+
+    Args:
+        stream: Text stream to write to.
+        csr (CSRGraph): The adjacency.
+        template (str): str.format line taking the vertex and its comma-separated neighbors.
+    """
+    offsets = csr.offsets.tolist()
+    targets = csr.targets.tolist()
+    for start in range(0, csr.order, chunk_size):
+        stop = min(start + chunk_size, csr.order)
+        stream.write(''.join(template.format(vertex, ', '.join(map(str, targets[offsets[vertex]:offsets[vertex + 1]])))
+                             for vertex in range(start, stop)))
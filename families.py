@@ -0,0 +1,113 @@
+# Materialized, labeled graphs for every family, built from the shared array core
+from edge_table import EdgeTable
+from graph_core import CSRGraph, snowflake_edges, star_edges
+from instrument import span
+from labeling import amalgamated_star_labels, generalized_star_labels, snowflake_labels
+from verify import verify_edge_weights
+
+LABELING_VERSION = 1  # Bump whenever a labeling formula changes
+
+
+class LabeledGraph:
+    def __init__(self, family, n, m, csr, labels):
+        """
+        A built graph together with its vertex labels and edge weights.
+
+        Args:
+            family (str): 'problem1', 'star' or 'snowflake'.
+            n (int): The number of arms or branch nodes.
+            m (int): Arm size parameter as used by the family's script.
+            csr (CSRGraph): The adjacency.
+            labels (numpy.ndarray): Label of every vertex.
+        """
+        self.family = family
+        self.n = n
+        self.m = m
+        self.csr = csr
+        self.labels = labels
+        self.edges = EdgeTable.from_csr(csr)
+        self.edges.compute_weights(labels)
+
+    @property
+    def order(self):
+        return self.csr.order
+
+    @property
+    def k(self):
+        """
+        The largest vertex label.
+        """
+        return int(self.labels.max()) if self.labels.size else 0
+
+    def verify(self, collisions=False):
+        """
+        Checks that all edge weights are distinct (see verify.verify_edge_weights).
+        """
+        with span('verify'):
+            return verify_edge_weights(self.edges, 2 * self.k, collisions=collisions)
+
+
+def family_shape(family, n, m=None):
+    """
+    Normalizes (n, m) for a family and returns (n, m, leaves per arm).
+
+    problem1 is S(n, 3): m defaults to 3 and is the number of vertices per arm.
+    For the snowflake m is the number of leaves per branch; the classic two-leaf
+    snowflake is normalized to m = None, so both spellings share cache keys and files.
+    """
+    if family == 'problem1':
+        m = 3 if m is None else m
+        if m != 3:
+            raise ValueError("The problem1 labeling is only defined for S(n, 3)")
+        return n, m, m - 1
+    if family == 'star':
+        if m is None:
+            raise ValueError("The star family needs m")
+        return n, m, m
+    if family == 'snowflake':
+        leaves = 2 if m is None else m
+        if leaves < 0:
+            raise ValueError("The snowflake needs a non-negative number of leaves")
+        return n, (None if leaves == 2 else leaves), leaves
+    raise ValueError(f"Unknown graph family: {family}")
+
+
+def family_labels(family, n, m=None):
+    """
+    Computes the vertex labels of a family member without building its edges.
+
+    Returns:
+        numpy.ndarray: Label of every vertex, indexed by vertex id.
+    """
+    n, m, leaves = family_shape(family, n, m)
+    if family == 'snowflake':
+        return snowflake_labels(n, leaves)
+    if family == 'problem1':
+        return amalgamated_star_labels(n)
+    return generalized_star_labels(n, m)
+
+
+def build_labeled_graph(family, n, m=None, labels=None):
+    """
+    Builds, labels and weights one graph of a family in bulk array operations.
+
+    Args:
+        family (str): One of implicit_graph.FAMILIES.
+        n (int): The number of arms or branch nodes.
+        m (int, optional): Arm size parameter.
+        labels (numpy.ndarray, optional): Precomputed labels, e.g. from a LabelCache.
+
+    Returns:
+        LabeledGraph: The built graph.
+    """
+    n, m, leaves = family_shape(family, n, m)
+    with span('build'):
+        if family == 'snowflake':
+            csr = CSRGraph(1 + n + n * leaves, *snowflake_edges(n, leaves))
+        else:
+            csr = CSRGraph(1 + n + n * leaves, *star_edges(n, leaves))
+    if labels is None:
+        with span('labeling'):
+            labels = family_labels(family, n, m)
+    with span('weights'):
+        return LabeledGraph(family, n, m, csr, labels)
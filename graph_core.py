@@ -0,0 +1,216 @@
+# Compact graph storage shared by the star and snowflake scripts
+from array import array
+from collections.abc import Mapping
+
+import numpy as np
+
+from edge_table import EdgeTable
+
+
+class CSRGraph:
+    def __init__(self, order, edge_u, edge_v):
+        """
+        Builds a compressed sparse row (CSR) graph from an undirected edge list.
+
+        Each undirected edge (u, v) becomes the two arcs u -> v and v -> u. Arcs are
+        grouped by source with a stable sort, so every vertex sees its neighbors in the
+        same order that repeated add_edge calls would have produced.
+
+        Args:
+            order (int): The total number of vertices.
+            edge_u (array-like): First endpoint of every undirected edge.
+            edge_v (array-like): Second endpoint of every undirected edge.
+        """
+        self.order = order
+        self.edge_u = np.ascontiguousarray(edge_u, dtype=np.int64)
+        self.edge_v = np.ascontiguousarray(edge_v, dtype=np.int64)
+        if self.edge_u.shape != self.edge_v.shape:
+            raise ValueError("edge_u and edge_v must have the same length")
+        if self.edge_u.size and (min(self.edge_u.min(), self.edge_v.min()) < 0
+                                 or max(self.edge_u.max(), self.edge_v.max()) >= order):
+            raise KeyError("edge endpoint outside of range(order)")
+
+        # Interleave both directions of every edge to keep insertion order per vertex
+        sources = np.column_stack((self.edge_u, self.edge_v)).ravel()
+        targets = np.column_stack((self.edge_v, self.edge_u)).ravel()
+        arc_order = np.argsort(sources, kind='stable')
+
+        self.offsets = np.zeros(order + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=order), out=self.offsets[1:])
+        self.targets = targets[arc_order]
+        self.offsets.flags.writeable = False
+        self.targets.flags.writeable = False
+
+    @property
+    def num_edges(self):
+        """
+        Returns the number of undirected edges.
+        """
+        return self.edge_u.size
+
+    def degree(self, v):
+        """
+        Returns the degree of vertex v.
+        """
+        return int(self.offsets[v + 1] - self.offsets[v])
+
+    def neighbors(self, v):
+        """
+        Returns the neighbors of vertex v as a read-only array slice.
+        """
+        if not 0 <= v < self.order:
+            raise KeyError(v)
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+    def adjacency_view(self):
+        """
+        Returns a read-only mapping that behaves like the old adj_list dictionary.
+        """
+        return AdjacencyView(self)
+
+
+class AdjacencyView(Mapping):
+    """
+    Read-only, dict-like view of a CSRGraph.
+
+    adj_list[v] returns a fresh list of Python ints, so existing code that iterates,
+    prints or indexes with neighbors keeps working unchanged.
+    """
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, v):
+        return self._graph.neighbors(v).tolist()
+
+    def __iter__(self):
+        return iter(range(self._graph.order))
+
+    def __len__(self):
+        return self._graph.order
+
+    def __contains__(self, v):
+        return isinstance(v, (int, np.integer)) and 0 <= v < self._graph.order
+
+
+class CSRStorage:
+    def __init__(self, order):
+        """
+        Mutable front end for CSRGraph and EdgeTable used by the Graph classes.
+
+        Edges added one at a time are buffered in typed arrays (8 bytes per endpoint)
+        and compacted into a CSRGraph and an EdgeTable the first time they are read.
+
+        Args:
+            order (int): The total number of vertices.
+        """
+        self.order = order
+        self._u = array('q')
+        self._v = array('q')
+        self._w = array('q')
+        self._csr = None
+        self._edges = None
+
+    def add_edge(self, u, v, weight=0):
+        """
+        Appends the undirected edge (u, v) with an initial weight.
+        """
+        if not (0 <= u < self.order and 0 <= v < self.order):
+            raise KeyError(u if not 0 <= u < self.order else v)
+        if self._edges is not None:
+            # Keep weights computed on the compacted table before it is invalidated
+            self._w = array('q', self._edges.weight.tobytes())
+        self._u.append(u)
+        self._v.append(v)
+        self._w.append(weight)
+        self._csr = None
+        self._edges = None
+
+    def load_edges(self, edge_u, edge_v, weight=None):
+        """
+        Replaces the stored edges with a whole edge list in one step.
+        """
+        self._csr = CSRGraph(self.order, edge_u, edge_v)
+        self._edges = EdgeTable.from_csr(self._csr, weight)
+        self._u = array('q', self._csr.edge_u.tobytes())
+        self._v = array('q', self._csr.edge_v.tobytes())
+        self._w = array('q', self._edges.weight.tobytes())
+
+    @property
+    def csr(self):
+        """
+        Returns the compacted CSRGraph, rebuilding it if edges were added since.
+        """
+        if self._csr is None:
+            # Copy out of the buffers so they can keep growing afterwards
+            self._csr = CSRGraph(self.order,
+                                 np.array(self._u, dtype=np.int64),
+                                 np.array(self._v, dtype=np.int64))
+        return self._csr
+
+    @property
+    def edges(self):
+        """
+        Returns the EdgeTable with one row per undirected edge.
+        """
+        if self._edges is None:
+            self._edges = EdgeTable.from_csr(self.csr, np.array(self._w, dtype=np.int64))
+        return self._edges
+
+
+def star_edges(n, leaves):
+    """
+    Generates the edge list of an amalgamated star in add_edge order.
+
+    Vertex 0 is the center, 1..n are the inner (arm) vertices and the leaves of arm i
+    are n + (i - 1) * leaves + 1 .. n + i * leaves.
+
+    Args:
+        n (int): The number of arms.
+        leaves (int): The number of leaves on each arm.
+
+    Returns:
+        tuple: Two int64 arrays with the endpoints of every edge.
+    """
+    arms = np.arange(1, n + 1, dtype=np.int64)
+    leaf_ids = n + 1 + np.arange(n * leaves, dtype=np.int64).reshape(n, leaves)
+    # Per arm: (0, i) followed by (i, leaf) for each of its leaves
+    edge_u = np.column_stack((np.zeros(n, dtype=np.int64),
+                              np.repeat(arms, leaves).reshape(n, leaves))).ravel()
+    edge_v = np.column_stack((arms, leaf_ids)).ravel()
+    return edge_u, edge_v
+
+
+def snowflake_edges(n, leaves=2):
+    """
+    Generates the edge list of the snowflake graph in add_edge order.
+
+    Each branch i is joined to the center, to its leaves and to branch i % n + 1.
+
+    Args:
+        n (int): The number of branch nodes.
+        leaves (int): The number of leaves on each branch.
+
+    Returns:
+        tuple: Two int64 arrays with the endpoints of every edge.
+    """
+    branches = np.arange(1, n + 1, dtype=np.int64)
+    leaf_ids = n + 1 + np.arange(n * leaves, dtype=np.int64).reshape(n, leaves)
+    edge_u = np.column_stack((np.zeros(n, dtype=np.int64),
+                              np.repeat(branches, leaves + 1).reshape(n, leaves + 1))).ravel()
+    edge_v = np.column_stack((branches, leaf_ids, np.roll(branches, -1))).ravel()
+    return edge_u, edge_v
+
+
+def build_star(n, leaves):
+    """
+    Builds the CSR graph of an amalgamated star with n arms of the given number of leaves.
+    """
+    return CSRGraph(1 + n + n * leaves, *star_edges(n, leaves))
+
+
+def build_snowflake(n, leaves=2):
+    """
+    Builds the CSR graph of the snowflake with n branches.
+    """
+    return CSRGraph(1 + n + n * leaves, *snowflake_edges(n, leaves))
@@ -0,0 +1,250 @@
+# Incrementally growable generalized star (Problem2_Melisa.py labeling)
+import numpy as np
+
+from edge_table import EdgeTable
+
+
+def _grow(array, size, fill=0):
+    """
+    Returns array with room for at least size entries along axis 0, doubling capacity.
+    """
+    if size <= array.shape[0]:
+        return array
+    capacity = max(size, 2 * array.shape[0], 8)
+    grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:array.shape[0]] = array
+    return grown
+
+
+def _grow_columns(matrix, columns, fill=-1):
+    if columns <= matrix.shape[1]:
+        return matrix
+    capacity = max(columns, 2 * matrix.shape[1], 4)
+    grown = np.full((matrix.shape[0], capacity), fill, dtype=matrix.dtype)
+    grown[:, :matrix.shape[1]] = matrix
+    return grown
+
+
+class GrowableStar:
+    def __init__(self, n, m):
+        """
+        Generalized amalgamated star that grows in place with add_arm and add_leaves.
+
+        The labeling is the one of Problem2_Melisa.py: arm i gets 3i - 2 or
+        2 * ceil(n / 4) + i and its leaf j gets the arm label plus j * max(n, m).
+        Growth only relabels the vertices whose label changes under those rules and
+        keeps a weight histogram, so uniqueness of the edge weights is known after
+        every step without rescanning the graph.
+
+        The initial (n, m) graph uses the script's vertex ids; later arms and leaves
+        get the next free ids, found through arm_vertex and leaf_vertex.
+
+        Args:
+            n (int): Initial number of arms.
+            m (int): Initial number of leaves per arm.
+        """
+        self.n = 0
+        self.m = 0
+        self.order = 1
+        self.num_edges = 0
+        self._labels = np.ones(1, dtype=np.int64)            # by vertex id
+        self._arm_ids = np.zeros(0, dtype=np.int64)          # arm index - 1 -> vertex id
+        self._arm_edges = np.zeros(0, dtype=np.int64)        # arm index - 1 -> center edge id
+        self._leaf_ids = np.full((0, 0), -1, dtype=np.int64)    # [arm - 1, j - 1] -> vertex id
+        self._leaf_edges = np.full((0, 0), -1, dtype=np.int64)  # [arm - 1, j - 1] -> edge id
+        self._u = np.zeros(0, dtype=np.int64)
+        self._v = np.zeros(0, dtype=np.int64)
+        self._weight = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)           # weight -> number of edges
+        self._distinct = 0
+        self._top = 0  # Upper bound on the largest weight in the histogram
+        self.relabeled = 0  # Vertices relabeled by the last growth step
+        self._extend(n, m)
+
+    # Labeling rules -----------------------------------------------------------------
+
+    def _arm_labels(self, arms, n):
+        c = -(-n // 4)
+        return np.where(arms <= c + 1, 3 * arms - 2, 2 * c + arms)
+
+    # Weight histogram -----------------------------------------------------------------
+
+    def _count(self, weights, sign):
+        if weights.size == 0:
+            return
+        values, counts = np.unique(weights, return_counts=True)
+        self._counts = _grow(self._counts, int(values[-1]) + 1)
+        self._top = max(self._top, int(values[-1]))
+        if sign > 0:
+            self._distinct += int(np.count_nonzero(self._counts[values] == 0))
+            self._counts[values] += counts
+        else:
+            self._counts[values] -= counts
+            self._distinct -= int(np.count_nonzero(self._counts[values] == 0))
+
+    def _set_weights(self, edge_ids):
+        edge_ids = edge_ids[edge_ids >= 0]
+        self._count(self._weight[edge_ids], -1)
+        self._weight[edge_ids] = self._labels[self._u[edge_ids]] + self._labels[self._v[edge_ids]]
+        self._count(self._weight[edge_ids], +1)
+
+    # Growth ---------------------------------------------------------------------------
+
+    def _new_vertices(self, count):
+        first = self.order
+        self.order += count
+        self._labels = _grow(self._labels, self.order)
+        return np.arange(first, self.order, dtype=np.int64)
+
+    def _new_edges(self, u, v):
+        first = self.num_edges
+        self.num_edges += u.size
+        self._u = _grow(self._u, self.num_edges)
+        self._v = _grow(self._v, self.num_edges)
+        self._weight = _grow(self._weight, self.num_edges)
+        ids = np.arange(first, self.num_edges, dtype=np.int64)
+        self._u[ids] = u
+        self._v[ids] = v
+        self._weight[ids] = 0
+        self._count(self._weight[ids], +1)  # Counted at weight 0 until their labels are set
+        return ids
+
+    def _extend(self, new_arms, new_leaves):
+        """
+        Adds new_arms arms and new_leaves leaves per arm, then fixes changed labels.
+        """
+        old_n, old_m = self.n, self.m
+        n, m = old_n + new_arms, old_m + new_leaves
+        old_c, c = -(-old_n // 4), -(-n // 4)
+        old_stride, stride = max(old_n, old_m), max(n, m)
+
+        self._arm_ids = _grow(self._arm_ids, n)
+        self._arm_edges = _grow(self._arm_edges, n)
+        self._leaf_ids = _grow_columns(_grow(self._leaf_ids, n, -1), m)
+        self._leaf_edges = _grow_columns(_grow(self._leaf_edges, n, -1), m)
+
+        # New arms, numbered first when the graph is built from nothing like the scripts do
+        arms = self._new_vertices(new_arms)
+        self._arm_ids[old_n:n] = arms
+        self._arm_edges[old_n:n] = self._new_edges(np.zeros(new_arms, dtype=np.int64), arms)
+
+        # New leaves: all m of each new arm, and the new_leaves extra ones of old arms
+        blocks = [(slice(0, old_n), slice(old_m, m)), (slice(old_n, n), slice(0, m))]
+        for rows, columns in blocks:
+            count = (rows.stop - rows.start) * (columns.stop - columns.start)
+            if count == 0:
+                continue
+            leaves = self._new_vertices(count).reshape(rows.stop - rows.start, -1)
+            self._leaf_ids[rows, columns] = leaves
+            parents = np.repeat(self._arm_ids[rows], columns.stop - columns.start)
+            self._leaf_edges[rows, columns] = self._new_edges(parents, leaves.ravel()).reshape(leaves.shape)
+        self.n, self.m = n, m
+
+        # Arms whose label changes: new arms, plus arms past ceil(n / 4) + 1 when it moved
+        first_changed = old_n + 1 if c == old_c else min(old_c + 2, old_n + 1)
+        changed = np.arange(min(first_changed, n + 1), n + 1, dtype=np.int64)
+        self._labels[self._arm_ids[changed - 1]] = self._arm_labels(changed, n)
+
+        # Leaves whose label changes: every leaf if the stride moved, otherwise the leaves
+        # of changed arms and the leaves just added to the other arms
+        if stride != old_stride:
+            leaf_blocks = [(np.arange(1, n + 1, dtype=np.int64), slice(0, m))]
+        else:
+            leaf_blocks = [(changed, slice(0, m)), (np.arange(1, n + 1, dtype=np.int64), slice(old_m, m))]
+        touched_edges = [self._arm_edges[changed - 1]]
+        for leaf_arms, columns in leaf_blocks:
+            self._relabel_leaves(leaf_arms, columns, stride)
+            touched_edges.append(self._leaf_edges[leaf_arms - 1, columns].ravel())
+        self.relabeled += changed.size
+        self._set_weights(np.unique(np.concatenate(touched_edges)))
+
+    def _relabel_leaves(self, arms, columns, stride):
+        if arms.size == 0 or columns.stop <= columns.start:
+            return
+        j = np.arange(columns.start + 1, columns.stop + 1, dtype=np.int64)
+        base = self._labels[self._arm_ids[arms - 1]]
+        ids = self._leaf_ids[arms - 1, columns]
+        self._labels[ids] = base[:, None] + j[None, :] * stride
+        self.relabeled += ids.size
+
+    def add_arm(self):
+        """
+        Adds one arm with m leaves, relabeling only what the ceil(n / 4) and max(n, m)
+        rules change.
+        """
+        self.relabeled = 0
+        self._extend(1, 0)
+
+    def add_leaves(self, k=1):
+        """
+        Adds k leaves to every arm, relabeling only what the max(n, m) stride changes.
+        """
+        self.relabeled = 0
+        self._extend(0, k)
+
+    # Queries --------------------------------------------------------------------------
+
+    @property
+    def labels(self):
+        """
+        Labels indexed by vertex id (read-only view).
+        """
+        view = self._labels[:self.order]
+        view.flags.writeable = False
+        return view
+
+    def arm_vertex(self, arm):
+        """
+        Vertex id of arm number arm (1-based).
+        """
+        return int(self._arm_ids[arm - 1])
+
+    def leaf_vertex(self, arm, j):
+        """
+        Vertex id of leaf j (1-based) of arm number arm.
+        """
+        return int(self._leaf_ids[arm - 1, j - 1])
+
+    def edge_arrays(self):
+        """
+        Returns (u, v, weight) views with one row per undirected edge.
+        """
+        return self._u[:self.num_edges], self._v[:self.num_edges], self._weight[:self.num_edges]
+
+    def to_edge_table(self):
+        """
+        Snapshot of the current edges as an EdgeTable.
+        """
+        return EdgeTable(self.order, *self.edge_arrays())
+
+    @property
+    def unique(self):
+        """
+        True if every edge weight is distinct, kept up to date by the weight histogram.
+        """
+        return self._distinct == self.num_edges
+
+    @property
+    def max_label(self):
+        """
+        The largest vertex label, from the closed-form rules in O(1).
+        """
+        if self.n == 0:
+            return 1
+        c = -(-self.n // 4)
+        inner = 3 * min(c + 1, self.n) - 2
+        if self.n > c + 1:
+            inner = max(inner, 2 * c + self.n)
+        return inner + self.m * max(self.n, self.m)
+
+    @property
+    def max_weight(self):
+        """
+        The largest edge weight. Weights never decrease as the star grows, so the scan
+        down from the top of the histogram is amortized O(1) per growth step.
+        """
+        top = min(self._top, self._counts.size - 1)
+        while top > 0 and self._counts[top] == 0:
+            top -= 1
+        self._top = max(top, 0)
+        return self._top
@@ -0,0 +1,306 @@
+# Implicit star and snowflake graphs: structure, labels and weights from (n, m) alone
+from itertools import chain
+
+import numpy as np
+
+FAMILIES = ('problem1', 'star', 'snowflake')
+
+
+class ImplicitStar:
+    def __init__(self, n, leaves, labeling='generalized'):
+        """
+        Amalgamated star answered from vertex-id formulas instead of stored arrays.
+
+        Vertex 0 is the center, 1..n are the arm vertices and leaf j of arm i is
+        n + (i - 1) * leaves + j. Nothing proportional to the graph size is allocated.
+
+        Args:
+            n (int): The number of arms.
+            leaves (int): The number of leaves on each arm.
+            labeling (str): 'amalgamated' for the S(n, 3) labeling of problem1_Ashna.py/new.py,
+                'generalized' for the max(n, m) stride labeling of Problem2_Melisa.py.
+        """
+        if labeling not in ('amalgamated', 'generalized'):
+            raise ValueError(f"Unknown labeling: {labeling}")
+        if labeling == 'amalgamated':
+            if leaves != 2:
+                raise ValueError("The S(n, 3) labeling needs exactly 2 leaves per arm")
+            if n % 4 == 1:
+                raise ValueError(f"S(n, 3) labeling is not defined for n % 4 == 1 (n = {n})")
+        self.n = n
+        self.leaves = leaves
+        self.labeling = labeling
+        self.order = 1 + n + n * leaves
+        self.num_edges = n + n * leaves
+        self._c = -(-n // 4)  # ceil(n / 4)
+        self._stride = max(n, leaves)
+
+    def _parent(self, v):
+        # Arm of a leaf, center of an arm, None for the center
+        if v == 0:
+            return None
+        if v <= self.n:
+            return 0
+        return (v - self.n - 1) // self.leaves + 1
+
+    def _check(self, v):
+        if not 0 <= v < self.order:
+            raise KeyError(v)
+
+    def degree(self, v):
+        """
+        Returns the degree of vertex v.
+        """
+        self._check(v)
+        if v == 0:
+            return self.n
+        return self.leaves + 1 if v <= self.n else 1
+
+    def neighbors(self, v):
+        """
+        Returns an iterable over the neighbors of v, in add_edge order.
+        """
+        self._check(v)
+        if v == 0:
+            return range(1, self.n + 1)
+        if v <= self.n:
+            first_leaf = self.n + (v - 1) * self.leaves + 1
+            return chain((0,), range(first_leaf, first_leaf + self.leaves))
+        return (self._parent(v),)
+
+    def has_edge(self, u, v):
+        """
+        Returns True if u and v are adjacent.
+        """
+        self._check(u)
+        self._check(v)
+        return self._parent(u) == v or self._parent(v) == u
+
+    def label(self, v):
+        """
+        Returns the label of vertex v.
+        """
+        self._check(v)
+        if v == 0:
+            return 1
+        if v <= self.n:
+            return 3 * v - 2 if v <= self._c + 1 else 2 * self._c + v
+        arm = self._parent(v)
+        j = (v - self.n - 1) % self.leaves + 1
+        if self.labeling == 'generalized':
+            return self.label(arm) + j * self._stride
+        return j + 1 if arm <= self._c else self.n + arm + j - 1 - 2 * self._c
+
+    def labels_of(self, vertices):
+        """
+        Vectorized label(v) over an integer array of vertex ids.
+        """
+        v = np.asarray(vertices, dtype=np.int64)
+        arm_label = np.where(v <= self._c + 1, 3 * v - 2, 2 * self._c + v)
+        leaf_index = v - self.n - 1
+        arm = leaf_index // max(self.leaves, 1) + 1
+        j = leaf_index % max(self.leaves, 1) + 1
+        if self.labeling == 'generalized':
+            parent_label = np.where(arm <= self._c + 1, 3 * arm - 2, 2 * self._c + arm)
+            leaf_label = parent_label + j * self._stride
+        else:
+            leaf_label = np.where(arm <= self._c, j + 1, self.n + arm + j - 1 - 2 * self._c)
+        return np.where(v == 0, 1, np.where(v <= self.n, arm_label, leaf_label))
+
+    def weight(self, u, v):
+        """
+        Returns the weight label(u) + label(v) of edge (u, v), raising KeyError if absent.
+        """
+        if not self.has_edge(u, v):
+            raise KeyError((u, v))
+        return self.label(u) + self.label(v)
+
+    def max_label(self):
+        """
+        Returns the largest vertex label (the k of the labeling) in O(n).
+        """
+        arms = np.arange(1, self.n + 1, dtype=np.int64)
+        best = 1
+        if self.n:
+            best = max(best, int(self.labels_of(arms).max()))
+            if self.leaves:
+                # The largest leaf of every arm is its last one
+                last_leaves = self.n + arms * self.leaves
+                best = max(best, int(self.labels_of(last_leaves).max()))
+        return best
+
+    def edges(self):
+        """
+        Yields every edge (u, v) once, in add_edge order.
+        """
+        for arm in range(1, self.n + 1):
+            yield 0, arm
+            first_leaf = self.n + (arm - 1) * self.leaves + 1
+            for leaf in range(first_leaf, first_leaf + self.leaves):
+                yield arm, leaf
+
+    def edge_chunks(self, chunk_size=1 << 20):
+        """
+        Yields (u, v, weight) int64 arrays covering all edges in add_edge order.
+
+        Each chunk spans whole arms and holds about chunk_size edges, so memory use is
+        bounded by the chunk size rather than the graph size.
+        """
+        arms_per_chunk = max(1, chunk_size // (self.leaves + 1))
+        for start in range(1, self.n + 1, arms_per_chunk):
+            arms = np.arange(start, min(start + arms_per_chunk, self.n + 1), dtype=np.int64)
+            leaf_ids = self.n + (arms[:, None] - 1) * self.leaves + np.arange(1, self.leaves + 1)
+            u = np.column_stack((np.zeros(arms.size, dtype=np.int64),
+                                 np.repeat(arms, self.leaves).reshape(arms.size, self.leaves))).ravel()
+            v = np.column_stack((arms, leaf_ids)).ravel()
+            yield u, v, self.labels_of(u) + self.labels_of(v)
+
+
+class ImplicitSnowflake:
+    def __init__(self, n, leaves=2):
+        """
+        Snowflake graph of Problem3_Alex.py answered from vertex-id formulas.
+
+        Vertex 0 is the center, 1..n are branch nodes joined in a ring (i to i % n + 1),
+        and the leaves of branch i are n + (i - 1) * leaves + 1 .. n + i * leaves.
+        Branch i is labeled 11 + 2 * leaves * (i - 1) and its leaves get the branch
+        label plus 1, 3, ..., 2 * leaves - 1 (see labeling.snowflake_labels).
+
+        Args:
+            n (int): The number of branch nodes.
+            leaves (int): The number of leaves on each branch.
+        """
+        self.n = n
+        self.leaves = leaves
+        self.order = 1 + n + n * leaves
+        self.num_edges = n * (leaves + 2)
+
+    def _check(self, v):
+        if not 0 <= v < self.order:
+            raise KeyError(v)
+
+    def _branch(self, v):
+        return (v - self.n - 1) // self.leaves + 1
+
+    def degree(self, v):
+        """
+        Returns the degree of vertex v, counting ring edges as the add_edge calls do.
+        """
+        self._check(v)
+        if v == 0:
+            return self.n
+        return self.leaves + 3 if v <= self.n else 1
+
+    def neighbors(self, v):
+        """
+        Returns an iterable over the neighbors of v, in add_edge order.
+        """
+        self._check(v)
+        if v == 0:
+            return range(1, self.n + 1)
+        if v <= self.n:
+            previous_branch = (v - 2) % self.n + 1
+            first_leaf = self.n + (v - 1) * self.leaves + 1
+            own = chain((0,), range(first_leaf, first_leaf + self.leaves), (v % self.n + 1,))
+            # The ring edge from the previous branch was added while building that branch,
+            # except for branch 1, whose ring edge from branch n is added last
+            if v == 1:
+                return chain(own, (previous_branch,))
+            return chain((previous_branch,), own)
+        return (self._branch(v),)
+
+    def has_edge(self, u, v):
+        """
+        Returns True if u and v are adjacent.
+        """
+        self._check(u)
+        self._check(v)
+        if u > v:
+            u, v = v, u
+        if u == 0:
+            return 1 <= v <= self.n
+        if v > self.n:
+            return 1 <= u <= self.n and self._branch(v) == u
+        return v == u % self.n + 1 or u == v % self.n + 1
+
+    def label(self, v):
+        """
+        Returns the label of vertex v.
+        """
+        self._check(v)
+        if v == 0:
+            return 1
+        if v <= self.n:
+            return 11 + 2 * self.leaves * (v - 1)
+        j = (v - self.n - 1) % self.leaves
+        return 11 + 2 * self.leaves * (self._branch(v) - 1) + 2 * j + 1
+
+    def labels_of(self, vertices):
+        """
+        Vectorized label(v) over an integer array of vertex ids.
+        """
+        v = np.asarray(vertices, dtype=np.int64)
+        leaves = max(self.leaves, 1)
+        leaf_index = v - self.n - 1
+        leaf_label = 11 + 2 * self.leaves * (leaf_index // leaves) + 2 * (leaf_index % leaves) + 1
+        return np.where(v == 0, 1, np.where(v <= self.n, 11 + 2 * self.leaves * (v - 1), leaf_label))
+
+    def weight(self, u, v):
+        """
+        Returns the weight label(u) + label(v) of edge (u, v), raising KeyError if absent.
+        """
+        if not self.has_edge(u, v):
+            raise KeyError((u, v))
+        return self.label(u) + self.label(v)
+
+    def max_label(self):
+        """
+        Returns the largest vertex label (the k of the labeling).
+        """
+        if not self.n:
+            return 1
+        return 11 + 2 * self.leaves * (self.n - 1) + max(2 * self.leaves - 1, 0)
+
+    def edges(self):
+        """
+        Yields every edge (u, v) once, in add_edge order.
+        """
+        for branch in range(1, self.n + 1):
+            yield 0, branch
+            first_leaf = self.n + (branch - 1) * self.leaves + 1
+            for leaf in range(first_leaf, first_leaf + self.leaves):
+                yield branch, leaf
+            yield branch, branch % self.n + 1
+
+    def edge_chunks(self, chunk_size=1 << 20):
+        """
+        Yields (u, v, weight) int64 arrays covering all edges in add_edge order.
+        """
+        branches_per_chunk = max(1, chunk_size // (self.leaves + 2))
+        for start in range(1, self.n + 1, branches_per_chunk):
+            b = np.arange(start, min(start + branches_per_chunk, self.n + 1), dtype=np.int64)
+            leaf_ids = self.n + (b[:, None] - 1) * self.leaves + np.arange(1, self.leaves + 1)
+            u = np.column_stack((np.zeros(b.size, dtype=np.int64),
+                                 np.repeat(b, self.leaves + 1).reshape(b.size, self.leaves + 1))).ravel()
+            v = np.column_stack((b, leaf_ids, b % self.n + 1)).ravel()
+            yield u, v, self.labels_of(u) + self.labels_of(v)
+
+
+def implicit_graph(family, n, m=None):
+    """
+    Returns the implicit graph of a family with the (n, m) meaning used by its script.
+
+    Args:
+        family (str): 'problem1' for S(n, m) with m - 1 leaves per arm (m defaults to 3),
+            'star' for the generalized star with m leaves per arm, or 'snowflake' with
+            m leaves per branch (m defaults to 2).
+        n (int): The number of arms or branch nodes.
+        m (int, optional): Arm size parameter.
+    """
+    if family == 'problem1':
+        return ImplicitStar(n, (3 if m is None else m) - 1, labeling='amalgamated')
+    if family == 'star':
+        return ImplicitStar(n, m, labeling='generalized')
+    if family == 'snowflake':
+        return ImplicitSnowflake(n, 2 if m is None else m)
+    raise ValueError(f"Unknown graph family: {family}")
@@ -0,0 +1,178 @@
+# Named, nestable timing and memory spans with a JSON report
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_recorder = None  # The active Recorder, None while instrumentation is disabled
+
+
+class _NullSpan:
+    """
+    Context manager returned by span() while instrumentation is disabled.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Frame:
+    __slots__ = ('name', 'path', 'depth', 'start_ns', 'base_bytes', 'peak_bytes')
+
+    def __init__(self, name, path, depth, start_ns, base_bytes):
+        self.name = name
+        self.path = path
+        self.depth = depth
+        self.start_ns = start_ns
+        self.base_bytes = base_bytes
+        self.peak_bytes = 0  # Highest traced size seen by finished child spans
+
+
+class Recorder:
+    def __init__(self, memory=True):
+        """
+        Collects finished spans for one run.
+
+        Args:
+            memory (bool): Trace allocations with tracemalloc so every span also reports
+                its peak; timing-only recording is much cheaper.
+        """
+        self.memory = memory
+        self.spans = []
+        self._stack = []
+        self._started_tracing = False
+        self.start_ns = time.perf_counter_ns()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def enter(self, name):
+        parent = self._stack[-1] if self._stack else None
+        base = 0
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.peak_bytes = max(parent.peak_bytes, peak)
+            tracemalloc.reset_peak()
+            base = current
+        path = f"{parent.path}/{name}" if parent is not None else name
+        self._stack.append(_Frame(name, path, len(self._stack), time.perf_counter_ns(), base))
+
+    def exit(self):
+        end = time.perf_counter_ns()
+        frame = self._stack.pop()
+        record = {'name': frame.name, 'path': frame.path, 'depth': frame.depth,
+                  'start_ns': frame.start_ns - self.start_ns, 'wall_ns': end - frame.start_ns}
+        if self.memory:
+            peak = max(frame.peak_bytes, tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1].peak_bytes = max(self._stack[-1].peak_bytes, peak)
+            record['peak_bytes'] = peak - frame.base_bytes  # Growth above the size at entry
+        self.spans.append(record)
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self, **metadata):
+        """
+        Builds the JSON-ready report: run metadata, every span and per-path totals.
+
+        Spans are listed in the order they finished; start_ns is relative to the start
+        of recording.
+        """
+        totals = {}
+        for record in self.spans:
+            total = totals.setdefault(record['path'], {'count': 0, 'wall_ns': 0, 'peak_bytes': 0})
+            total['count'] += 1
+            total['wall_ns'] += record['wall_ns']
+            total['peak_bytes'] = max(total['peak_bytes'], record.get('peak_bytes', 0))
+        run = {'argv': sys.argv, 'pid': os.getpid(), 'python': sys.version.split()[0],
+               'time': time.time(), 'wall_ns': time.perf_counter_ns() - self.start_ns,
+               'memory_traced': self.memory}
+        run.update(metadata)
+        return {'run': run, 'spans': self.spans, 'totals': totals}
+
+
+@contextmanager
+def _span(recorder, name):
+    recorder.enter(name)
+    try:
+        yield
+    finally:
+        recorder.exit()
+
+
+def span(name):
+    """
+    Times the enclosed block as a span called name, nested under any open span.
+
+        with span('labeling'):
+            graph.vertex_k_labeling()
+
+    While instrumentation is disabled this returns a shared no-op context manager,
+    so instrumented code pays one global lookup and one call.
+    """
+    if _recorder is None:
+        return _NULL_SPAN
+    return _span(_recorder, name)
+
+
+def enable(memory=True):
+    """
+    Starts recording spans, replacing any previous recording.
+
+    Returns:
+        Recorder: The new recorder.
+    """
+    global _recorder
+    disable()
+    _recorder = Recorder(memory)
+    return _recorder
+
+
+def disable():
+    """
+    Stops recording and returns the finished Recorder, or None if none was active.
+    """
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.close()
+    return recorder
+
+
+def enabled():
+    return _recorder is not None
+
+
+def write_report(path, **metadata):
+    """
+    Stops recording and writes the report as JSON to path ('-' for stdout).
+
+    Args:
+        path (str): Output file.
+        **metadata: Extra run fields, e.g. family=..., n=....
+
+    Returns:
+        dict: The report written, or None if instrumentation was not enabled.
+    """
+    recorder = disable()
+    if recorder is None:
+        return None
+    report = recorder.report(**metadata)
+    if path == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+    return report
@@ -0,0 +1,142 @@
+# Two-level labeling cache: in-process LRU over memory-mapped .npy files on disk
+import contextlib
+import glob
+import hashlib
+import inspect
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import labeling
+from families import LABELING_VERSION, family_labels, family_shape
+from implicit_graph import ImplicitSnowflake
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(_HERE, '.label_cache')
+STALE_TEMP_SECONDS = 3600  # Temporary files this old were left by a killed writer
+
+
+def labeling_version():
+    """
+    Version tag of the labeling code: LABELING_VERSION plus a hash of the label formulas.
+
+    Editing any labeling function changes the tag, which invalidates cached entries
+    without anyone having to remember to bump a number.
+    """
+    sources = [inspect.getsource(function) for function in (
+        labeling.inner_vertex_labels,
+        labeling.amalgamated_star_labels,
+        labeling.generalized_star_labels,
+        labeling.snowflake_labels,
+        ImplicitSnowflake.labels_of,
+        family_labels,
+    )]
+    digest = hashlib.sha1(''.join(sources).encode()).hexdigest()[:12]
+    return f"{LABELING_VERSION}-{digest}"
+
+
+class LabelCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=256 * 1024 * 1024):
+        """
+        Memoizes family labelings in memory and on disk.
+
+        Lookups go to a size-bounded in-process LRU first, then to a memory-mapped
+        .npy file on disk, and only then to the labeling code. Files written by a
+        different labeling version, and temporary files left by killed writers, are
+        deleted when the cache is opened; several processes may open the same
+        directory at once.
+
+        Args:
+            directory (str, optional): Where label files are kept; None keeps the cache
+                in memory only.
+            max_bytes (int): Bound on the total size of arrays held by the LRU.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = labeling_version()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = self.disk_hits = self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            for path in glob.glob(os.path.join(directory, '*.npy')):
+                if not path.endswith(f"-v{self.version}.npy"):
+                    with contextlib.suppress(FileNotFoundError):  # Another process got there first
+                        os.remove(path)
+            for path in glob.glob(os.path.join(directory, '*.tmp')):
+                with contextlib.suppress(FileNotFoundError):
+                    if os.path.getmtime(path) < time.time() - STALE_TEMP_SECONDS:
+                        os.remove(path)
+
+    def _path(self, key):
+        family, n, m = key
+        return os.path.join(self.directory, f"{family}-{n}-{m}-v{self.version}.npy")
+
+    def _remember(self, key, labels):
+        self._entries[key] = labels
+        self._bytes += labels.nbytes
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def get(self, family, n, m=None):
+        """
+        Returns the read-only label array of a family member, computing it at most once.
+        """
+        n, m, _ = family_shape(family, n, m)
+        key = (family, n, m)
+        labels = self._entries.get(key)
+        if labels is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return labels
+
+        if self.directory and os.path.exists(self._path(key)):
+            labels = np.load(self._path(key), mmap_mode='r')
+            self.disk_hits += 1
+        else:
+            labels = family_labels(family, n, m)
+            labels.flags.writeable = False
+            self.misses += 1
+            if self.directory:
+                # Write to a temporary file first so readers never see a partial array
+                handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+                try:
+                    with os.fdopen(handle, 'wb') as file:
+                        np.save(file, labels)
+                    os.replace(temporary, self._path(key))
+                finally:
+                    with contextlib.suppress(FileNotFoundError):  # Gone once replaced
+                        os.remove(temporary)
+        self._remember(key, labels)
+        return labels
+
+    def clear(self):
+        """
+        Drops every entry from memory and disk.
+        """
+        self._entries.clear()
+        self._bytes = 0
+        if self.directory:
+            for path in glob.glob(os.path.join(self.directory, '*.npy')):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+
+
+_OPEN_CACHES = {}
+
+
+def open_cache(directory=DEFAULT_CACHE_DIR):
+    """
+    Returns this process's LabelCache for directory, opening it on first use.
+
+    Pool workers call this once per task, so each process sweeps the directory for
+    stale files only once and keeps its in-memory LRU across tasks.
+    """
+    cache = _OPEN_CACHES.get(directory)
+    if cache is None:
+        cache = _OPEN_CACHES[directory] = LabelCache(directory)
+    return cache
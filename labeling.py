@@ -0,0 +1,126 @@
+# Vectorized vertex labelings for the amalgamated star and the snowflake
+from collections.abc import Mapping
+
+import numpy as np
+
+
+def inner_vertex_labels(n):
+    """
+    Labels of the inner vertices 1..n under the piecewise ceil(n / 4) rule.
+
+    Args:
+        n (int): The number of inner vertices (arms).
+
+    Returns:
+        numpy.ndarray: Labels of vertices 1..n, in order.
+    """
+    c = -(-n // 4)  # ceil(n / 4), computed once
+    i = np.arange(1, n + 1, dtype=np.int64)
+    return np.where(i <= c + 1, 3 * i - 2, 2 * c + i)
+
+
+def amalgamated_star_labels(n):
+    """
+    Builds the vertex k-labeling of S(n, 3) used by problem1_Ashna.py and new.py.
+
+    Vertex 0 is the center, 1..n are the inner vertices and every arm has two leaves
+    numbered consecutively after n. Leaves of the first ceil(n / 4) arms get labels
+    j + 1, the remaining arms get n + i + j - 1 - 2 * ceil(n / 4).
+
+    Args:
+        n (int): The number of inner vertices.
+
+    Returns:
+        numpy.ndarray: Contiguous int64 array of 3n + 1 labels indexed by vertex.
+
+    Raises:
+        ValueError: If n % 4 == 1, for which the construction is not defined.
+    """
+    if n % 4 == 1:
+        raise ValueError(f"S(n, 3) labeling is not defined for n % 4 == 1 (n = {n})")
+    c = -(-n // 4)
+    labels = np.empty(3 * n + 1, dtype=np.int64)
+    labels[0] = 1
+    labels[1:n + 1] = inner_vertex_labels(n)
+
+    # Leaf rule broadcast over arms x leaves (j = 1, 2)
+    i = np.arange(1, n + 1, dtype=np.int64)[:, None]
+    j = np.arange(1, 3, dtype=np.int64)[None, :]
+    labels[n + 1:] = np.where(i <= c, j + 1, n + i + j - 1 - 2 * c).ravel()
+    return labels
+
+
+def generalized_star_labels(n, m):
+    """
+    Builds the generalized vertex labeling of Problem2_Melisa.py for any n and m.
+
+    Leaf j of arm i (vertex n + (i - 1) * m + j) gets the arm label plus j * max(n, m).
+
+    Args:
+        n (int): The number of arms.
+        m (int): The number of leaves per arm.
+
+    Returns:
+        numpy.ndarray: Contiguous int64 array of 1 + n + n*m labels indexed by vertex.
+    """
+    labels = np.empty(1 + n + n * m, dtype=np.int64)
+    labels[0] = 1
+    inner = inner_vertex_labels(n)
+    labels[1:n + 1] = inner
+    increment = max(n, m)
+    j = np.arange(1, m + 1, dtype=np.int64)
+    labels[n + 1:] = (inner[:, None] + j[None, :] * increment).ravel()
+    return labels
+
+
+def snowflake_labels(n, leaves=2):
+    """
+    Builds the snowflake labeling of Problem3_Alex.py, generalized to any number of leaves.
+
+    Branch i gets 11 + 2 * leaves * (i - 1) and its leaves the branch label plus
+    1, 3, ..., 2 * leaves - 1, so with two leaves branches step by 4 from 11 and the
+    leaves get +1 and +3, as in the original loop.
+
+    Args:
+        n (int): The number of branch nodes.
+        leaves (int): The number of leaves on each branch.
+
+    Returns:
+        numpy.ndarray: Contiguous int64 array of 1 + n + n * leaves labels indexed by vertex.
+    """
+    labels = np.empty(1 + n + n * leaves, dtype=np.int64)
+    labels[0] = 1
+    branch = 11 + 2 * leaves * np.arange(n, dtype=np.int64)
+    labels[1:n + 1] = branch
+    offsets = 2 * np.arange(leaves, dtype=np.int64) + 1
+    labels[n + 1:] = (branch[:, None] + offsets[None, :]).ravel()
+    return labels
+
+
+class LabelView(Mapping):
+    """
+    Read-only {vertex: label} view of a label array.
+
+    Lets code written against the old vertex_labels dictionary iterate, print and
+    index labels while the data stays in one contiguous array.
+    """
+
+    def __init__(self, labels):
+        self._labels = labels
+
+    def __getitem__(self, vertex):
+        if not 0 <= vertex < self._labels.size:
+            raise KeyError(vertex)
+        return int(self._labels[vertex])
+
+    def __iter__(self):
+        return iter(range(self._labels.size))
+
+    def __len__(self):
+        return self._labels.size
+
+    def items(self):
+        return enumerate(self._labels.tolist())
+
+    def values(self):
+        return iter(self._labels.tolist())
@@ -0,0 +1,174 @@
+# Compact binary container for labelings, reloaded as memory-mapped array views
+import struct
+
+import numpy as np
+
+from label_cache import labeling_version
+from verify import verify_edge_weights
+
+MAGIC = b'EIKLABEL'
+FORMAT_VERSION = 1
+HEADER_SIZE = 128
+ALIGNMENT = 64  # Every array starts on a 64-byte boundary
+
+# magic, format version, family, labeling version, n, m (-1 if None), k, max weight,
+# order, edge count, label itemsize, edge endpoint itemsize, weight itemsize
+_HEADER = struct.Struct('<8sI16s32sqqqqqqBBB')
+
+
+def _dtype_for(max_value):
+    return np.dtype('<i4') if max_value < 2 ** 31 else np.dtype('<i8')
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _layout(order, num_edges, label_dtype, vertex_dtype, weight_dtype):
+    """
+    Returns the byte offsets of the labels, u, v and weight arrays.
+    """
+    offsets = []
+    position = HEADER_SIZE
+    for count, dtype in ((order, label_dtype), (num_edges, vertex_dtype),
+                         (num_edges, vertex_dtype), (num_edges, weight_dtype)):
+        offsets.append(position)
+        position = _aligned(position + count * dtype.itemsize)
+    return offsets, position
+
+
+def canonical_edges(u, v, weight):
+    """
+    Orders every edge as (min, max) and sorts the edge list by (u, v).
+
+    Returns:
+        tuple: (u, v, weight) arrays in canonical order.
+    """
+    low, high = np.minimum(u, v), np.maximum(u, v)
+    order = np.lexsort((high, low))
+    return low[order], high[order], np.asarray(weight)[order]
+
+
+def save_labeling(path, family, n, m, labels, u, v, weight):
+    """
+    Writes a labeling as a header followed by fixed-width little-endian arrays.
+
+    The edge list is stored in canonical order (see canonical_edges), which lets the
+    loader find the weight of an edge by binary search without building an index.
+    Each array uses 32-bit integers when its values fit and 64-bit otherwise.
+
+    Args:
+        path (str): The file to write.
+        family (str): 'problem1', 'star' or 'snowflake'.
+        n (int): The number of arms or branch nodes.
+        m (int): Arm size parameter; None for the two-leaf snowflake.
+        labels (array-like): Label of every vertex.
+        u, v, weight (array-like): One row per undirected edge.
+    """
+    labels = np.asarray(labels)
+    u, v, weight = canonical_edges(np.asarray(u), np.asarray(v), weight)
+    order, num_edges = labels.size, u.size
+    k = int(labels.max()) if order else 0
+    max_weight = int(weight.max()) if num_edges else 0
+    label_dtype = _dtype_for(k)
+    vertex_dtype = _dtype_for(order)
+    weight_dtype = _dtype_for(max_weight)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, family.encode(), labeling_version().encode(),
+                          n, -1 if m is None else m, k, max_weight, order, num_edges,
+                          label_dtype.itemsize, vertex_dtype.itemsize, weight_dtype.itemsize)
+    offsets, end = _layout(order, num_edges, label_dtype, vertex_dtype, weight_dtype)
+    with open(path, 'wb') as file:
+        file.write(header.ljust(HEADER_SIZE, b'\0'))
+        for offset, array, dtype in zip(offsets, (labels, u, v, weight),
+                                        (label_dtype, vertex_dtype, vertex_dtype, weight_dtype)):
+            file.write(b'\0' * (offset - file.tell()))
+            file.write(np.ascontiguousarray(array, dtype=dtype).data)
+        file.write(b'\0' * (end - file.tell()))
+
+
+def save_graph(path, graph):
+    """
+    Writes a families.LabeledGraph with save_labeling.
+    """
+    save_labeling(path, graph.family, graph.n, graph.m, graph.labels,
+                  graph.edges.u, graph.edges.v, graph.edges.weight)
+
+
+class LabelingFile:
+    def __init__(self, path):
+        """
+        A labeling file opened with memory-mapped, read-only array views.
+
+        Nothing but the header is read up front; the labels, u, v and weight attributes
+        are zero-copy numpy.memmap views, so queries and verification only touch the
+        pages they need.
+
+        Args:
+            path (str): A file written by save_labeling.
+        """
+        with open(path, 'rb') as file:
+            raw = file.read(HEADER_SIZE)
+        if len(raw) < _HEADER.size or raw[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a labeling file")
+        (_, version, family, algorithm, self.n, m, self.k, self.max_weight, self.order,
+         self.num_edges, label_size, vertex_size, weight_size) = _HEADER.unpack_from(raw)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported labeling file version {version}")
+        self.path = path
+        self.family = family.rstrip(b'\0').decode()
+        self.labeling_version = algorithm.rstrip(b'\0').decode()
+        self.m = None if m < 0 else m
+
+        dtypes = [np.dtype(f'<i{size}') for size in (label_size, vertex_size, vertex_size, weight_size)]
+        offsets, _ = _layout(self.order, self.num_edges, dtypes[0], dtypes[1], dtypes[3])
+        counts = (self.order, self.num_edges, self.num_edges, self.num_edges)
+        self.labels, self.u, self.v, self.weight = (
+            np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,)) if count else
+            np.zeros(0, dtype=dtype)
+            for dtype, offset, count in zip(dtypes, offsets, counts))
+
+    @property
+    def current(self):
+        """
+        True if the file was written by the labeling code currently installed.
+        """
+        return self.labeling_version == labeling_version()
+
+    def weight_of(self, u, v):
+        """
+        Returns the weight of edge (u, v) in either order by binary search, or raises KeyError.
+        """
+        low, high = min(u, v), max(u, v)
+        start = int(np.searchsorted(self.u, low, side='left'))
+        stop = int(np.searchsorted(self.u, low, side='right'))
+        row = start + int(np.searchsorted(self.v[start:stop], high))
+        if row >= stop or self.v[row] != high:
+            raise KeyError((u, v))
+        return int(self.weight[row])
+
+    def edge_chunks(self, chunk_size=1 << 22):
+        """
+        Yields (u, v, weight) int64 chunks, reading the mapped file sequentially.
+        """
+        for start in range(0, self.num_edges, chunk_size):
+            stop = start + chunk_size
+            yield (self.u[start:stop].astype(np.int64), self.v[start:stop].astype(np.int64),
+                   self.weight[start:stop].astype(np.int64))
+
+    def verify(self, collisions=False):
+        """
+        Checks that all edge weights are distinct, streaming over the mapped arrays.
+        """
+        return verify_edge_weights(self, self.max_weight, collisions=collisions)
+
+    def __repr__(self):
+        return (f"LabelingFile({self.path!r}, family={self.family!r}, n={self.n}, m={self.m}, "
+                f"k={self.k}, edges={self.num_edges})")
+
+
+def load_labeling(path):
+    """
+    Opens a labeling file written by save_labeling (see LabelingFile).
+    """
+    return LabelingFile(path)
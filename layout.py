@@ -0,0 +1,41 @@
+# Closed-form radial layout for star and snowflake drawings
+import numpy as np
+
+
+def radial_positions(n, leaves, arm_radius=1.0, leaf_radius=1.5):
+    """
+    Computes node positions for a center/arms/leaves graph without any simulation.
+
+    Vertex 0 sits at the origin, arm i (1..n) on a circle of radius arm_radius at
+    angle 2 * pi * (i - 1) / n, and leaf j of arm i (vertex n + (i - 1) * leaves + j)
+    on a circle of radius leaf_radius at angle 2 * pi * ((i - 1) * leaves + j - 1) / (n * leaves),
+    the same placement Problem3_Alex.py used for the snowflake. Everything is computed
+    with array operations, so the layout is O(n * leaves) and fully deterministic.
+
+    Args:
+        n (int): The number of arms or branch nodes.
+        leaves (int): The number of leaves on each arm.
+        arm_radius (float): Radius of the arm circle.
+        leaf_radius (float): Radius of the leaf circle.
+
+    Returns:
+        numpy.ndarray: (order, 2) array of x, y positions indexed by vertex.
+    """
+    positions = np.zeros((1 + n + n * leaves, 2))
+    if n == 0:
+        return positions
+    arm_angles = 2 * np.pi * np.arange(n) / n
+    positions[1:n + 1, 0] = arm_radius * np.cos(arm_angles)
+    positions[1:n + 1, 1] = arm_radius * np.sin(arm_angles)
+    if leaves:
+        leaf_angles = 2 * np.pi * np.arange(n * leaves) / (n * leaves)
+        positions[n + 1:, 0] = leaf_radius * np.cos(leaf_angles)
+        positions[n + 1:, 1] = leaf_radius * np.sin(leaf_angles)
+    return positions
+
+
+def radial_layout(n, leaves, arm_radius=1.0, leaf_radius=1.5):
+    """
+    Returns radial_positions as the {vertex: (x, y)} dictionary networkx drawing expects.
+    """
+    return dict(enumerate(radial_positions(n, leaves, arm_radius, leaf_radius)))
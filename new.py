@@ -1,9 +1,16 @@
 # Importing necessary libraries
+import argparse
 import math
-import networkx as nx
-import matplotlib.pyplot as plt
-import time
-import psutil
+import numpy as np
+from capacity import plan_capacity
+from cli import add_graph_arguments, finish_profile, open_label_cache, start_profile
+from export import write_labeling
+from families import family_shape
+from graph_core import CSRStorage, star_edges
+from instrument import span
+from labeling import LabelView, amalgamated_star_labels
+from layout import radial_layout
+from verify import verify_edge_weights
 
 # Class definition for a graph
 class Graph:
@@ -22,9 +29,35 @@ class Graph:
         self.k = math.ceil((m * n + 1) / 2)
         self.order = math.ceil(m * n + 1)
         # Initializing data structures to represent the graph
-        self.adj_list = {i: [] for i in range(self.order)}  # Adjacency list representation of the graph
-        self.edge_weights = {}  # Dictionary to store edge weights
-        self.vertex_labels = {i: None for i in range(self.order)}  # Dictionary to store vertex labels
+        self.storage = CSRStorage(self.order)  # Compact CSR adjacency, exposed read-only through adj_list
+        self.labels = np.zeros(self.order, dtype=np.int64)  # Vertex labels indexed by vertex, 0 until labeled
+
+    @property
+    def adj_list(self):
+        """
+        Read-only adjacency list view backed by the CSR arrays.
+        """
+        return self.storage.csr.adjacency_view()
+
+    @property
+    def vertex_labels(self):
+        """
+        Read-only {vertex: label} view of the label array.
+        """
+        return LabelView(self.labels)
+
+    @property
+    def edge_weights(self):
+        """
+        Read-only {(u, v): weight} view with one entry per undirected edge, found in either order.
+        """
+        return self.storage.edges.as_mapping()
+
+    def build_star(self):
+        """
+        Adds all edges of S(n, m) in one bulk step: each arm has its inner vertex and m - 1 leaves.
+        """
+        self.storage.load_edges(*star_edges(self.n, self.m - 1))
     
     def add_edge(self, u, v, weight):
         """
@@ -35,41 +68,25 @@ class Graph:
             v (int): The other end of the edge.
             weight (int): The weight to be assigned to the edge.
         """
-        # Adding edge to the adjacency list
-        self.adj_list[u].append(v)
-        self.adj_list[v].append(u)
-        # Storing edge weight in both directions
-        self.edge_weights[(u, v)] = weight
-        self.edge_weights[(v, u)] = weight
+        # Adding edge to the adjacency list and storing its weight once in the edge table
+        self.storage.add_edge(u, v, weight)
 
-    def vertex_k_labeling(self):
+    def vertex_k_labeling(self, cache=None):
         """
         Calculates vertex labels for the graph.
+
+        The labels of S(n, 3) are built as one array (see labeling.amalgamated_star_labels).
+
+        Args:
+            cache (LabelCache, optional): Reuses a previously computed labeling.
+
+        Raises:
+            ValueError: If the graph is not S(n, 3), or n % 4 == 1.
         """
-        # Setting label for central vertex
-        self.vertex_labels[0] = 1
-
-        # Case 1
-        if self.n % 4 == 0 or self.n % 4 == 2 or self.n % 4 == 3:
-            # Labeling internal vertices
-            for i in range(1, self.n + 1):
-                vertex = i
-                if 1 <= i <= math.ceil(self.n / 4) + 1:
-                    self.vertex_labels[vertex] = 3 * i - 2
-                elif math.ceil(self.n / 4) + 1 <= i <= self.n:
-                    self.vertex_labels[vertex] = 2 * math.ceil(self.n / 4) + i
-    
-            # Labeling external vertices
-            vertex += 1
-            for i in range(1, (math.ceil(self.n / 4) + 1)):
-                for j in range(1, 3):  
-                    self.vertex_labels[vertex] =  j + 1
-                    vertex = vertex + 1
-   
-            for i in range((math.ceil(self.n / 4) + 1), self.n + 1):
-                for j in range(1, 3):
-                    self.vertex_labels[vertex] = self.n + i + j - 1 - 2 * math.ceil(self.n / 4)
-                    vertex = vertex + 1
+        if self.m != 3:
+            raise ValueError("The problem1 labeling is only defined for S(n, 3)")
+        labels = cache.get('problem1', self.n) if cache else amalgamated_star_labels(self.n)
+        self.labels[:] = labels
         
         return self.vertex_labels
     
@@ -77,13 +94,9 @@ class Graph:
         """
         Calculates edge weights based on vertex labels and adjacency list.
         """
-        for vertex, neighbors in self.adj_list.items():
-            for neighbor in neighbors:
-                # Calculate edge weight by summing up the labels of the two vertices
-                weight = self.vertex_labels[vertex] + self.vertex_labels[neighbor]
-                self.edge_weights[(vertex, neighbor)] = weight
-                self.edge_weights[(neighbor, vertex)] = weight
-        
+        # Edge weight is the sum of the labels of the two vertices, computed once per undirected edge
+        self.storage.edges.compute_weights(self.labels)
+
         return self.edge_weights
     
     def get_adj_list(self):
@@ -91,10 +104,16 @@ class Graph:
         Returns the adjacency list of the graph.
         """
         return self.adj_list
-    def visualize_graph(self):
+    def visualize_graph(self, path=None):
         """
         Visualizes the graph using NetworkX and Matplotlib.
+
+        Args:
+            path (str, optional): Image file to save to; the drawing is shown in a window otherwise.
         """
+        import matplotlib.pyplot as plt
+        import networkx as nx
+
         G = nx.Graph()
         G.add_nodes_from(range(self.order))
 
@@ -103,14 +122,14 @@ class Graph:
             for neighbor in neighbors:
                 G.add_edge(vertex, neighbor)
 
-        pos = nx.spring_layout(G)  # positions for all nodes
+        pos = radial_layout(self.n, self.m - 1)  # closed-form positions: center, arm circle, leaf circle
 
         # Preparing and adding node labels
         labels = {node: str(label) for node, label in self.vertex_labels.items()}
         nx.draw_networkx_labels(G, pos, labels=labels, font_size=10, font_color='black')
 
-        # Extract edge labels for unique edge weights, assuming self.edge_labels is correctly populated
-        edge_weights = {(u, v): f"{w}" for (u, v), w in self.edge_labels.items()}
+        # Extract edge labels for unique edge weights, one per undirected edge
+        edge_weights = {(u, v): f"{w}" for (u, v), w in self.edge_weights.items()}
 
         # Drawing the graph
         nx.draw(G, pos, with_labels=False, node_color='skyblue', node_size=1500)
@@ -118,79 +137,90 @@ class Graph:
         # Drawing edge labels
         nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_weights, font_color='red')
 
-        # Displaying the graph
-        plt.show()
+        # Displaying or saving the graph
+        if path:
+            plt.savefig(path)
+            plt.close()
+        else:
+            plt.show()
     
 def available_memory():
+    import psutil
     return psutil.virtual_memory().available
 
 def test_limits(initial_n, initial_m, base_increment, memory_limit_ratio=0.8, timeout_seconds=300):
-    n, m = initial_n, initial_m
-    increment = base_increment
-    max_n, max_m = n, m
+    """
+    Finds the largest graph that fits in the available memory.
+
+    A memory model fitted on a few small builds predicts the limit, which is then
+    confirmed by exponential search and bisection, each trial build running in a
+    fresh subprocess (see capacity.plan_capacity).
+
+    Args:
+        initial_n (int): Smallest n to consider.
+        initial_m (int): Smallest m to consider.
+        base_increment (int): Resolution of the final search.
+        memory_limit_ratio (float): Fraction of the available memory one build may use.
+        timeout_seconds (float): Time budget for the whole search.
+
+    Returns:
+        tuple: The largest supported (n, m).
+    """
     memory_limit = available_memory() * memory_limit_ratio
-    start_time = time.time()
-
-    while True:
-        if time.time() - start_time > timeout_seconds:
-            print("Testing timeout reached. Returning the last found values.")
-            break
-
-        try:
-            graph = Graph(n, m)
-            graph.build_graph()
-
-            # Estimate current memory usage
-            current_memory_usage = psutil.Process().memory_info().rss
-
-            if current_memory_usage > memory_limit:
-                if increment > 1:
-                    # If the limit is reached, step back and reduce increment
-                    n -= increment
-                    m -= increment
-                    increment = 1  # Fine-tune with smallest possible increment
-                    continue
-                break  # Break if already at smallest increment
-
-            max_n, max_m = n, m
-            n += increment
-            m += increment  # Increment both n and m
-
-        except MemoryError:
-            break
-
-    return max_n, max_m
+    plan = plan_capacity('problem1', memory_limit, min_scale=max(initial_n, initial_m),
+                         resolution=base_increment, timeout_seconds=timeout_seconds)
+    if not plan.confirmed:
+        print("Testing timeout reached. Returning the last found values.")
+    return plan.n, plan.m
 
 # Main function modifications for clarity and consistency:
 
-def main():
-    user_input = input("Enter 'test' to find the hardware limits or 'build' to specify n and m: ").strip().lower()
+def main(argv=None):
+    parser = add_graph_arguments(argparse.ArgumentParser(
+        description="Find the hardware limits (--test) or build and label S(n, m)."), family='problem1')
+    parser.add_argument('--test', action='store_true', help="find the hardware limits instead of building")
+    parser.add_argument('--show', action='store_true', help="open the drawing in a window")
+    args = parser.parse_args(argv)
 
-    if user_input == "test":
+    if args.test:
         print("Testing hardware limits. This might take a while...")
         max_n, max_m = test_limits(1, 1, 1)
         print(f"Maximum supported n: {max_n}, Maximum supported m: {max_m}")
-    elif user_input == "build":
-        n = int(input("Enter the number of arms (n): "))
-        m = int(input("Enter the number of leaves per arm (m): "))
-        graph = Graph(n, m)
-        
-        # Edge addition adjusted to include all leaves for each arm
-        outer_verts = n
-        for i in range(1, n + 1):
-            graph.add_edge(0, i, 0)  # Central to inner vertices
-            for j in range(1, m + 1):  # Correctly account for all m leaves
-                outer_verts += 1
-                graph.add_edge(i, outer_verts, 0)  # Inner vertex to leaves
+    elif args.n is None or args.m is None:
+        parser.error("--n and --m are required unless --test is given")
+    else:
+        try:
+            family_shape('problem1', args.n, args.m)
+        except ValueError as error:
+            parser.error(str(error))
+        start_profile(args)
+        graph = Graph(args.n, args.m)
+
+        # Central to inner vertices, inner vertices to their leaves (order = m * n + 1)
+        with span('build'):
+            graph.build_star()
 
         # Compute labels and weights
-        vertex_labels = graph.vertex_k_labeling()
-        edge_weights = graph.calculate_edge_weights()
+        with span('vertex_k_labeling'):
+            vertex_labels = graph.vertex_k_labeling(open_label_cache(args))
+        with span('weights'):
+            edge_weights = graph.calculate_edge_weights()
+        print(f"Built S({graph.n}, {graph.m}): {graph.order} vertices, k = {int(graph.labels.max())}")
+
+        if args.verify:
+            with span('verify'):
+                result = verify_edge_weights(edge_weights)
+            print(f"All edge values are unique: {result.unique}")
+            print(f"Maximum edge weight value: {result.max_weight}")
+        if args.output:
+            with span('output'):
+                write_labeling(args.output, graph.labels, graph.storage.edges)
 
         # Visualize the graph
-        graph.visualize_graph()
-    else:
-        print("Invalid input. Please enter 'test' or 'build'.")
+        if args.draw or args.show:
+            with span('draw'):
+                graph.visualize_graph(args.draw)
+        finish_profile(args, 'problem1')
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,210 @@
+# Edge-irregularity verification split across processes over shared memory
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from verify import VerificationResult
+
+CHUNK_SIZE = 1 << 22  # Edges per vectorized step inside a worker
+
+
+def _share(array):
+    """
+    Copies array into a new shared memory block and returns (block, descriptor).
+    """
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(descriptor):
+    """
+    Maps a shared block described by _share into this process without taking ownership.
+    """
+    name, shape, dtype = descriptor
+    try:
+        block = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the block, but pool workers share the parent's
+        # resource tracker, which already holds the name, so the parent's unlink clears it
+        block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _weights(arrays, start, stop):
+    if 'weight' in arrays:
+        return arrays['weight'][start:stop].astype(np.int64)
+    labels = arrays['labels']
+    return labels[arrays['u'][start:stop]].astype(np.int64) + labels[arrays['v'][start:stop]]
+
+
+def _with_arrays(descriptors, function, *args):
+    """
+    Attaches every shared block, runs function(arrays, *args), and detaches again.
+
+    function must not return views into the blocks, since they are closed afterwards.
+    """
+    blocks, arrays = [], {}
+    for key, descriptor in descriptors.items():
+        block, arrays[key] = _attach(descriptor)
+        blocks.append(block)
+    try:
+        return function(arrays, *args)
+    finally:
+        arrays.clear()
+        for block in blocks:
+            block.close()
+
+
+def _mark_range(arrays, slot, start, stop, max_weight):
+    """
+    Marks the weights of edges start..stop in the worker's seen bitset, and weights seen
+    twice inside the range in its repeat bitset.
+
+    Returns:
+        int: The largest weight in the range.
+    """
+    seen, repeated = arrays['bitsets'][slot]
+    largest = 0
+    for chunk in range(start, stop, CHUNK_SIZE):
+        weight = _weights(arrays, chunk, min(chunk + CHUNK_SIZE, stop))
+        if weight.size == 0:
+            continue
+        if weight.min() < 0 or weight.max() > max_weight:
+            raise ValueError(f"Edge weight outside of [0, {max_weight}]")
+        weight.sort()
+        largest = max(largest, int(weight[-1]))
+        again = weight[1:] == weight[:-1]
+        distinct = weight[np.r_[True, ~again]]
+        earlier = (seen[distinct >> 3] >> (distinct & 7)) & 1 != 0
+        repeat = np.union1d(weight[1:][again], distinct[earlier])
+        for target, weights in ((seen, distinct), (repeated, repeat)):
+            index, mask = _pack(weights)
+            target[index] |= mask
+    return largest
+
+
+def _pack(weights):
+    """
+    Turns sorted distinct weights into (byte index, bit mask) arrays, one entry per byte.
+    """
+    index = weights >> 3
+    mask = np.left_shift(1, weights & 7).astype(np.uint8)
+    if index.size == 0:
+        return index, mask
+    starts = np.r_[0, np.nonzero(index[1:] != index[:-1])[0] + 1]
+    return index[starts], np.bitwise_or.reduceat(mask, starts)
+
+
+def _collect_range(arrays, start, stop):
+    """
+    Lists the edges of start..stop whose weight is marked in the merged duplicate bitset.
+    """
+    duplicates = arrays['duplicates']
+    found = []
+    for chunk in range(start, stop, CHUNK_SIZE):
+        end = min(chunk + CHUNK_SIZE, stop)
+        weight = _weights(arrays, chunk, end)
+        hits = np.nonzero(duplicates[weight >> 3] & np.left_shift(1, weight & 7).astype(np.uint8))[0]
+        u, v = arrays['u'][chunk:end][hits], arrays['v'][chunk:end][hits]
+        found.extend(zip(weight[hits].tolist(), u.tolist(), v.tolist()))
+    return found
+
+
+def verify_edge_weights_parallel(u, v, weight=None, labels=None, max_weight=None, workers=None,
+                                 collisions=False):
+    """
+    Checks that every edge weight is distinct using several processes.
+
+    The edge arrays (and labels, or precomputed weights) are copied once into shared
+    memory. Each worker takes a contiguous edge range, computes its weights, and marks
+    them in its own pair of bitsets in a shared block: weights seen, and weights seen
+    twice inside the range. The parent merges the bitsets (a weight is repeated if a
+    worker saw it twice or two workers saw it), so no edge data is ever pickled. With
+    collisions=True a second parallel pass lists the edges carrying a repeated weight.
+
+    The unique flag, largest weight and collision report match verify_edge_weights
+    with collisions=True; every edge is always checked, so edges_checked is |E|.
+
+    Args:
+        u, v (array-like): Endpoints of every undirected edge.
+        weight (array-like, optional): Edge weights; computed from labels when omitted.
+        labels (array-like, optional): Vertex labels, required when weight is omitted.
+        max_weight (int, optional): Upper bound on any weight, derived when omitted.
+        workers (int, optional): Processes to use, defaults to the number of CPUs.
+        collisions (bool): Whether to build the weight -> edges collision report.
+
+    Returns:
+        VerificationResult: The outcome, truthy when all weights are distinct.
+    """
+    if weight is None and labels is None:
+        raise ValueError("Either weight or labels is required")
+    sources = {'u': np.asarray(u), 'v': np.asarray(v)}
+    if weight is not None:
+        sources['weight'] = np.asarray(weight)
+    else:
+        sources['labels'] = np.asarray(labels)
+    num_edges = sources['u'].size
+    if max_weight is None:
+        if weight is not None:
+            max_weight = int(sources['weight'].max()) if num_edges else 0
+        else:
+            max_weight = 2 * int(sources['labels'].max()) if sources['labels'].size else 0
+    workers = max(1, min(workers or os.cpu_count() or 1, num_edges or 1))
+    bounds = np.linspace(0, num_edges, workers + 1).astype(np.int64).tolist()
+    width = (max_weight >> 3) + 1
+
+    blocks = []
+    try:
+        descriptors = {}
+        for key, array in sources.items():
+            block, descriptors[key] = _share(array)
+            blocks.append(block)
+        bitset_block, descriptors['bitsets'] = _share(np.zeros((workers, 2, width), dtype=np.uint8))
+        blocks.append(bitset_block)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            largest = max(pool.map(_with_arrays, [descriptors] * workers, [_mark_range] * workers,
+                                   range(workers), bounds[:-1], bounds[1:], [max_weight] * workers),
+                          default=0)
+
+            # A weight is repeated if one worker saw it twice or two workers saw it
+            bitsets = np.ndarray((workers, 2, width), dtype=np.uint8, buffer=bitset_block.buf)
+            seen = np.zeros(width, dtype=np.uint8)
+            duplicates = np.zeros(width, dtype=np.uint8)
+            for slot in range(workers):
+                duplicates |= bitsets[slot, 1] | (seen & bitsets[slot, 0])
+                seen |= bitsets[slot, 0]
+            del bitsets
+            unique = not duplicates.any()
+
+            report = None
+            if collisions and not unique:
+                duplicate_block, descriptors['duplicates'] = _share(duplicates)
+                blocks.append(duplicate_block)
+                report = {}
+                del descriptors['bitsets']
+                for found in pool.map(_with_arrays, [descriptors] * workers, [_collect_range] * workers,
+                                      bounds[:-1], bounds[1:]):
+                    for w, a, b in found:
+                        report.setdefault(w, []).append((a, b))
+                report = dict(sorted(report.items()))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return VerificationResult(unique, largest, num_edges, report)
+
+
+def verify_graph_parallel(graph, workers=None, collisions=False):
+    """
+    Parallel check of a LabeledGraph, a LabelingFile or an EdgeTable (see
+    verify_edge_weights_parallel).
+    """
+    edges = getattr(graph, 'edges', graph)
+    return verify_edge_weights_parallel(edges.u, edges.v, weight=edges.weight,
+                                        max_weight=int(edges.weight.max()) if len(edges.weight) else 0,
+                                        workers=workers, collisions=collisions)
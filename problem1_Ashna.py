@@ -1,7 +1,16 @@
-# Importing necessary libraries
+# Importing necessary libraries (networkx and matplotlib are imported only when drawing)
+import argparse
 import math
-import networkx as nx
-import matplotlib.pyplot as plt
+import sys
+import numpy as np
+from cli import add_graph_arguments, finish_profile, open_label_cache, start_profile
+from export import write_adjacency, write_labeling, write_rows
+from families import family_shape
+from graph_core import CSRStorage, star_edges
+from instrument import span
+from labeling import LabelView, amalgamated_star_labels
+from layout import radial_layout
+from verify import verify_edge_weights
 
 # Class definition for a graph
 class Graph:
@@ -19,9 +28,38 @@ class Graph:
         self.k = k
         self.order = order
         # Initializing data structures to represent the graph
-        self.adj_list = {i: [] for i in range(order)}  # Adjacency list representation of the graph
-        self.edge_weights = {}  # Dictionary to store edge weights
-        self.vertex_labels = {i: None for i in range(order)}  # Dictionary to store vertex labels
+        self.storage = CSRStorage(order)  # Compact CSR adjacency, exposed read-only through adj_list
+        self.labels = np.zeros(order, dtype=np.int64)  # Vertex labels indexed by vertex, 0 until labeled
+
+    @property
+    def adj_list(self):
+        """
+        Read-only adjacency list view backed by the CSR arrays.
+        """
+        return self.storage.csr.adjacency_view()
+
+    @property
+    def vertex_labels(self):
+        """
+        Read-only {vertex: label} view of the label array.
+        """
+        return LabelView(self.labels)
+
+    @property
+    def edge_weights(self):
+        """
+        Read-only {(u, v): weight} view with one entry per undirected edge, found in either order.
+        """
+        return self.storage.edges.as_mapping()
+
+    def build_star(self, m):
+        """
+        Adds all edges of S(n, m) in one bulk step instead of repeated add_edge calls.
+
+        Args:
+            m (int): The number of vertices on each arm (inner vertex plus m - 1 leaves).
+        """
+        self.storage.load_edges(*star_edges(self.n, m - 1))
     
     def add_edge(self, u, v, weight):
         """
@@ -32,41 +70,25 @@ class Graph:
             v (int): The other end of the edge.
             weight (int): The weight to be assigned to the edge.
         """
-        # Adding edge to the adjacency list
-        self.adj_list[u].append(v)
-        self.adj_list[v].append(u)
-        # Storing edge weight in both directions
-        self.edge_weights[(u, v)] = weight
-        self.edge_weights[(v, u)] = weight
+        # Adding edge to the adjacency list and storing its weight once in the edge table
+        self.storage.add_edge(u, v, weight)
 
-    def vertex_k_labeling(self):
+    def vertex_k_labeling(self, cache=None):
         """
         Calculates vertex labels for the graph.
+
+        The labels of S(n, 3) are built as one array (see labeling.amalgamated_star_labels).
+
+        Args:
+            cache (LabelCache, optional): Reuses a previously computed labeling.
+
+        Raises:
+            ValueError: If the graph is not S(n, 3), or n % 4 == 1.
         """
-        # Setting label for central vertex
-        self.vertex_labels[0] = 1
-
-        # Case 1
-        if self.n % 4 == 0 or self.n % 4 == 2 or self.n % 4 == 3:
-            # Labeling internal vertices
-            for i in range(1, self.n + 1):
-                vertex = i
-                if 1 <= i <= math.ceil(self.n / 4) + 1:
-                    self.vertex_labels[vertex] = 3 * i - 2
-                elif math.ceil(self.n / 4) + 1 <= i <= self.n:
-                    self.vertex_labels[vertex] = 2 * math.ceil(self.n / 4) + i
-    
-            # Labeling external vertices
-            vertex += 1
-            for i in range(1, (math.ceil(self.n / 4) + 1)):
-                for j in range(1, 3):  
-                    self.vertex_labels[vertex] =  j + 1
-                    vertex = vertex + 1
-   
-            for i in range((math.ceil(self.n / 4) + 1), self.n + 1):
-                for j in range(1, 3):
-                    self.vertex_labels[vertex] = self.n + i + j - 1 - 2 * math.ceil(self.n / 4)
-                    vertex = vertex + 1
+        if self.order != 3 * self.n + 1:
+            raise ValueError("The problem1 labeling is only defined for S(n, 3)")
+        labels = cache.get('problem1', self.n) if cache else amalgamated_star_labels(self.n)
+        self.labels[:] = labels
         
         return self.vertex_labels
     
@@ -74,13 +96,9 @@ class Graph:
         """
         Calculates edge weights based on vertex labels and adjacency list.
         """
-        for vertex, neighbors in self.adj_list.items():
-            for neighbor in neighbors:
-                # Calculate edge weight by summing up the labels of the two vertices
-                weight = self.vertex_labels[vertex] + self.vertex_labels[neighbor]
-                self.edge_weights[(vertex, neighbor)] = weight
-                self.edge_weights[(neighbor, vertex)] = weight
-        
+        # Edge weight is the sum of the labels of the two vertices, computed once per undirected edge
+        self.storage.edges.compute_weights(self.labels)
+
         return self.edge_weights
     
     def get_adj_list(self):
@@ -89,72 +107,100 @@ class Graph:
         """
         return self.adj_list
 
-# Main function
-def main():
-    # Graph parameters
-    n = 8
-    m = 3
-    order = m * n + 1
-    k = math.ceil((m * n + 1) / 2)
-    
-    # Creating graph object
-    graph = Graph(n, k, order)
+def visualize_graph(graph, m, path=None):
+    """
+    Draws the labeled graph with its edge weights.
 
-    outer_verts = n
+    Args:
+        graph (Graph): A labeled and weighted graph.
+        m (int): The number of vertices on each arm.
+        path (str, optional): Image file to save to; the drawing is shown in a window otherwise.
+    """
+    import matplotlib.pyplot as plt
+    import networkx as nx
 
-    # Adding edges for the star graph
-    for i in range(1, n + 1):
-        graph.add_edge(0, i, 0)  # Connect central vertex to inner vertices
-        for j in range(1, m):
-            outer_verts += 1
-            graph.add_edge(i, outer_verts, 0) # Connect inner vertices to their external vertices
-    
-    # Calculating vertex labels, adjacency list, and edge weights
-    vertex_labels = graph.vertex_k_labeling()
-    adj_list = graph.get_adj_list()
-    edge_weights = graph.calculate_edge_weights()
-
-    # Printing vertex labels
-    print("===== Vertex Labels =====")
-    for vertex, label in vertex_labels.items():
-        print(f"Vertex: {vertex}, Label: {label}")
-    
-    # Printing adjacency list
-    print("===== Adjacency List =====")
-    for vertex, neighbors in adj_list.items():
-        # Convert the list of neighbors to a string for printing
-        neighbors_str = ', '.join(map(str, neighbors))
-        # Print the vertex and its neighbors
-        print(f"Vertex: {vertex}, neighbors: [{neighbors_str}]")
-    
-    # Printing edge weights
-    print("===== Edge Weights =====")
-    for edge, weight in edge_weights.items():
-        print(f"Edge: {edge}, Weight: {weight}")
-    
     # Creating a NetworkX graph
     G = nx.Graph()
-    G.add_nodes_from(range(order))
+    G.add_nodes_from(range(graph.order))
     
     # Adding edges from adjacency list
-    for vertex, neighbors in adj_list.items():
+    for vertex, neighbors in graph.adj_list.items():
         for neighbor in neighbors:
             G.add_edge(vertex, neighbor)
 
-    pos = nx.spring_layout(G)  # positions for all nodes
+    pos = radial_layout(graph.n, m - 1)  # closed-form positions: center, arm circle, leaf circle
 
     # Adding node labels
-    labels = {node: str(label) for node, label in vertex_labels.items()}
+    labels = {node: str(label) for node, label in graph.vertex_labels.items()}
     nx.draw_networkx_labels(G, pos, labels=labels, font_size=10, font_color='black')
 
     # Drawing the graph
     nx.draw(G, pos, with_labels=False, node_color='skyblue', node_size=1500)
     
     # Drawing edge labels
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_weights, font_color='red')
+    nx.draw_networkx_edge_labels(G, pos, edge_labels=dict(graph.edge_weights), font_color='red')
+
+    # Displaying or saving the graph
+    if path:
+        plt.savefig(path)
+        plt.close()
+    else:
+        plt.show()
+
+# Main function
+def main(argv=None):
+    parser = add_graph_arguments(argparse.ArgumentParser(description="Label S(n, 3) and print its labeling."),
+                                 family='problem1')
+    parser.add_argument('--show', action='store_true', help="open the drawing in a window")
+    args = parser.parse_args(argv)
+    try:
+        family_shape('problem1', args.n, args.m)
+    except ValueError as error:
+        parser.error(str(error))
+    start_profile(args)
+
+    # Graph parameters
+    n = args.n if args.n is not None else 8
+    m = args.m if args.m is not None else 3
+    order = m * n + 1
+    k = math.ceil((m * n + 1) / 2)
+    
+    # Creating graph object
+    graph = Graph(n, k, order)
+
+    # Adding edges for the star graph: center to inner vertices, inner vertices to their external vertices
+    with span('build'):
+        graph.build_star(m)
+        adj_list = graph.get_adj_list()
+    
+    # Calculating vertex labels and edge weights
+    with span('vertex_k_labeling'):
+        vertex_labels = graph.vertex_k_labeling(open_label_cache(args))
+    with span('weights'):
+        edge_weights = graph.calculate_edge_weights()
+
+    # Printing vertex labels, adjacency list and edge weights, formatted in large chunks
+    edges = graph.storage.edges
+    with span('print'):
+        sys.stdout.write("===== Vertex Labels =====\n")
+        write_rows(sys.stdout, "Vertex: %d, Label: %d\n", (np.arange(order), graph.labels))
+        sys.stdout.write("===== Adjacency List =====\n")
+        write_adjacency(sys.stdout, graph.storage.csr)
+        sys.stdout.write("===== Edge Weights =====\n")
+        write_rows(sys.stdout, "Edge: (%d, %d), Weight: %d\n", (edges.u, edges.v, edges.weight))
 
-    # Displaying the graph
-    plt.show()
+    if args.verify:
+        with span('verify'):
+            result = verify_edge_weights(edge_weights)
+        print(f"All edge values are unique: {result.unique}")
+        print(f"Maximum edge weight value: {result.max_weight}")
+    if args.output:
+        with span('output'):
+            write_labeling(args.output, graph.labels, edges)
+    if args.draw or args.show:
+        with span('draw'):
+            visualize_graph(graph, m, args.draw)
+    finish_profile(args, 'problem1')
 
 # Entry point of the program
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+# Headless batch rendering of labeled star and snowflake drawings
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+
+matplotlib.use('Agg')  # Non-interactive backend: no GUI, safe in worker processes
+
+import matplotlib.pyplot as plt
+import networkx as nx
+
+from families import build_labeled_graph, family_shape
+from layout import radial_positions
+from sweep import parse_range
+
+# Level-of-detail thresholds: past these counts text artists dominate render time
+EDGE_LABEL_LIMIT = 200   # Above this many edges, weights are shown as edge colors instead of text
+NODE_LABEL_LIMIT = 400   # Above this many vertices, vertex labels are not drawn
+
+TITLES = {
+    'problem1': 'Homogeneous Amalgamated Star Graph S(n, 3)',
+    'star': 'Homogeneous Amalgamated Star Graph',
+    'snowflake': 'Snowflake Graph with Edge Irregular K-Labeling',
+}
+
+
+def draw_labeled_graph(graph, ax):
+    """
+    Draws a LabeledGraph on ax with the radial layout and level-of-detail rules.
+
+    Small graphs get the same picture as the scripts: vertex labels on the nodes and
+    one red weight per undirected edge. Larger graphs color the edges by weight (one
+    LineCollection and a colorbar) instead of creating a text artist per edge.
+    """
+    _, _, leaves = family_shape(graph.family, graph.n, graph.m)
+    pos = dict(enumerate(radial_positions(graph.n, leaves)))
+    G = nx.Graph()
+    G.add_nodes_from(range(graph.order))
+    edge_list = list(zip(graph.edges.u.tolist(), graph.edges.v.tolist()))
+    G.add_edges_from(edge_list)
+
+    small = graph.order <= NODE_LABEL_LIMIT
+    nx.draw_networkx_nodes(G, pos, ax=ax, node_color='lightblue',
+                           node_size=500 if small else max(2, 20000 // graph.order))
+    if len(edge_list) <= EDGE_LABEL_LIMIT:
+        nx.draw_networkx_edges(G, pos, ax=ax, edgelist=edge_list, edge_color='gray', width=2)
+        weights = {edge: str(w) for edge, w in zip(edge_list, graph.edges.weight.tolist())}
+        nx.draw_networkx_edge_labels(G, pos, ax=ax, edge_labels=weights, font_color='red', font_size=8)
+    else:
+        collection = nx.draw_networkx_edges(G, pos, ax=ax, edgelist=edge_list,
+                                            edge_color=graph.edges.weight.tolist(),
+                                            edge_cmap=plt.cm.viridis, width=1)
+        plt.colorbar(collection, ax=ax, label='edge weight', shrink=0.7)
+    if small:
+        labels = dict(enumerate(graph.labels.tolist()))
+        nx.draw_networkx_labels(G, pos, ax=ax, labels=labels, font_size=10)
+
+
+def render(family, n, m, path):
+    """
+    Builds one graph and writes its drawing to path (format from the extension).
+
+    Returns:
+        str: The path written.
+    """
+    return render_graph(build_labeled_graph(family, n, m), path)
+
+
+def render_graph(graph, path):
+    """
+    Writes the drawing of an already built LabeledGraph to path.
+
+    Returns:
+        str: The path written.
+    """
+    size = min(48, 8 + graph.order ** 0.5 / 4)
+    fig, ax = plt.subplots(figsize=(size, size))
+    try:
+        draw_labeled_graph(graph, ax)
+        ax.set_title(f"{TITLES[graph.family]} (n={graph.n}, m={graph.m}, k={graph.k})")
+        ax.set_aspect('equal')
+        ax.axis('off')
+        fig.savefig(path, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return path
+
+
+def render_batch(jobs, out_dir, fmt='png', workers=None):
+    """
+    Renders many (family, n, m) graphs in parallel and yields each outcome as it finishes.
+
+    A job that fails (e.g. a labeling that is not defined for its n) does not stop
+    the others; its error is reported in its outcome instead.
+
+    Args:
+        jobs (iterable): (family, n, m) tuples.
+        out_dir (str): Directory for the images, created if needed.
+        fmt (str): 'png' or 'svg'.
+        workers (int, optional): Pool size, defaults to the number of CPUs.
+
+    Yields:
+        tuple: ((family, n, m), path written or None, error message or None).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(render, family, n, m, os.path.join(out_dir, f"{family}_n{n}_m{m}.{fmt}")):
+                   (family, n, m) for family, n, m in jobs}
+        for future in as_completed(futures):
+            try:
+                path, error = future.result(), None
+            except Exception as failure:
+                path, error = None, str(failure) or type(failure).__name__
+            yield futures[future], path, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render labeled graph drawings to image files.")
+    parser.add_argument('--family', choices=('problem1', 'star', 'snowflake'), required=True)
+    parser.add_argument('--n', type=parse_range, required=True, help="a:b[:step] or a single value")
+    parser.add_argument('--m', type=parse_range, default=None, help="a:b[:step] or a single value")
+    parser.add_argument('--out', default='renders')
+    parser.add_argument('--format', choices=('png', 'svg'), default='png')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.m is None:
+        m_values = (3 if args.family == 'problem1' else None,)
+    else:
+        m_values = args.m
+    jobs = [(args.family, n, m) for n in args.n for m in m_values]
+    failed = 0
+    for (family, n, m), path, error in render_batch(jobs, args.out, args.format, args.workers):
+        if error:
+            failed += 1
+            print(f"Skipped {family} n={n} m={m}: {error}")
+        else:
+            print(f"Wrote {path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
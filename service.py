@@ -0,0 +1,263 @@
+# Resident labeling service: a warm graph cache answering JSON-lines requests over a local socket
+import argparse
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from families import build_labeled_graph, family_shape
+from label_cache import DEFAULT_CACHE_DIR, open_cache
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), 'labeling.sock')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def graph_bytes(graph):
+    """
+    Returns the bytes held by the arrays of a LabeledGraph (labels, CSR and edge table).
+    """
+    return sum(value.nbytes for part in (graph, graph.csr, graph.edges)
+               for value in vars(part).values() if isinstance(value, np.ndarray))
+
+
+def _build(family, n, m, cache_dir=None):
+    """
+    Worker-side build: the graph together with its verification and largest edge
+    weight, so that verify and max_weight requests are answered from the cache as well.
+    Labels come from the LabelCache in cache_dir when one is given.
+    """
+    labels = open_cache(cache_dir).get(family, n, m) if cache_dir else None
+    graph = build_labeled_graph(family, n, m, labels=labels)
+    return graph, graph.verify(), int(graph.edges.weight.max()) if len(graph.edges) else 0
+
+
+class LabelingService:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, workers=None, cache_dir=None):
+        """
+        Keeps recently used labeled graphs in memory and answers queries about them.
+
+        Graphs live in an LRU bounded by the size of their arrays (see graph_bytes);
+        the most recent one is always kept. Builds run on a process pool so the event
+        loop keeps answering cached queries meanwhile, and concurrent requests for a
+        graph that is still being built wait for that one build.
+
+        Args:
+            max_bytes (int): Bound on the total array size of the cached graphs.
+            workers (int, optional): Build processes, defaults to the number of CPUs.
+            cache_dir (str, optional): LabelCache directory the builds read labels from,
+                so graphs evicted here or built by an earlier service are relabeled cheaply.
+        """
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self._graphs = OrderedDict()
+        self._building = {}
+        self._bytes = 0
+        self.hits = self.misses = 0
+
+    def _remember(self, key, entry):
+        self._graphs[key] = entry
+        self._bytes += entry[-1]
+        while self._bytes > self.max_bytes and len(self._graphs) > 1:
+            _, evicted = self._graphs.popitem(last=False)
+            self._bytes -= evicted[-1]
+
+    async def entry(self, family, n, m=None):
+        """
+        Returns (graph, verification, max_weight, size) for a family member, building it
+        at most once.
+        """
+        n, m, _ = family_shape(family, n, m)
+        key = (family, n, m)
+        entry = self._graphs.get(key)
+        if entry is not None:
+            self._graphs.move_to_end(key)
+            self.hits += 1
+            return entry
+        build = self._building.get(key)
+        if build is None:
+            self.misses += 1
+            loop = asyncio.get_running_loop()
+            build = self._building[key] = loop.run_in_executor(self.pool, _build, family, n, m, self.cache_dir)
+            try:
+                graph, result, max_weight = await build
+            finally:
+                del self._building[key]
+            self._remember(key, (graph, result, max_weight, graph_bytes(graph)))
+            return self._graphs[key]
+        await build
+        return self._graphs.get(key) or await self.entry(family, n, m)
+
+    async def handle(self, request):
+        """
+        Answers one request and returns the response object.
+
+        Every request names an 'op'; graph queries also carry 'family', 'n' and
+        optionally 'm'. Supported ops:
+
+            label       order, edge count and k; labels of 'vertices' when given
+            verify      unique, max_weight and edges_checked
+            weight      weight of edge ('u', 'v')
+            max_weight  the largest edge weight
+            stats       cache size, hits and misses
+            ping        liveness check
+
+        Responses carry 'ok' plus the results, or 'error' with a message, and echo
+        the request's 'id' when it has one.
+        """
+        response = {'id': request['id']} if 'id' in request else {}
+        op = request.get('op')
+        try:
+            if op == 'ping':
+                result = {}
+            elif op == 'stats':
+                result = {'graphs': len(self._graphs), 'bytes': self._bytes, 'building': len(self._building),
+                          'hits': self.hits, 'misses': self.misses}
+            elif op in ('label', 'verify', 'weight', 'max_weight'):
+                graph, verification, max_weight, _ = await self.entry(request['family'], int(request['n']),
+                                                                      request.get('m'))
+                if op == 'label':
+                    result = {'order': graph.order, 'edges': len(graph.edges), 'k': graph.k}
+                    if 'vertices' in request:
+                        vertices = np.asarray(request['vertices'], dtype=np.int64)
+                        if vertices.size and (vertices.min() < 0 or vertices.max() >= graph.order):
+                            raise ValueError(f"Vertex ids must be in [0, {graph.order})")
+                        result['labels'] = graph.labels[vertices].tolist()
+                elif op == 'verify':
+                    result = {'unique': verification.unique, 'max_weight': max_weight,
+                              'edges_checked': verification.edges_checked}
+                elif op == 'weight':
+                    edge = (int(request['u']), int(request['v']))
+                    if graph.edges.find(*edge) < 0:
+                        raise ValueError(f"No edge {edge}")
+                    result = {'weight': graph.edges.weight_of(*edge)}
+                else:
+                    result = {'max_weight': max_weight}
+            else:
+                raise ValueError(f"Unknown op: {op!r}")
+        except KeyError as error:
+            return {**response, 'ok': False, 'error': f"Missing field {error}"}
+        except (ValueError, IndexError, TypeError) as error:
+            return {**response, 'ok': False, 'error': str(error)}
+        except Exception as error:
+            # e.g. a broken build pool or a graph too large to build: fail the request, not the connection
+            return {**response, 'ok': False, 'error': f"{type(error).__name__}: {error}"}
+        return {**response, 'ok': True, **result}
+
+    async def serve_client(self, reader, writer):
+        """
+        Serves one connection: one JSON object per line in, one per line out, in order.
+        """
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    response = await self.handle(request) if isinstance(request, dict) else \
+                        {'ok': False, 'error': "Requests must be JSON objects"}
+                except json.JSONDecodeError as error:
+                    response = {'ok': False, 'error': f"Invalid JSON: {error}"}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path=None, host='127.0.0.1', port=None):
+        """
+        Listens on a Unix socket at path, or on host:port when a port is given, until cancelled.
+        """
+        if port is not None:
+            server = await asyncio.start_server(self.serve_client, host, port)
+        else:
+            path = path or DEFAULT_SOCKET
+            if os.path.exists(path):
+                os.remove(path)  # Left behind by a service that did not shut down cleanly
+            server = await asyncio.start_unix_server(self.serve_client, path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if port is None and os.path.exists(path):
+                os.remove(path)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+class ServiceClient:
+    def __init__(self, path=DEFAULT_SOCKET, host='127.0.0.1', port=None):
+        """
+        Blocking client keeping one connection to a running service open.
+
+        Args:
+            path (str): Unix socket of the service, used when port is None.
+            host (str): Host of a TCP service.
+            port (int, optional): Port of a TCP service.
+        """
+        if port is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port))
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._socket.makefile('rwb')
+
+    def call(self, op, **params):
+        """
+        Sends one request and returns the decoded response.
+        """
+        self._file.write(json.dumps({'op': op, **params}).encode() + b'\n')
+        self._file.flush()
+        return json.loads(self._file.readline())
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the resident labeling service, or send it one request.")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help="Unix socket path (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=None, help="listen on 127.0.0.1:PORT instead of a Unix socket")
+    parser.add_argument('--max-mb', type=float, default=DEFAULT_MAX_BYTES / 2 ** 20, help="graph cache size")
+    parser.add_argument('--workers', type=int, default=None, help="build processes")
+    parser.add_argument('--cache', metavar='DIR', nargs='?', const=DEFAULT_CACHE_DIR,
+                        help="reuse labelings stored in DIR (default: %(const)s), adding new ones")
+    parser.add_argument('--call', metavar='JSON', help="send one request to a running service and print the reply")
+    args = parser.parse_args()
+
+    if args.call:
+        with ServiceClient(args.socket, port=args.port) as client:
+            start = time.perf_counter()
+            request = json.loads(args.call)
+            response = client.call(request.pop('op', None), **request)
+            print(json.dumps(response))
+            print(f"{(time.perf_counter() - start) * 1000:.3f} ms")
+        return
+
+    service = LabelingService(int(args.max_mb * 2 ** 20), args.workers, args.cache)
+    where = f"127.0.0.1:{args.port}" if args.port is not None else args.socket
+    print(f"Labeling service listening on {where}")
+    try:
+        asyncio.run(service.serve(args.socket, port=args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
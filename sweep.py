@@ -0,0 +1,203 @@
+# Parallel (n, m) parameter sweeps with checkpoint/resume
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from compressed_labeling import compressed_labeling
+from families import build_labeled_graph, family_shape
+from growth import GrowableStar
+from label_cache import DEFAULT_CACHE_DIR, open_cache
+
+
+def _normalized_m(family, n, m):
+    """
+    The m of family_shape, so that spellings of one graph share a checkpoint key.
+    """
+    try:
+        return family_shape(family, n, m)[1]
+    except ValueError:
+        return m  # Recorded as an error by sweep_point
+
+
+def sweep_point(family, n, m, compressed=False, cache_dir=None):
+    """
+    Builds, labels, weights and verifies one graph and summarizes the outcome.
+
+    With compressed=True a star family is checked on its arm-template labeling
+    (compressed_labeling.py) instead, in O(n) whatever the value of m. With a
+    cache_dir, labels are read from and added to the LabelCache kept there.
+
+    Returns:
+        dict: JSON-ready record; labeling errors are recorded instead of raised.
+    """
+    start = time.perf_counter()
+    record = {'family': family, 'n': n, 'm': _normalized_m(family, n, m)}
+    try:
+        if compressed and family != 'snowflake':
+            labeling = compressed_labeling(family, n, m)
+            result = labeling.verify()
+            record.update(order=labeling.order, edges=labeling.num_edges, k=labeling.max_label(),
+                          max_weight=result.max_weight, unique=result.unique)
+            record['seconds'] = time.perf_counter() - start
+            return record
+        labels = open_cache(cache_dir).get(family, n, m) if cache_dir else None
+        graph = build_labeled_graph(family, n, m, labels=labels)
+        result = graph.verify()
+        record.update(order=graph.order, edges=len(graph.edges), k=graph.k,
+                      max_weight=int(graph.edges.weight.max()) if len(graph.edges) else 0,
+                      unique=result.unique)
+    except ValueError as error:
+        record['error'] = str(error)
+    record['seconds'] = time.perf_counter() - start
+    return record
+
+
+def _run_shard(family, points, compressed=False, cache_dir=None):
+    return [sweep_point(family, n, m, compressed, cache_dir) for n, m in points]
+
+
+def _run_growth_row(n, m_values):
+    """
+    Sweeps one row of the generalized star grid by growing a single graph along m.
+    """
+    records = []
+    graph = None
+    for m in m_values:
+        start = time.perf_counter()
+        if graph is None:
+            graph = GrowableStar(n, m)
+        else:
+            graph.add_leaves(m - graph.m)
+        records.append({'family': 'star', 'n': n, 'm': m, 'order': graph.order,
+                        'edges': graph.num_edges, 'k': graph.max_label,
+                        'max_weight': graph.max_weight, 'unique': graph.unique,
+                        'seconds': time.perf_counter() - start})
+    return records
+
+
+def parse_range(text):
+    """
+    Parses 'a:b' (inclusive), 'a:b:step' or a single integer into a range.
+    """
+    parts = [int(part) for part in text.split(':')]
+    if len(parts) == 1:
+        return range(parts[0], parts[0] + 1)
+    step = parts[2] if len(parts) == 3 else 1
+    return range(parts[0], parts[1] + 1, step)
+
+
+def load_checkpoint(path):
+    """
+    Returns the records already written to a checkpoint file, skipping unreadable lines.
+    """
+    records = []
+    if path and os.path.exists(path):
+        with open(path) as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # Torn by an interrupted write
+    return records
+
+
+def _drop_torn_line(path):
+    """
+    Truncates a checkpoint file after its last complete line, so appends start on a fresh line.
+    """
+    if not path or not os.path.exists(path):
+        return
+    with open(path, 'rb+') as file:
+        data = file.read()
+        if data and not data.endswith(b'\n'):
+            file.truncate(data.rfind(b'\n') + 1)
+
+
+def run_sweep(family, n_values, m_values=(None,), checkpoint=None, workers=None, shard_size=16,
+              incremental=False, compressed=False, cache_dir=None):
+    """
+    Sweeps a family over the (n, m) grid on a process pool, yielding results as they finish.
+
+    The grid is split into shards of shard_size points per task. Every finished record
+    is appended to the checkpoint file (one JSON object per line) before it is yielded,
+    and points already present in the checkpoint are skipped, so an interrupted sweep
+    resumes where it stopped.
+
+    Args:
+        family (str): 'problem1', 'star' or 'snowflake'.
+        n_values (iterable): Values of n.
+        m_values (iterable): Values of m; leaves per branch for the snowflake (None for two).
+        checkpoint (str, optional): Path of the JSON-lines checkpoint file.
+        workers (int, optional): Pool size, defaults to the number of CPUs.
+        shard_size (int): Grid points per pool task.
+        incremental (bool): For the star family, grow one graph per n along increasing m
+            (growth.GrowableStar) instead of rebuilding every point; one task per row.
+        compressed (bool): Verify star families on their compressed labeling (see sweep_point).
+        cache_dir (str, optional): LabelCache directory shared by the workers.
+
+    Yields:
+        dict: One record per grid point (see sweep_point).
+    """
+    done = {(record['n'], record['m']) for record in load_checkpoint(checkpoint)
+            if record.get('family') == family}
+    points = list(dict.fromkeys((n, _normalized_m(family, n, m)) for n in n_values for m in m_values))
+    points = [point for point in points if point not in done]
+    if incremental and family != 'star':
+        raise ValueError("Incremental sweeps are only available for the star family")
+    rows = {}
+    for n, m in points:
+        rows.setdefault(n, []).append(m)
+    shards = [points[i:i + shard_size] for i in range(0, len(points), shard_size)]
+
+    _drop_torn_line(checkpoint)
+    output = open(checkpoint, 'a') if checkpoint else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            if incremental:
+                pending = {pool.submit(_run_growth_row, n, sorted(row)) for n, row in rows.items()}
+            else:
+                pending = {pool.submit(_run_shard, family, shard, compressed, cache_dir) for shard in shards}
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    records = future.result()
+                    if output:
+                        output.write(''.join(json.dumps(record) + '\n' for record in records))
+                        output.flush()
+                    yield from records
+    finally:
+        if output:
+            output.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep a graph family over an (n, m) grid.")
+    parser.add_argument('--family', choices=('problem1', 'star', 'snowflake'), required=True)
+    parser.add_argument('--n', type=parse_range, required=True, help="a:b[:step] or a single value")
+    parser.add_argument('--m', type=parse_range, default=None, help="a:b[:step] or a single value")
+    parser.add_argument('--checkpoint', help="JSON-lines file to append results to and resume from")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shard-size', type=int, default=16)
+    parser.add_argument('--incremental', action='store_true',
+                        help="grow one star per n along m instead of rebuilding each point")
+    parser.add_argument('--cache', metavar='DIR', nargs='?', const=DEFAULT_CACHE_DIR,
+                        help="reuse labelings stored in DIR (default: %(const)s), adding new ones")
+    parser.add_argument('--compressed', action='store_true',
+                        help="verify star families on their arm-template labeling without building them")
+    args = parser.parse_args()
+
+    m_values = args.m if args.m is not None else (3 if args.family == 'problem1' else None,)
+    total = valid = 0
+    for record in run_sweep(args.family, args.n, m_values, args.checkpoint, args.workers,
+                            args.shard_size, args.incremental, args.compressed, args.cache):
+        total += 1
+        valid += bool(record.get('unique'))
+        status = record.get('error') or ("unique" if record['unique'] else "REPEATED WEIGHTS")
+        print(f"{record['family']} n={record['n']} m={record['m']}: {status}")
+    print(f"{total} graphs checked, {valid} with distinct edge weights")
+
+
+if __name__ == "__main__":
+    main()
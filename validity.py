@@ -0,0 +1,248 @@
+# Analytic validity tables: k, largest label and weight distinctness over whole (n, m) grids
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from compressed_labeling import compressed_labeling
+from export import open_output, write_rows
+from implicit_graph import implicit_graph
+from verify import verify_edge_weights
+
+SMALL_N = 16  # Below this, cells the closed forms do not cover are checked on the labeling itself
+COLUMNS = ('n', 'm', 'edges', 'k', 'max_label', 'max_weight', 'distinct', 'defined')
+
+
+def _arm_label(i, n):
+    """
+    Label of arm i under the ceil(n / 4) rule of labeling.inner_vertex_labels, broadcast over i and n.
+    """
+    c = -(-n // 4)
+    return np.where(i <= c + 1, 3 * i - 2, 2 * c + i)
+
+
+def _lower_bound(edges, max_degree):
+    """
+    max(ceil((|E| + 1) / 2), maximum degree), as in exact_solver.lower_bound.
+    """
+    return np.maximum(np.maximum((edges + 2) // 2, max_degree), 1)
+
+
+def _star_block(n, m):
+    """
+    Generalized star of Problem2_Melisa.py over n (column) x m (row) arrays.
+
+    Arm labels a_i increase with i, a_1 = 1, and leaf j of arm i gets a_i + j * S with
+    S = max(n, m). A spoke weighs 1 + a_i and a leaf edge 2 * a_i + j * S, so:
+
+      * two leaf edges collide iff 2 * (a_i - a_k) = d * S for some d in 1..m - 1;
+      * a spoke and a leaf edge collide iff 1 + a_i - 2 * a_k = j * S for some j in 1..m.
+
+    For n >= SMALL_N the arm label differences cover every integer in 1..a_n - 1, and the
+    values 1 + a_i - 2 * a_k that are >= n cover [3 * ceil(n / 4) + 1, a_n - 1] and nothing
+    above, so the weights collide iff S <= a_n - 1, or S is even, m >= 2 and
+    S <= 2 * (a_n - 1), or m >= 3 and S <= a_n - 1. When S > 2 * (a_n - 1) neither
+    equation has a solution for any n. The remaining small-n cells are verified on
+    their compressed labelings, in O(n) each.
+    """
+    a_n = _arm_label(n, n)
+    S = np.maximum(n, m)
+    edges = n * (m + 1)
+    has_leaves = m > 0
+    max_label = np.where(has_leaves, a_n + m * S, a_n)
+    max_weight = np.where(has_leaves, np.maximum(1 + a_n, 2 * a_n + m * S), 1 + a_n)
+    reach = a_n - 1
+    collide = has_leaves & ((S <= reach) | ((m >= 2) & (S % 2 == 0) & (S <= 2 * reach)) |
+                            ((m >= 3) & (S <= reach)))
+    distinct = ~collide
+
+    n, m, distinct = np.broadcast_arrays(n, m, distinct)
+    distinct = distinct.copy()
+    for row, column in zip(*np.nonzero((n < SMALL_N) & (m > 0) & (np.maximum(n, m) <= 2 * reach))):
+        distinct[row, column] = compressed_labeling('star', int(n[row, column]), int(m[row, column])).verify().unique
+    empty = n == 0
+    return {'edges': edges, 'k': _lower_bound(edges, np.maximum(n, m + 1)),
+            'max_label': np.where(empty, 1, max_label), 'max_weight': np.where(empty, 0, max_weight),
+            'distinct': distinct, 'defined': np.ones(distinct.shape, dtype=bool)}
+
+
+def _problem1_block(n, m):
+    """
+    S(n, 3) labeling of problem1_Ashna.py / new.py over a column of n values.
+
+    With c = ceil(n / 4), the spokes of arms 1..c + 1 and the leaf edges of arms 1..c
+    weigh 2..3c + 2 (arm i contributes 3i - 1, 3i and 3i + 1), the remaining spokes
+    3c + 3..2c + n + 1, and the leaf edges of arms c + 1..n, n + 2c + 2..3n + 1. The 3n
+    weights are therefore exactly 2..3n + 1, all distinct, for every n >= 4 where the
+    labeling is defined (n % 4 != 1). Smaller n are read off the implicit graph.
+    """
+    c = -(-n // 4)
+    a_n = _arm_label(n, n)
+    edges = 3 * n
+    defined = n % 4 != 1
+    max_label = np.maximum(a_n, np.where(n <= c, 3, 2 * n + 1 - 2 * c))
+    max_weight = 3 * n + 1
+    distinct = defined.copy()
+    for index in np.nonzero(defined & (n < 4))[0].tolist():
+        graph = implicit_graph('problem1', int(n[index]))
+        result = verify_edge_weights(graph)
+        max_label[index], max_weight[index] = graph.max_label(), result.max_weight
+        distinct[index] = result.unique
+    blank = ~defined
+    return {'edges': edges, 'k': _lower_bound(edges, np.maximum(n, 3)),
+            'max_label': np.where(blank, 0, max_label), 'max_weight': np.where(blank, 0, max_weight),
+            'distinct': distinct, 'defined': defined}
+
+
+def _snowflake_block(n, leaves):
+    """
+    Snowflake of Problem3_Alex.py with the given leaves per branch, over n x leaves arrays.
+
+    With L leaves, branch i is labeled b_i = 11 + 2L(i - 1). Spokes weigh 12 + 2L(i - 1)
+    and ring edges 22 + 2L(2i - 1) (the closing edge n -> 1 weighs 22 + 2L(n - 1)), all
+    even, while the leaf edges 23 + 4L(i - 1) + 2t are odd and pairwise distinct. So the
+    leaf edges never collide, the closing ring edge hits ring edge n / 2 whenever n is
+    even, and a spoke meets a ring edge iff L(i - 2k) = 5, i.e. L = 1 and n >= 7 or
+    L = 5 and n >= 3. With no leaves every branch has label 11 and all spokes collide.
+    """
+    edges = n * (leaves + 2)
+    max_label = np.where(leaves > 0, 10 + 2 * leaves * n, 11)
+    max_weight = np.where(leaves > 0, 4 * leaves * n - 2 * leaves + 21, 22)
+    collide = ((leaves == 0) & (n >= 2)) | (n % 2 == 0) | ((leaves == 5) & (n >= 3)) | \
+        ((leaves == 1) & (n >= 7))
+    empty = n == 0
+    distinct = ~collide | empty
+    return {'edges': edges, 'k': _lower_bound(edges, np.maximum(n, leaves + 3)),
+            'max_label': np.where(empty, 1, max_label), 'max_weight': np.where(empty, 0, max_weight),
+            'distinct': distinct, 'defined': np.ones(distinct.shape, dtype=bool)}
+
+
+_BLOCKS = {'star': _star_block, 'problem1': _problem1_block, 'snowflake': _snowflake_block}
+
+
+def _m_values(family, m_values):
+    if family == 'problem1':
+        return [3]
+    if m_values is None:
+        if family == 'star':
+            raise ValueError("The star family needs m values")
+        return [2]
+    return list(m_values)
+
+
+def validity_blocks(family, n_values, m_values=None, block_size=4096):
+    """
+    Evaluates a family's labeling over the (n, m) grid, block_size values of n at a time.
+
+    Every column comes from the closed forms in the block functions, broadcast over an
+    n x m block, so no graph or label array is allocated; only small-n cells that the
+    closed forms do not cover are checked on the labeling directly (see SMALL_N).
+
+    Args:
+        family (str): 'problem1', 'star' or 'snowflake'.
+        n_values (iterable): Values of n.
+        m_values (iterable, optional): Values of m (leaves per branch for the snowflake,
+            defaulting to 2); problem1 always uses m = 3.
+        block_size (int): Rows of n per block.
+
+    Yields:
+        dict: One flat int64 or bool array per name in COLUMNS, in row-major (n, m) order.
+            k is the lower bound max(ceil((|E| + 1) / 2), maximum degree) that any
+            labeling needs; max_label is what the construction uses. Cells where the
+            construction is not defined have defined = False and zero label columns.
+    """
+    block = _BLOCKS.get(family)
+    if block is None:
+        raise ValueError(f"Unknown graph family: {family}")
+    n_values = np.asarray(list(n_values), dtype=np.int64)
+    m_row = np.asarray(_m_values(family, m_values), dtype=np.int64)[None, :]
+    for start in range(0, n_values.size, block_size):
+        n = n_values[start:start + block_size][:, None]
+        if family == 'problem1':
+            columns = {key: value[:, None] for key, value in block(n[:, 0], m_row).items()}
+        else:
+            columns = block(n, m_row)
+        n, m = np.broadcast_arrays(n, m_row)
+        table = {'n': n, 'm': m, **columns}
+        yield {name: np.broadcast_to(table[name], n.shape).ravel() for name in COLUMNS}
+
+
+def validity_table(family, n_values, m_values=None, block_size=4096):
+    """
+    Returns the whole grid of validity_blocks as one dict of flat arrays.
+    """
+    blocks = list(validity_blocks(family, n_values, m_values, block_size))
+    if not blocks:
+        return {name: np.zeros(0, dtype=np.int64) for name in COLUMNS}
+    return {name: np.concatenate([block[name] for block in blocks]) for name in COLUMNS}
+
+
+def check_table(family, table, samples=100, max_edges=1 << 20, seed=0):
+    """
+    Cross-checks random rows of a table against the implicit graphs, verified edge by edge.
+
+    Rows whose graph has more than max_edges edges are skipped.
+
+    Returns:
+        list: (n, m, column, table value, actual value) for every disagreement.
+    """
+    rng = random.Random(seed)
+    rows = [row for row in range(table['n'].size) if table['defined'][row] and table['edges'][row] <= max_edges]
+    mismatches = []
+    for row in rng.sample(rows, min(samples, len(rows))):
+        n, m = int(table['n'][row]), int(table['m'][row])
+        graph = implicit_graph(family, n, m)
+        result = verify_edge_weights(graph)
+        actual = {'max_label': graph.max_label(), 'max_weight': result.max_weight, 'distinct': result.unique,
+                  'edges': graph.num_edges}
+        for column, value in actual.items():
+            if value != table[column][row]:
+                mismatches.append((n, m, column, table[column][row].item(), value))
+    return mismatches
+
+
+def main():
+    from sweep import parse_range
+
+    parser = argparse.ArgumentParser(description="Tabulate where a family's labeling has distinct edge weights.")
+    parser.add_argument('--family', choices=('problem1', 'star', 'snowflake'), required=True)
+    parser.add_argument('--n', type=parse_range, required=True, help="a:b[:step] or a single value")
+    parser.add_argument('--m', type=parse_range, default=None, help="a:b[:step] or a single value")
+    parser.add_argument('--csv', metavar='PATH', help="write the full table as CSV ('-' for stdout)")
+    parser.add_argument('--check', type=int, default=0, metavar='SAMPLES',
+                        help="verify this many random cells against their graphs")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    output = None
+    if args.csv:
+        output = sys.stdout if args.csv == '-' else open_output(args.csv)
+        output.write(','.join(COLUMNS) + '\n')
+    cells = defined = distinct = 0
+    try:
+        for block in validity_blocks(args.family, args.n, args.m):
+            cells += block['n'].size
+            defined += int(block['defined'].sum())
+            distinct += int(block['distinct'].sum())
+            if output:
+                write_rows(output, ','.join(['%d'] * len(COLUMNS)) + '\n',
+                           [block[name].astype(np.int64) for name in COLUMNS])
+    finally:
+        if output and output is not sys.stdout:
+            output.close()
+    print(f"{args.family}: {cells} cells, {defined} defined, {distinct} with distinct weights "
+          f"({time.perf_counter() - start:.2f} s)", file=sys.stderr)
+
+    if args.check:
+        mismatches = check_table(args.family, validity_table(args.family, args.n, args.m), args.check)
+        for mismatch in mismatches:
+            print("mismatch n={} m={}: {} table={} actual={}".format(*mismatch), file=sys.stderr)
+        print(f"checked {args.check} cells: {len(mismatches)} mismatches", file=sys.stderr)
+        return 1 if mismatches else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# Streaming edge-irregularity verification with a weight bitset
+from collections.abc import Mapping
+from itertools import islice
+
+import numpy as np
+
+from edge_table import EdgeTable, EdgeWeightView
+
+CHUNK_SIZE = 1 << 20  # Edges per chunk for sources held in memory
+
+
+class VerificationResult:
+    def __init__(self, unique, max_weight, edges_checked, collisions=None):
+        """
+        Outcome of an edge-irregularity check.
+
+        Args:
+            unique (bool): True if no two edges share a weight.
+            max_weight (int): The largest edge weight; over the edges checked only when
+                the check stopped early on a source that cannot report its maximum
+                (a stream of chunks or an implicit graph without max_weight).
+            edges_checked (int): How many edges were consumed before stopping.
+            collisions (dict, optional): {weight: [edge, ...]} for every repeated weight,
+                only filled when collisions were requested.
+        """
+        self.unique = unique
+        self.max_weight = max_weight
+        self.edges_checked = edges_checked
+        self.collisions = collisions if collisions is not None else {}
+
+    def __bool__(self):
+        return self.unique
+
+    def __repr__(self):
+        return (f"VerificationResult(unique={self.unique}, max_weight={self.max_weight}, "
+                f"edges_checked={self.edges_checked}, collisions={len(self.collisions)})")
+
+
+def edge_chunks(source):
+    """
+    Normalizes the supported inputs into a stream of (u, v, weight) array chunks.
+
+    Tables and mappings are cut into CHUNK_SIZE edges per chunk, so a check that stops
+    early never touches the rest, and its scratch arrays stay chunk-sized.
+    """
+    if isinstance(source, EdgeWeightView):
+        source = source.table
+    if hasattr(source, 'edge_chunks'):  # Implicit graph
+        yield from source.edge_chunks()
+    elif isinstance(source, EdgeTable):
+        for start in range(0, len(source), CHUNK_SIZE):
+            stop = start + CHUNK_SIZE
+            yield source.u[start:stop], source.v[start:stop], source.weight[start:stop]
+    elif isinstance(source, Mapping):
+        items = iter(source.items())
+        while chunk := list(islice(items, CHUNK_SIZE)):
+            u = np.fromiter((edge[0] for edge, _ in chunk), dtype=np.int64, count=len(chunk))
+            v = np.fromiter((edge[1] for edge, _ in chunk), dtype=np.int64, count=len(chunk))
+            yield u, v, np.fromiter((weight for _, weight in chunk), dtype=np.int64, count=len(chunk))
+    else:
+        for chunk in source:
+            yield tuple(np.asarray(column, dtype=np.int64) for column in chunk)
+
+
+def _weight_bound(source):
+    """
+    Derives an upper bound on the weights of a source that can report one.
+    """
+    if isinstance(source, EdgeWeightView):
+        source = source.table
+    if hasattr(source, 'max_label'):
+        return 2 * source.max_label()
+    if isinstance(source, EdgeTable):
+        return int(source.weight.max()) if len(source) else 0
+    if isinstance(source, Mapping):
+        return max(source.values(), default=0)
+    raise ValueError("max_weight is required for a stream of edge chunks")
+
+
+def _largest_weight(source):
+    """
+    Returns the largest weight of a source that can report it without a full check, else None.
+    """
+    if isinstance(source, EdgeWeightView):
+        source = source.table
+    if isinstance(source, EdgeTable):
+        return int(source.weight.max()) if len(source) else 0
+    if callable(getattr(source, 'max_weight', None)):
+        return source.max_weight()
+    if isinstance(source, Mapping):
+        return max(source.values(), default=0)
+    return None
+
+
+def verify_edge_weights(source, max_weight=None, collisions=False):
+    """
+    Checks in one pass that every edge weight is distinct.
+
+    Weights are marked in a bitset of max_weight + 1 bits (about max_weight / 8 bytes,
+    2k for a labeling with largest label k), and the check stops at the first chunk
+    holding a repeated weight. With collisions=True the whole stream is read, repeated
+    weights are marked in a second bitset, and a second pass collects every edge that
+    carries one of them, so memory stays proportional to the collisions found.
+
+    Args:
+        source: An EdgeTable or its mapping view, an implicit graph, a {(u, v): weight}
+            mapping with one entry per undirected edge, or an iterable of (u, v, weight)
+            array chunks.
+        max_weight (int, optional): Upper bound on any weight, e.g. 2 * k. Derived from
+            the source when it can report one.
+        collisions (bool): Whether to build the weight -> edges collision report.
+
+    Returns:
+        VerificationResult: The outcome, truthy when all weights are distinct.
+    """
+    if max_weight is None:
+        max_weight = _weight_bound(source)
+    reiterable = isinstance(source, (Mapping, EdgeTable)) or hasattr(source, 'edge_chunks')
+    if collisions and not reiterable and iter(source) is source:
+        source = list(source)  # A one-shot stream has to be kept for the second pass
+
+    bits = np.zeros((max_weight >> 3) + 1, dtype=np.uint8)
+    repeated_bits = np.zeros_like(bits) if collisions else None
+    largest = 0
+    checked = 0
+    unique = True
+
+    for u, v, weight in edge_chunks(source):
+        if weight.size == 0:
+            continue
+        if weight.min() < 0 or weight.max() > max_weight:
+            raise ValueError(f"Edge weight outside of [0, {max_weight}]")
+        largest = max(largest, int(weight.max()))
+        byte, mask = weight >> 3, np.left_shift(1, weight & 7).astype(np.uint8)
+
+        # Repeats inside the chunk, and against weights marked by earlier chunks
+        order = np.argsort(weight, kind='stable')
+        repeat = np.zeros(weight.size, dtype=bool)
+        repeat[order[1:]] = weight[order[1:]] == weight[order[:-1]]
+        repeat |= (bits[byte] & mask) != 0
+        np.bitwise_or.at(bits, byte, mask)
+        checked += weight.size
+
+        if repeat.any():
+            unique = False
+            if not collisions:
+                break
+            np.bitwise_or.at(repeated_bits, byte[repeat], mask[repeat])
+
+    if not unique and not collisions:
+        # Stopped at the first repeat: report the maximum over all edges where known
+        largest = max(largest, _largest_weight(source) or 0)
+
+    report = None
+    if collisions and not unique:
+        report = {}
+        for u, v, weight in edge_chunks(source):
+            hits = np.nonzero(repeated_bits[weight >> 3] & np.left_shift(1, weight & 7).astype(np.uint8))[0]
+            for i in hits.tolist():
+                report.setdefault(int(weight[i]), []).append((int(u[i]), int(v[i])))
+        report = dict(sorted(report.items()))
+    return VerificationResult(unique, largest, checked, report)
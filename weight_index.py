@@ -0,0 +1,162 @@
+# Edges sorted by weight: inverse lookups, range scans and gap listings over a labeling
+import numpy as np
+
+from verify import edge_chunks
+
+
+class WeightIndex:
+    def __init__(self, u, v, weight):
+        """
+        Sorts the edges of a labeling by weight once, for repeated weight queries.
+
+        The index keeps the edge list in its original order plus a permutation sorting
+        it by weight. Lookups are binary searches on the sorted weight array, O(log E);
+        range queries return array slices.
+
+        Args:
+            u, v (array-like): Endpoints of every undirected edge.
+            weight (array-like): Weight of every edge.
+        """
+        self.u = np.array(u, dtype=np.int64)
+        self.v = np.array(v, dtype=np.int64)
+        self._sort(np.array(weight, dtype=np.int64))
+
+    @classmethod
+    def from_edges(cls, source):
+        """
+        Builds the index of any edge source accepted by verify.edge_chunks (an EdgeTable
+        or its mapping view, an implicit graph, a LabelingFile, (u, v, w) chunks, ...).
+        """
+        chunks = list(edge_chunks(source))
+        if not chunks:
+            return cls([], [], [])
+        return cls(*(np.concatenate(column) for column in zip(*chunks)))
+
+    def _sort(self, weight):
+        self.weight = weight
+        self._order = np.argsort(weight, kind='stable')
+        self._sorted = weight[self._order]
+
+    def __len__(self):
+        return self.weight.size
+
+    def __contains__(self, weight):
+        position = np.searchsorted(self._sorted, weight)
+        return position < self._sorted.size and self._sorted[position] == weight
+
+    @property
+    def min_weight(self):
+        return int(self._sorted[0]) if self._sorted.size else None
+
+    @property
+    def max_weight(self):
+        return int(self._sorted[-1]) if self._sorted.size else None
+
+    def edges_of(self, weight):
+        """
+        Returns every edge (u, v) carrying weight, in edge order (empty if none).
+        """
+        rows = np.sort(self._rows(weight))
+        return list(zip(self.u[rows].tolist(), self.v[rows].tolist()))
+
+    def _rows(self, weight):
+        return self._order[np.searchsorted(self._sorted, weight, 'left'):
+                           np.searchsorted(self._sorted, weight, 'right')]
+
+    def edge_of(self, weight):
+        """
+        Returns the edge (u, v) carrying weight, raising KeyError if no edge has it.
+
+        When several edges share the weight, the first one in edge order is returned.
+        """
+        rows = self._rows(weight)
+        if rows.size == 0:
+            raise KeyError(weight)
+        row = rows.min()
+        return int(self.u[row]), int(self.v[row])
+
+    def lookup(self, weights):
+        """
+        Vectorized edge_of over an array of weights, for large query batches.
+
+        Returns:
+            tuple: (u, v) int64 arrays, -1 where no edge has the weight; for a shared
+            weight any one of its edges is returned.
+        """
+        weights = np.asarray(weights, dtype=np.int64)
+        position = np.minimum(np.searchsorted(self._sorted, weights), max(self._sorted.size - 1, 0))
+        if self._sorted.size == 0:
+            missing = np.full(weights.shape, -1, dtype=np.int64)
+            return missing, missing.copy()
+        found = self._sorted[position] == weights
+        rows = self._order[position]
+        return np.where(found, self.u[rows], -1), np.where(found, self.v[rows], -1)
+
+    def count_in(self, low, high):
+        """
+        Returns the number of edges with low <= weight <= high.
+        """
+        return int(np.searchsorted(self._sorted, high, 'right') - np.searchsorted(self._sorted, low, 'left'))
+
+    def edges_in(self, low, high):
+        """
+        Returns (weight, u, v) arrays of the edges with low <= weight <= high, by weight
+        (edges sharing a weight come in no particular order).
+        """
+        rows = self._order[np.searchsorted(self._sorted, low, 'left'):np.searchsorted(self._sorted, high, 'right')]
+        return self.weight[rows], self.u[rows], self.v[rows]
+
+    def gaps(self, low, high):
+        """
+        Lists the runs of unused weights in [low, high] as (start, stop) pairs, both inclusive.
+
+        Costs O(log E + edges in the range), whatever the width of the gaps.
+        """
+        used = np.unique(self._sorted[np.searchsorted(self._sorted, low, 'left'):
+                                      np.searchsorted(self._sorted, high, 'right')])
+        bounds = np.concatenate(([low - 1], used, [high + 1]))
+        starts, stops = bounds[:-1] + 1, bounds[1:] - 1
+        keep = starts <= stops
+        return list(zip(starts[keep].tolist(), stops[keep].tolist()))
+
+    def missing(self, low, high):
+        """
+        Returns the unused weights in [low, high] as a sorted int64 array.
+        """
+        runs = self.gaps(low, high)
+        if not runs:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, stop + 1, dtype=np.int64) for start, stop in runs])
+
+    def duplicates(self):
+        """
+        Returns the weights carried by more than one edge, sorted.
+        """
+        repeated = self._sorted[1:][self._sorted[1:] == self._sorted[:-1]]
+        return np.unique(repeated)
+
+    def relabel(self, labels, vertices=None):
+        """
+        Recomputes the weights after a labeling change.
+
+        Without vertices every weight is recomputed and re-sorted. With the changed
+        vertices given, only their edges are recomputed; the untouched entries keep
+        their sorted order and the new ones are merged in, O(E) instead of O(E log E).
+
+        Args:
+            labels (array-like): The new label of every vertex.
+            vertices (array-like, optional): The vertices whose labels changed.
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        if vertices is None:
+            self._sort(labels[self.u] + labels[self.v])
+            return
+        changed = np.isin(self.u, vertices) | np.isin(self.v, vertices)
+        rows = np.nonzero(changed)[0]
+        if rows.size == 0:
+            return
+        self.weight[rows] = labels[self.u[rows]] + labels[self.v[rows]]
+        kept = self._order[~changed[self._order]]
+        rows = rows[np.argsort(self.weight[rows], kind='stable')]
+        self._order = np.insert(kept, np.searchsorted(self.weight[kept], self.weight[rows]), rows)
+        self._sorted = self.weight[self._order]